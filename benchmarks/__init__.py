@@ -0,0 +1,3 @@
+"""
+Benchmarks that measure Swiftest against a local stand-in for OpenStack Swift.
+"""
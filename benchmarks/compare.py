@@ -0,0 +1,49 @@
+"""
+Compare two benchmark result files written by benchmarks.run.
+
+    python -m benchmarks.compare baseline.json candidate.json
+
+Prints the change in operations per second for each scenario and
+concurrency level measured in both files. Exits with a non-zero status if
+any measurement regressed by more than --threshold percent.
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        report = json.load(f)
+    return report, dict(((r['scenario'], r['concurrency']), r) for r in report['results'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10.0,
+        help='percent slowdown that counts as a regression (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    baseline_report, baseline = load(args.baseline)
+    candidate_report, candidate = load(args.candidate)
+    print('{0} -> {1}'.format(baseline_report['swiftest_version'], candidate_report['swiftest_version']))
+
+    regressed = False
+    for key in sorted(set(baseline) & set(candidate)):
+        before, after = baseline[key]['ops_per_sec'], candidate[key]['ops_per_sec']
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ''
+        if change < -args.threshold:
+            regressed = True
+            flag = '  REGRESSION'
+        print('{0:>14} c={1:<3} {2:>10.1f} -> {3:>10.1f} ops/s {4:+7.1f}%{5}'.format(
+            key[0], key[1], before, after, change, flag))
+
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,465 @@
+"""
+A small, threaded, in-memory stand-in for an OpenStack Swift cluster.
+
+It implements just enough of the API for benchmarking Swiftest's own
+overhead: v1.0 authentication, /info, account, container and object CRUD,
+metadata, paginated plain and JSON listings with prefixes and delimiters,
+server-side copies, conditional GETs and byte ranges. Nothing is persisted.
+"""
+
+import json
+import multiprocessing
+import re
+import threading
+import time
+
+from hashlib import md5
+
+try:
+    # Python 3.3
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlsplit, parse_qs, unquote, urlencode
+    from urllib.request import urlopen
+except ImportError:
+    # Python 2.7
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlsplit, parse_qs
+    from urllib import unquote, urlencode
+    from urllib2 import urlopen
+
+ACCOUNT = 'AUTH_bench'
+USERNAME = 'bench'
+AUTH_KEY = 'bench'
+TOKEN = 'AUTH_tkbench'
+
+RANGE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+
+class StoredObject(object):
+
+    def __init__(self, body, content_type, metadata):
+        self.body = body
+        self.etag = md5(body).hexdigest()
+        self.content_type = content_type or 'application/octet-stream'
+        self.metadata = metadata
+        self.timestamp = time.time()
+
+    def last_modified(self):
+        return time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(self.timestamp))
+
+    def listing_entry(self, name):
+        return {'name': name, 'bytes': len(self.body), 'hash': self.etag,
+                'content_type': self.content_type,
+                'last_modified': time.strftime('%Y-%m-%dT%H:%M:%S.000000', time.gmtime(self.timestamp))}
+
+
+class Store(object):
+    """
+    Every container, object and metadata value held by a FakeSwift server.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.account_metadata = {}
+        self.containers = {}
+        self.container_metadata = {}
+
+    def seed(self, container, count, size=0, prefix='obj'):
+        """
+        Fill a container with "count" objects of "size" bytes without any HTTP traffic.
+        """
+
+        body = b'x' * size
+        with self.lock:
+            objects = self.containers.setdefault(container, {})
+            self.container_metadata.setdefault(container, {})
+            for i in range(count):
+                objects['{0}{1:08d}'.format(prefix, i)] = StoredObject(body, None, {})
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    # Headers and bodies are written separately; don't let Nagle's algorithm stall the second write.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def store(self):
+        return self.server.store
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_HEAD(self):
+        self.dispatch('HEAD')
+
+    def do_PUT(self):
+        self.dispatch('PUT')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_DELETE(self):
+        self.dispatch('DELETE')
+
+    def dispatch(self, method):
+        parts = urlsplit(self.path)
+        self.query = dict((k, v[0]) for k, v in parse_qs(parts.query, keep_blank_values=True).items())
+        path = unquote(parts.path)
+
+        if path == '/auth/v1.0':
+            return self.auth()
+        if path == '/_seed' and method == 'POST':
+            self.store.seed(self.query['container'], int(self.query['count']), int(self.query.get('size', 0)))
+            return self.respond(204)
+        if path == '/info':
+            return self.respond(200, json.dumps({'swift': {'version': 'fakeswift'}}).encode('utf-8'),
+                {'Content-Type': 'application/json'})
+
+        segments = path.lstrip('/').split('/', 3)
+        if len(segments) < 2 or segments[0] != 'v1' or segments[1] != ACCOUNT:
+            return self.respond(404)
+        if self.headers.get('X-Auth-Token') != TOKEN:
+            self.read_body()
+            return self.respond(401)
+
+        if len(segments) == 2 or not segments[2]:
+            return getattr(self, 'account_' + method)()
+        if len(segments) == 3 or not segments[3]:
+            return getattr(self, 'container_' + method)(segments[2])
+        return getattr(self, 'object_' + method)(segments[2], segments[3])
+
+    # Authentication.
+
+    def auth(self):
+        if self.headers.get('X-Auth-User') != USERNAME or self.headers.get('X-Auth-Key') != AUTH_KEY:
+            return self.respond(401)
+        host, port = self.server.server_address[:2]
+        self.respond(204, headers={'X-Auth-Token': TOKEN,
+            'X-Storage-Url': 'http://{0}:{1}/v1/{2}'.format(host, port, ACCOUNT)})
+
+    # Account.
+
+    def account_HEAD(self):
+        with self.store.lock:
+            headers = self.meta_headers('Account', self.store.account_metadata)
+            headers['X-Account-Container-Count'] = str(len(self.store.containers))
+            headers['X-Account-Object-Count'] = str(sum(len(c) for c in self.store.containers.values()))
+            headers['X-Account-Bytes-Used'] = str(sum(len(o.body) for c in self.store.containers.values()
+                for o in c.values()))
+        self.respond(204, headers=headers)
+
+    def account_GET(self):
+        with self.store.lock:
+            names = sorted(self.store.containers)
+        self.listing(names, lambda name: {'name': name})
+
+    def account_POST(self):
+        self.read_body()
+        with self.store.lock:
+            self.update_metadata('Account', self.store.account_metadata)
+        self.respond(204)
+
+    def account_PUT(self):
+        self.read_body()
+        self.respond(405)
+
+    account_DELETE = account_PUT
+
+    # Containers.
+
+    def container_PUT(self, container):
+        self.read_body()
+        with self.store.lock:
+            existed = container in self.store.containers
+            self.store.containers.setdefault(container, {})
+            self.update_metadata('Container', self.store.container_metadata.setdefault(container, {}))
+        self.respond(202 if existed else 201)
+
+    def container_HEAD(self, container):
+        with self.store.lock:
+            objects = self.store.containers.get(container)
+            if objects is None:
+                return self.respond(404)
+            headers = self.meta_headers('Container', self.store.container_metadata[container])
+            headers['X-Container-Object-Count'] = str(len(objects))
+            headers['X-Container-Bytes-Used'] = str(sum(len(o.body) for o in objects.values()))
+        self.respond(204, headers=headers)
+
+    def container_GET(self, container):
+        with self.store.lock:
+            objects = self.store.containers.get(container)
+            if objects is None:
+                return self.respond(404)
+            objects = dict(objects)
+        self.listing(sorted(objects), lambda name: objects[name].listing_entry(name))
+
+    def container_POST(self, container):
+        self.read_body()
+        with self.store.lock:
+            if container not in self.store.containers:
+                return self.respond(404)
+            self.update_metadata('Container', self.store.container_metadata[container])
+        self.respond(204)
+
+    def container_DELETE(self, container):
+        with self.store.lock:
+            objects = self.store.containers.get(container)
+            if objects is None:
+                return self.respond(404)
+            if objects:
+                return self.respond(409)
+            del self.store.containers[container]
+            del self.store.container_metadata[container]
+        self.respond(204)
+
+    # Objects.
+
+    def object_PUT(self, container, name):
+        body = self.read_body()
+        copy_from = self.headers.get('X-Copy-From')
+        with self.store.lock:
+            objects = self.store.containers.get(container)
+            if objects is None:
+                return self.respond(404)
+            if copy_from:
+                source_container, source_name = unquote(copy_from).lstrip('/').split('/', 1)
+                source = self.store.containers.get(source_container, {}).get(source_name)
+                if source is None:
+                    return self.respond(404)
+                metadata = dict(source.metadata, **self.new_metadata())
+                stored = StoredObject(source.body, self.headers.get('Content-Type') or source.content_type,
+                    metadata)
+            else:
+                stored = StoredObject(body, self.headers.get('Content-Type'), self.new_metadata())
+                expected = self.headers.get('ETag')
+                if expected and expected.strip('"').lower() != stored.etag:
+                    return self.respond(422)
+            objects[name] = stored
+        self.respond(201, headers={'ETag': stored.etag, 'Last-Modified': stored.last_modified()})
+
+    def object_GET(self, container, name, head=False):
+        with self.store.lock:
+            stored = self.store.containers.get(container, {}).get(name)
+        if stored is None:
+            return self.respond(404)
+
+        headers = self.meta_headers('Object', stored.metadata)
+        headers.update({'ETag': stored.etag, 'Content-Type': stored.content_type,
+            'Last-Modified': stored.last_modified(), 'Accept-Ranges': 'bytes'})
+
+        if self.headers.get('If-None-Match', '').strip('"') == stored.etag:
+            return self.respond(304, headers=headers)
+        if_match = self.headers.get('If-Match')
+        if if_match and if_match.strip('"') != stored.etag:
+            return self.respond(412)
+
+        body, status = stored.body, 200
+        match = RANGE.match(self.headers.get('Range', ''))
+        if match and not head:
+            first, last = match.groups()
+            size = len(body)
+            if first:
+                start, end = int(first), min(int(last) if last else size - 1, size - 1)
+            else:
+                start, end = max(0, size - int(last)), size - 1
+            if start > end:
+                return self.respond(416, headers={'Content-Range': 'bytes */{0}'.format(size)})
+            headers['Content-Range'] = 'bytes {0}-{1}/{2}'.format(start, end, size)
+            body, status = body[start:end + 1], 206
+
+        self.respond(status, body, headers, head=head)
+
+    def object_HEAD(self, container, name):
+        self.object_GET(container, name, head=True)
+
+    def object_POST(self, container, name):
+        self.read_body()
+        with self.store.lock:
+            stored = self.store.containers.get(container, {}).get(name)
+            if stored is None:
+                return self.respond(404)
+            # Object POSTs replace all metadata.
+            stored.metadata = self.new_metadata()
+            if self.headers.get('Content-Type'):
+                stored.content_type = self.headers.get('Content-Type')
+        self.respond(202)
+
+    def object_DELETE(self, container, name):
+        with self.store.lock:
+            objects = self.store.containers.get(container, {})
+            if objects.pop(name, None) is None:
+                return self.respond(404)
+        self.respond(204)
+
+    # Helpers.
+
+    def listing(self, names, entry):
+        q = self.query
+        prefix, delimiter = q.get('prefix', ''), q.get('delimiter')
+        marker, end_marker = q.get('marker', ''), q.get('end_marker')
+        limit = min(int(q.get('limit', 10000)), 10000)
+
+        page = []
+        for name in names:
+            if len(page) >= limit:
+                break
+            if name <= marker or not name.startswith(prefix):
+                continue
+            if end_marker and name >= end_marker:
+                break
+            if delimiter:
+                index = name.find(delimiter, len(prefix))
+                if index >= 0:
+                    subdir = name[:index + len(delimiter)]
+                    if not page or page[-1].get('subdir') != subdir:
+                        if subdir > marker:
+                            page.append({'subdir': subdir})
+                    continue
+            page.append(entry(name))
+
+        if q.get('format') == 'json':
+            self.respond(200, json.dumps(page).encode('utf-8'), {'Content-Type': 'application/json'})
+        elif page:
+            text = "\n".join(e.get('subdir') or e['name'] for e in page) + "\n"
+            self.respond(200, text.encode('utf-8'), {'Content-Type': 'text/plain; charset=utf-8'})
+        else:
+            self.respond(204)
+
+    def new_metadata(self):
+        metadata = {}
+        self.update_metadata('Object', metadata)
+        return metadata
+
+    def update_metadata(self, kind, metadata):
+        header_prefix = 'x-{0}-meta-'.format(kind.lower())
+        for header, value in self.headers.items():
+            if header.lower().startswith(header_prefix):
+                key = header[len(header_prefix):].lower()
+                if value:
+                    metadata[key] = value
+                else:
+                    metadata.pop(key, None)
+
+    def meta_headers(self, kind, metadata):
+        return dict(('X-{0}-Meta-{1}'.format(kind, key), value) for key, value in metadata.items())
+
+    def read_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    # Discard any trailers.
+                    while self.rfile.readline().strip():
+                        pass
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b''.join(chunks)
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def respond(self, status, body=b'', headers=None, head=False):
+        self.send_response(status)
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        if status not in (204, 304):
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body and not head and self.command != 'HEAD':
+            self.wfile.write(body)
+
+
+class FakeSwift(ThreadingMixIn, HTTPServer):
+    """
+    Serve the fake Swift API from a background thread.
+
+    Use as a context manager, or call start() and stop(). "auth_url" is the
+    endpoint to hand to a Client along with USERNAME and AUTH_KEY.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, host='127.0.0.1', port=0):
+        HTTPServer.__init__(self, (host, port), Handler)
+        self.store = Store()
+        self._thread = None
+
+    @property
+    def auth_url(self):
+        host, port = self.server_address[:2]
+        return 'http://{0}:{1}/auth/v1.0'.format(host, port)
+
+    def seed(self, container, count, size=0):
+        self.store.seed(container, count, size)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def _serve(pipe, host):
+    server = FakeSwift(host)
+    pipe.send(server.server_address[1])
+    server.serve_forever()
+
+
+class FakeSwiftProcess(object):
+    """
+    Run a FakeSwift server in a child process, so it doesn't compete with the client for the GIL.
+
+    Offers the same auth_url, seed(), start() and stop() as FakeSwift.
+    """
+
+    def __init__(self, host='127.0.0.1'):
+        self.host = host
+        self.port = None
+        self._process = None
+
+    @property
+    def auth_url(self):
+        return 'http://{0}:{1}/auth/v1.0'.format(self.host, self.port)
+
+    def seed(self, container, count, size=0):
+        query = urlencode({'container': container, 'count': count, 'size': size})
+        url = 'http://{0}:{1}/_seed?{2}'.format(self.host, self.port, query)
+        urlopen(url, data=b'').close()
+
+    def start(self):
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve, args=(child, self.host))
+        self._process.daemon = True
+        self._process.start()
+        self.port = parent.recv()
+        return self
+
+    def stop(self):
+        self._process.terminate()
+        self._process.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,140 @@
+"""
+Measure the memory that Swiftest's handles and listing records cost apiece.
+
+Run from the repository root:
+
+    python -m benchmarks.handles --count 1000000
+
+Each kind of record is built "count" times, as a walk of a large listing
+would build it, and kept alive while the memory allocated for it is traced.
+No server is needed; handles don't make requests until they're used.
+Results are written as JSON.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import swiftest
+
+from swiftest.container import Container
+from swiftest.listing import object_record
+from swiftest.swiftest_object import SwiftestObject
+
+
+class StubClient(object):
+    """
+    Stand in for the Client that every handle refers to, without authenticating.
+    """
+
+
+def listing_entry(i):
+    """
+    Build the JSON listing entry that Swift would report for the "i"th object.
+    """
+
+    return {'name': 'shards/{0:012d}'.format(i), 'bytes': 4096, 'hash': '{0:032x}'.format(i),
+            'content_type': 'application/octet-stream',
+            'last_modified': '2014-01-01T00:00:{0:02d}.000000'.format(i % 60)}
+
+
+def object_handles(client, count):
+    container = Container(client, 'shards')
+    return [container.object('shards/{0:012d}'.format(i)) for i in range(count)]
+
+
+def listed_handles(client, count):
+    """
+    Build handles from container names that are parsed anew for every entry, as they are from a listing.
+    """
+
+    return [SwiftestObject(client, ''.join(['sha', 'rds']), 'shards/{0:012d}'.format(i)) for i in range(count)]
+
+
+def container_handles(client, count):
+    return [Container(client, 'container{0:012d}'.format(i)) for i in range(count)]
+
+
+def object_records(client, count):
+    return [object_record(listing_entry(i)) for i in range(count)]
+
+
+def names(client, count):
+    """
+    The object names alone, as a baseline that every other measurement includes.
+    """
+
+    return ['shards/{0:012d}'.format(i) for i in range(count)]
+
+
+SCENARIOS = [
+    ('names', names),
+    ('object_handles', object_handles),
+    ('listed_handles', listed_handles),
+    ('container_handles', container_handles),
+    ('object_records', object_records),
+]
+
+
+def measure(name, build, count):
+    """
+    Report the bytes still allocated once "count" records have been built by "build".
+    """
+
+    client = StubClient()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        records = build(client, count)
+        allocated, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del records
+
+    return {
+        'scenario': name,
+        'count': count,
+        'bytes': allocated,
+        'peak_bytes': peak,
+        'bytes_per_record': allocated / float(count),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1000000, help='records per scenario (default: %(default)s)')
+    parser.add_argument('--scenario', action='append', choices=[name for name, _ in SCENARIOS],
+        help='run only this scenario; may be repeated')
+    parser.add_argument('--output', help='write JSON results here instead of to stdout')
+    args = parser.parse_args(argv)
+
+    results = []
+    for name, build in SCENARIOS:
+        if args.scenario and name not in args.scenario:
+            continue
+        result = measure(name, build, args.count)
+        results.append(result)
+        sys.stderr.write('{scenario:>18} {bytes_per_record:>8.1f} bytes/record\n'.format(**result))
+
+    report = {
+        'swiftest_version': swiftest.VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Measure how long a fresh interpreter takes to import Swiftest and make its first Client.
+
+Run from the repository root:
+
+    python -m benchmarks.importtime --output importtime.json
+
+Every measurement starts a new interpreter, so nothing has been imported
+yet. Each scenario's statement is run "repeat" times and the fastest is
+reported, both as timed within the interpreter and as the whole process's
+cold start, less that of an interpreter that imports nothing. The "client"
+scenario also constructs a Client against a FakeSwift server, which is when
+the HTTP stack is loaded. Results are written as JSON, along with the
+modules that took the longest to load.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import swiftest
+
+from .fakeswift import FakeSwiftProcess, USERNAME, AUTH_KEY
+
+# Python statements to time, by scenario. "{auth_url}" is replaced with FakeSwift's authentication URL.
+SCENARIOS = [
+    ('package', 'import swiftest'),
+    ('exception', 'import swiftest.exception'),
+    ('client_module', 'from swiftest.client import Client'),
+    ('client', 'from swiftest.client import Client; '
+               'Client({auth_url!r}, {username!r}, {auth_key!r}).close()'),
+]
+
+# Timing wrapper run in each fresh interpreter. It reports the statement's duration, in seconds, and whether
+# the HTTP stack was loaded.
+PROBE = '''
+import sys, time
+start = time.time()
+{statement}
+elapsed = time.time() - start
+sys.stdout.write('{{0}} {{1}}\\n'.format(elapsed, int('requests' in sys.modules)))
+'''
+
+
+def interpreter(args, capture_stderr=False):
+    """
+    Run a fresh interpreter from the repository root and return its output.
+    """
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    stderr = subprocess.PIPE if capture_stderr else None
+    p = subprocess.Popen([sys.executable] + args, cwd=root, stdout=subprocess.PIPE, stderr=stderr,
+        universal_newlines=True)
+    out, err = p.communicate()
+    if p.returncode != 0:
+        raise RuntimeError("Interpreter exited with status {0}: {1}".format(p.returncode, err or out))
+    return out, err
+
+
+def startup(repeat):
+    """
+    Time an interpreter that imports nothing, to subtract from every other measurement.
+    """
+
+    timings = []
+    for _ in range(repeat):
+        start = time.time()
+        interpreter(['-c', 'pass'])
+        timings.append(time.time() - start)
+    return min(timings)
+
+
+def heaviest(statement, count):
+    """
+    Return the "count" modules that took the longest to execute while running "statement", per -X importtime.
+
+    Each is a (module, seconds) pair, counting only the module's own time and
+    not that of the modules it imported in turn.
+    """
+
+    _, err = interpreter(['-X', 'importtime', '-c', statement], capture_stderr=True)
+    modules = []
+    for line in err.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        if name == 'site':
+            # Everything imported so far belongs to interpreter startup.
+            modules = []
+            continue
+        modules.append((name, int(own) / 1e6))
+    modules.sort(key=lambda m: m[1], reverse=True)
+    return modules[:count]
+
+
+def measure(name, statement, repeat, baseline):
+    timings, totals = [], []
+    loads_requests = False
+    for _ in range(repeat):
+        start = time.time()
+        out, _ = interpreter(['-c', PROBE.format(statement=statement)])
+        totals.append(time.time() - start)
+        elapsed, loaded = out.split()
+        timings.append(float(elapsed))
+        loads_requests = bool(int(loaded))
+
+    return {
+        'scenario': name,
+        'statement': statement,
+        'import_seconds': min(timings),
+        # Process startup is noisy; don't let it report a negative cost.
+        'cold_start_seconds': max(0.0, min(totals) - baseline),
+        'timings': timings,
+        'loads_requests': loads_requests,
+        'heaviest': heaviest(statement, 8),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', action='append', choices=[name for name, _ in SCENARIOS],
+        help='run only this scenario; may be repeated')
+    parser.add_argument('--repeat', type=int, default=10, help='interpreters per measurement (default: %(default)s)')
+    parser.add_argument('--output', help='write JSON results here instead of to stdout')
+    args = parser.parse_args(argv)
+
+    baseline = startup(args.repeat)
+    results = []
+    with FakeSwiftProcess() as server:
+        for name, template in SCENARIOS:
+            if args.scenario and name not in args.scenario:
+                continue
+            statement = template.format(auth_url=server.auth_url, username=USERNAME, auth_key=AUTH_KEY)
+            result = measure(name, statement, args.repeat, baseline)
+            results.append(result)
+            sys.stderr.write('{scenario:>14} {ms:>8.1f} ms import {cold:>8.1f} ms cold start{requests}\n'.format(
+                ms=result['import_seconds'] * 1000, cold=result['cold_start_seconds'] * 1000,
+                requests='  (loads requests)' if result['loads_requests'] else '', **result))
+
+    report = {
+        'swiftest_version': swiftest.VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'interpreter_seconds': baseline,
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""
+Measure Swiftest's throughput against a local FakeSwift server.
+
+Run from the repository root:
+
+    python -m benchmarks.run --output results.json
+
+Each scenario runs at every requested concurrency level, "repeat" times,
+and the fastest repetition is reported. Results are written as JSON so that
+runs can be compared between releases with benchmarks.compare.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from io import BytesIO
+
+import swiftest
+
+from swiftest.client import Client
+from swiftest.compat import monotonic
+from swiftest.pool import bounded_map
+from swiftest.transport import Transport
+
+from .fakeswift import FakeSwift, FakeSwiftProcess, USERNAME, AUTH_KEY
+
+KIB = 1024
+MIB = 1024 * KIB
+
+# Workload sizes, as full and --quick variants.
+#
+# Each scenario prepares its workload, then returns a function that runs it
+# along with the number of operations and bytes that one run accounts for.
+SIZES = {
+    'full': {'small_count': 2000, 'small_size': 4 * KIB, 'large_size': 256 * MIB, 'range_size': 16 * MIB,
+             'listing_count': 50000, 'page_size': 1000, 'metadata_count': 2000},
+    'quick': {'small_count': 200, 'small_size': 4 * KIB, 'large_size': 16 * MIB, 'range_size': 4 * MIB,
+              'listing_count': 5000, 'page_size': 1000, 'metadata_count': 200},
+}
+
+
+def run_all(fn, items, concurrency):
+    """
+    Apply "fn" to every item, "concurrency" at a time, raising the first error.
+    """
+
+    for _, _, error in bounded_map(fn, items, concurrency):
+        if error is not None:
+            raise error
+
+
+def small_put(server, client, concurrency, sizes):
+    container = client.container('small-put-{0}'.format(concurrency)).create_if_necessary()
+    body = b'x' * sizes['small_size']
+
+    def upload(i):
+        container.object('obj{0:08d}'.format(i)).upload_string(body)
+
+    def run():
+        run_all(upload, range(sizes['small_count']), concurrency)
+    return run, sizes['small_count'], sizes['small_count'] * sizes['small_size']
+
+
+def small_get(server, client, concurrency, sizes):
+    server.seed('small-get', sizes['small_count'], sizes['small_size'])
+    container = client.container('small-get')
+
+    def download(i):
+        container.object('obj{0:08d}'.format(i)).download_binary()
+
+    def run():
+        run_all(download, range(sizes['small_count']), concurrency)
+    return run, sizes['small_count'], sizes['small_count'] * sizes['small_size']
+
+
+def large_put(server, client, concurrency, sizes):
+    """
+    Upload one large object per worker, since a single stream can't be parallelized.
+    """
+
+    container = client.container('large-put').create_if_necessary()
+    body = b'x' * sizes['large_size']
+
+    def upload(i):
+        container.object('large{0}'.format(i)).upload_stream(BytesIO(body))
+
+    def run():
+        run_all(upload, range(concurrency), concurrency)
+    return run, concurrency, concurrency * sizes['large_size']
+
+
+def large_get(server, client, concurrency, sizes):
+    """
+    Download a single large object with "concurrency" ranged requests at a time.
+    """
+
+    server.seed('large-get', 1, sizes['large_size'])
+    obj = client.container('large-get').object('obj00000000')
+
+    def run():
+        directory = tempfile.mkdtemp()
+        try:
+            obj.download_ranged(os.path.join(directory, 'large'), range_size=sizes['range_size'],
+                concurrency=concurrency)
+        finally:
+            shutil.rmtree(directory)
+    return run, 1, sizes['large_size']
+
+
+def listing(server, client, concurrency, sizes):
+    """
+    Walk a large container listing to the end with "concurrency" walkers at once.
+    """
+
+    server.seed('listing', sizes['listing_count'])
+    container = client.container('listing')
+
+    def walk(i):
+        for _ in container.objects(page_size=sizes['page_size']):
+            pass
+
+    def run():
+        run_all(walk, range(concurrency), concurrency)
+    return run, concurrency * sizes['listing_count'], 0
+
+
+def metadata_head(server, client, concurrency, sizes):
+    server.seed('metadata', sizes['metadata_count'])
+    container = client.container('metadata')
+
+    def head(i):
+        container.object('obj{0:08d}'.format(i)).refresh()
+
+    def run():
+        run_all(head, range(sizes['metadata_count']), concurrency)
+    return run, sizes['metadata_count'], 0
+
+
+def metadata_post(server, client, concurrency, sizes):
+    server.seed('metadata', sizes['metadata_count'])
+    container = client.container('metadata')
+
+    def post(i):
+        obj = container.object('obj{0:08d}'.format(i))
+        obj.metadata['benchmark'] = str(i)
+        obj.metadata.save()
+
+    def run():
+        run_all(post, range(sizes['metadata_count']), concurrency)
+    return run, sizes['metadata_count'], 0
+
+
+SCENARIOS = [
+    ('small_put', small_put),
+    ('small_get', small_get),
+    ('large_put', large_put),
+    ('large_get', large_get),
+    ('listing', listing),
+    ('metadata_head', metadata_head),
+    ('metadata_post', metadata_post),
+]
+
+
+def measure(server, name, scenario, concurrency, sizes, repeat):
+    """
+    Run one scenario "repeat" times, each with a fresh Client, and report the fastest run.
+    """
+
+    timings = []
+    operations = transferred = 0
+    for _ in range(repeat):
+        client = Client(server.auth_url, USERNAME, AUTH_KEY, transport=Transport(pool_size=max(10, concurrency)))
+        try:
+            run, operations, transferred = scenario(server, client, concurrency, sizes)
+            start = monotonic()
+            run()
+            timings.append(monotonic() - start)
+        finally:
+            client.close()
+
+    best = min(timings)
+    return {
+        'scenario': name,
+        'concurrency': concurrency,
+        'operations': operations,
+        'bytes': transferred,
+        'elapsed': best,
+        'timings': timings,
+        'ops_per_sec': operations / best if best else 0.0,
+        'bytes_per_sec': transferred / best if best else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='use small workloads, for a smoke test')
+    parser.add_argument('--concurrency', default='1,4,16',
+        help='comma-separated concurrency levels (default: %(default)s)')
+    parser.add_argument('--scenario', action='append', choices=[name for name, _ in SCENARIOS],
+        help='run only this scenario; may be repeated')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (default: %(default)s)')
+    parser.add_argument('--in-process', action='store_true',
+        help='serve FakeSwift from a thread of this process rather than a child process')
+    parser.add_argument('--output', help='write JSON results here instead of to stdout')
+    args = parser.parse_args(argv)
+
+    sizes = SIZES['quick' if args.quick else 'full']
+    levels = [int(level) for level in args.concurrency.split(',')]
+    selected = [(name, fn) for name, fn in SCENARIOS if not args.scenario or name in args.scenario]
+
+    results = []
+    with (FakeSwift() if args.in_process else FakeSwiftProcess()) as server:
+        for name, scenario in selected:
+            for concurrency in levels:
+                result = measure(server, name, scenario, concurrency, sizes, args.repeat)
+                results.append(result)
+                sys.stderr.write('{scenario:>14} c={concurrency:<3} {ops_per_sec:>10.1f} ops/s '
+                    '{mib:>9.1f} MiB/s\n'.format(mib=result['bytes_per_sec'] / MIB, **result))
+
+    report = {
+        'swiftest_version': swiftest.VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'sizes': sizes,
+        'server': 'thread' if args.in_process else 'process',
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -17,4 +17,5 @@ setup(
     author_email='smashwilson@gmail.com',
     url='https://github.com/smashwilson/swiftest',
     packages=['swiftest'],
-    install_requires=required)
+    install_requires=required,
+    extras_require={'aio': ['aiohttp>=3.0']})
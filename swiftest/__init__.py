@@ -13,7 +13,28 @@ __all__ = ['VERSION']
 # PATCH: Incremented for internal bugfixes.
 VERSION='1.0.0'
 
-from . import account
-from . import client
-from . import exception
-from . import metadata
+import importlib
+import sys
+
+# Submodules that "import swiftest" makes available as attributes. They're imported on first access, so that
+# processes that only need part of Swiftest don't pay to load the rest.
+_SUBMODULES = ('account', 'client', 'exception', 'metadata')
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        """
+        Import a public submodule the first time it's accessed.
+        """
+
+        if name in _SUBMODULES:
+            return importlib.import_module('.' + name, __name__)
+        raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+    def __dir__():
+        return sorted(set(globals()) | set(_SUBMODULES))
+else:
+    # Module __getattr__ arrived in Python 3.7; import everything up front before then.
+    from . import account
+    from . import client
+    from . import exception
+    from . import metadata
@@ -1,21 +1,33 @@
-import requests
-
 from .metadata import Metadata
 from .exception import ProtocolError
 from .compat import to_long
 
 
-class Account:
+class Account(object):
     """
     Report basic account metadata.
     """
 
+    __slots__ = ('client', 'container_count', 'bytes_used', 'metadata')
+
+    _METADATA_PREFIX = 'Account'
+
     def __init__(self, client):
         self.client = client
+        self._fetch_metadata()
 
+    def refresh(self):
+        """
+        Fetch this account's metadata again, bypassing the Client's metadata cache.
+        """
+
+        self._fetch_metadata(refresh=True)
+        return self
+
+    def _fetch_metadata(self, refresh=False):
         # Perform a HEAD request against the storage endpoint to fetch basic
         # account metadata.
-        meta_response = self.client._call(requests.head, '')
+        meta_response = self.client._head(self._endpoint(), refresh=refresh)
 
         try:
             # Extract metadata from the response.
@@ -24,7 +36,10 @@ class Account:
         except ValueError:
             raise ProtocolError("Non-integer received in HEAD response.")
 
-        self.metadata = Metadata.from_response(self, meta_response, 'Account')
+        self.metadata = Metadata.from_response(self, meta_response, self._METADATA_PREFIX)
+
+    def _endpoint(self):
+        return ''
 
     def __repr__(self):
         return "<Account(" + repr(self.client) + ")>"
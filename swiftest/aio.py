@@ -0,0 +1,557 @@
+"""
+An asyncio client mirroring Client, Account, Container and SwiftestObject.
+
+Requires aiohttp and Python 3.6 or later:
+
+>>> from swiftest.aio import AsyncClient
+>>> async with AsyncClient(endpoint=ENDPOINT, username=USER_NAME, auth_key=AUTH_KEY) as cli:
+...     data = await cli.container('contname').object('objname').download_binary()
+"""
+
+import asyncio
+import aiohttp
+
+from hashlib import md5
+
+from .checksum import verify_etag
+from .compat import to_long, intern
+from .exception import ProtocolError, AlreadyExistsError, DoesNotExistError
+from .listing import parse_names, record_key, object_record, page_query, MAX_PAGE_SIZE
+from .metadata import Metadata
+from .retry import RetryPolicy, rewinder
+from .streams import byte_view, is_buffer, HashingStream, DEFAULT_CHUNK_SIZE
+
+
+class AsyncTransport(object):
+    """
+    Issue HTTP requests over an aiohttp connection pool.
+
+    The underlying ClientSession is created on first use, within the running
+    event loop.
+    """
+
+    def __init__(self, pool_size=100, pool_limit=0, keep_alive=True,
+                 connect_timeout=None, read_timeout=None):
+        """
+        Configure the pool without opening it.
+
+        "pool_size" is the maximum number of connections kept open to any
+        single host and "pool_limit" caps connections across all hosts, with
+        zero meaning no limit. Timeouts are expressed in seconds; leave them as
+        None to wait indefinitely.
+        """
+
+        self.pool_size = pool_size
+        self.pool_limit = pool_limit
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.session = None
+
+    async def request(self, method, url, **kwargs):
+        """
+        Perform an HTTP request and return its aiohttp ClientResponse.
+        """
+
+        return await self._session().request(method, url, **kwargs)
+
+    async def close(self):
+        """
+        Close every pooled connection.
+        """
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _session(self):
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_limit,
+                                             limit_per_host=self.pool_size,
+                                             force_close=not self.keep_alive)
+            timeout = aiohttp.ClientTimeout(total=None,
+                                            sock_connect=self.connect_timeout,
+                                            sock_read=self.read_timeout)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self.session
+
+    def __repr__(self):
+        return "<AsyncTransport(pool_size={},keep_alive={})>".format(self.pool_size, self.keep_alive)
+
+
+class AsyncClient(object):
+    """
+    The main entry point into asyncio Swiftest.
+
+    Unlike Client, an AsyncClient can't authenticate in its constructor.
+    Either await authenticate() or use it as an async context manager, which
+    authenticates on entry and closes the connection pool on exit.
+    """
+
+    def __init__(self, endpoint, username, auth_key, transport=None, retry=None):
+        self.endpoint = endpoint
+        self.username = username
+        self._auth_key = auth_key
+        self.transport = transport or AsyncTransport()
+        self.retry = retry or RetryPolicy()
+        self.storage_url = None
+        self.auth_token = None
+        self._auth_lock = None
+
+    async def authenticate(self):
+        """
+        Authenticate to the OpenStack endpoint. Remember the generated token and storage URL.
+        """
+
+        auth_headers = {'X-Auth-User': self.username, 'X-Auth-Key': self._auth_key}
+        r = await self.transport.request('GET', self.endpoint, headers=auth_headers)
+        r.release()
+        r.raise_for_status()
+
+        self.storage_url = r.headers['X-Storage-Url']
+        self.auth_token = r.headers['X-Auth-Token']
+        return self
+
+    async def _reauthenticate(self, stale_token):
+        """
+        Replace a token that the storage endpoint has rejected, one task at a time.
+        """
+
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        async with self._auth_lock:
+            if self.auth_token == stale_token:
+                await self.authenticate()
+
+    async def account(self):
+        """
+        Access metadata about your account.
+        """
+
+        return await AsyncAccount(self).fetch_metadata()
+
+    def container(self, name):
+        """
+        Access a Container within this account by name.
+        """
+
+        return AsyncContainer(self, name)
+
+    async def container_names(self, prefix=None, delimiter=None, marker=None, end_marker=None, limit=None):
+        """
+        List the names of Containers available in this account.
+        """
+
+        return [name async for name in self.iter_container_names(prefix=prefix, delimiter=delimiter,
+            marker=marker, end_marker=end_marker, limit=limit)]
+
+    def iter_container_names(self, prefix=None, delimiter=None, marker=None, end_marker=None,
+                             limit=None, page_size=MAX_PAGE_SIZE):
+        """
+        Lazily generate the names of Containers available in this account.
+
+        Pages through the listing like Client.iter_container_names().
+        """
+
+        return _walk_names(self, '', prefix, delimiter, marker, end_marker, limit, page_size)
+
+    async def containers(self, prefix=None, delimiter=None, marker=None, end_marker=None, limit=None):
+        """
+        Generate each existing Container.
+        """
+
+        async for name in self.iter_container_names(prefix=prefix, delimiter=delimiter,
+                marker=marker, end_marker=end_marker, limit=limit):
+            yield self.container(name)
+
+    async def _call(self, method, path, accept_status=[], stream=False, **kwargs):
+        """
+        Perform an HTTP request against the storage endpoint.
+
+        The response body is read before returning unless "stream" is set, in
+        which case the caller must release the response. Rejected tokens and
+        transient failures are retried as in Client._call(); async iterable
+        upload bodies can't be replayed and are never retried.
+        """
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        rewind = rewinder(kwargs.get('data'))
+        attempt = 0
+        reauthenticated = False
+
+        while True:
+            token = self.auth_token
+            headers['X-Auth-Token'] = token
+            retry_after = None
+
+            try:
+                r = await self.transport.request(method, self.storage_url + path, headers=headers, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if rewind is None or not self.retry.should_retry(method, attempt):
+                    raise
+            else:
+                status = r.status
+                if status < 400 or status in accept_status:
+                    if not stream:
+                        await r.read()
+                    return r
+
+                r.release()
+                if status == 401 and not reauthenticated:
+                    reauthenticated = True
+                    await self._reauthenticate(token)
+                    if rewind is None:
+                        r.raise_for_status()
+                    rewind()
+                    continue
+
+                if rewind is None or not self.retry.should_retry(method, attempt, status):
+                    r.raise_for_status()
+                retry_after = r.headers.get('Retry-After')
+
+            await asyncio.sleep(self.retry.delay(attempt, retry_after))
+            attempt += 1
+            rewind()
+
+    async def close(self):
+        """
+        Release every connection held by this Client's transport.
+        """
+
+        await self.transport.close()
+
+    async def __aenter__(self):
+        if self.auth_token is None:
+            await self.authenticate()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def __repr__(self):
+        cli_str = "<AsyncClient(endpoint='{}',username='{}',auth_key={})>"
+        return cli_str.format(self.endpoint, self.username, "...")
+
+
+class AsyncMetadata(Metadata):
+    """
+    Metadata whose save() is a coroutine.
+    """
+
+    async def save(self):
+        if not self.changed():
+            return
+        await self.parent.client._call('POST', self.parent._endpoint(), headers=self._save_headers())
+        self._saved()
+
+
+class AsyncAccount(object):
+    """
+    Report basic account metadata.
+    """
+
+    __slots__ = ('client', 'container_count', 'bytes_used', 'metadata')
+
+    def __init__(self, client):
+        self.client = client
+
+    async def fetch_metadata(self):
+        """
+        Fetch and populate this account's metadata attributes.
+        """
+
+        r = await self.client._call('HEAD', '')
+        try:
+            self.container_count = to_long(r.headers['X-Account-Container-Count'])
+            self.bytes_used = to_long(r.headers['X-Account-Bytes-Used'])
+        except ValueError:
+            raise ProtocolError("Non-integer received in HEAD response.")
+
+        self.metadata = AsyncMetadata.from_response(self, r, 'Account')
+        return self
+
+    def _endpoint(self):
+        return ''
+
+    def __repr__(self):
+        return "<AsyncAccount(" + repr(self.client) + ")>"
+
+
+class AsyncContainer(object):
+    """
+    A Container accessed through an AsyncClient.
+
+    Metadata can't be resolved lazily from a coroutine, so await
+    fetch_metadata() before reading "metadata", "object_count" or "bytes_used".
+    """
+
+    __slots__ = ('name', 'client', 'metadata', 'object_count', 'bytes_used')
+
+    def __init__(self, client, name):
+        self.name = intern(name)
+        self.client = client
+
+    async def exists(self):
+        try:
+            await self.fetch_metadata()
+            return True
+        except DoesNotExistError:
+            return False
+
+    async def create(self):
+        """
+        Create a container with this name.
+
+        Raises an AlreadyExistsError if the container already exists.
+        """
+
+        r = await self.client._call('PUT', self._endpoint())
+        if r.status == 202:
+            raise AlreadyExistsError("The container {} already exists.".format(self.name))
+        return self
+
+    async def create_if_necessary(self):
+        """
+        Create a container with this name, unless it already exists.
+        """
+
+        await self.client._call('PUT', self._endpoint())
+        return self
+
+    async def delete(self):
+        """
+        Delete this container.
+
+        Raises a DoesNotExistError if this container doesn't exist.
+        """
+
+        r = await self.client._call('DELETE', self._endpoint(), accept_status=[404])
+        if r.status == 404:
+            raise DoesNotExistError.container(self.name)
+        return self
+
+    async def delete_if_necessary(self):
+        """
+        Delete this container if it exists.
+        """
+
+        await self.client._call('DELETE', self._endpoint(), accept_status=[404])
+        return self
+
+    def object(self, name):
+        """
+        Access an object stored within this container.
+        """
+
+        return AsyncSwiftestObject(self.client, self.name, name)
+
+    def object_names(self, prefix=None, delimiter=None, marker=None, end_marker=None,
+                     limit=None, page_size=MAX_PAGE_SIZE):
+        """
+        Lazily generate the names of objects stored within this container.
+
+        Pages through the listing like Container.object_names().
+        """
+
+        return _walk_names(self.client, self._endpoint(), prefix, delimiter, marker, end_marker,
+            limit, page_size)
+
+    def objects(self, prefix=None, delimiter=None, marker=None, end_marker=None,
+                limit=None, page_size=MAX_PAGE_SIZE):
+        """
+        Lazily generate an ObjectInfo or PseudoDirectory for each entry in this container.
+
+        Pages through the JSON listing like Container.objects().
+        """
+
+        return _walk_objects(self.client, self._endpoint(), prefix, delimiter, marker, end_marker,
+            limit, page_size)
+
+    async def fetch_metadata(self):
+        """
+        Fetch and populate this container's metadata attributes.
+
+        Translate a 404 into a DoesNotExistError.
+        """
+
+        def long_header(resp, header_name):
+            try:
+                return to_long(resp.headers[header_name])
+            except ValueError:
+                raise ProtocolError("Non-integer received in header {}.".format(header_name))
+            except KeyError:
+                raise ProtocolError("Missing expected header value {}.".format(header_name))
+
+        r = await self.client._call('HEAD', self._endpoint(), accept_status=[404])
+        if r.status == 404:
+            raise DoesNotExistError.container(self.name)
+
+        self.metadata = AsyncMetadata.from_response(self, r, 'Container')
+        self.object_count = long_header(r, 'X-Container-Object-Count')
+        self.bytes_used = long_header(r, 'X-Container-Bytes-Used')
+        return self
+
+    def _endpoint(self):
+        return '/' + self.name
+
+    def __repr__(self):
+        return "<AsyncContainer(name={})>".format(self.name)
+
+
+class AsyncSwiftestObject(object):
+    """
+    A single object stored within a Container, accessed through an AsyncClient.
+    """
+
+    __slots__ = ('client', 'container_name', 'name')
+
+    def __init__(self, client, container_name, name):
+        self.client = client
+        self.container_name = intern(container_name)
+        self.name = name
+
+    async def download_string(self, encoding=None):
+        """
+        Download the contents as a String.
+        """
+
+        r = await self.client._call('GET', self._endpoint())
+        return await r.text(encoding=encoding)
+
+    async def download_binary(self):
+        """
+        Download this object's content as uninterpreted binary.
+        """
+
+        r = await self.client._call('GET', self._endpoint())
+        return await r.read()
+
+    async def iter_content(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Stream this object's content as an async iterator of byte chunks.
+
+        At most "chunk_size" bytes are buffered at a time.
+        """
+
+        r = await self.client._call('GET', self._endpoint(), stream=True)
+        try:
+            async for chunk in r.content.iter_chunked(chunk_size):
+                yield chunk
+        finally:
+            r.release()
+
+    async def download_file(self, io, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Stream the contents of this object into an open file-like destination.
+
+        Opening and closing "io" is the caller's responsibility.
+        """
+
+        async for chunk in self.iter_content(chunk_size):
+            io.write(chunk)
+
+    async def upload_string(self, string):
+        """
+        Upload a String as the new content of this object.
+
+        bytes, bytearray and memoryview contents are sent without being copied.
+        """
+
+        view = byte_view(string)
+        checksum = md5(view).hexdigest()
+        await self.client._call('PUT', self._endpoint(), headers={'ETag': checksum}, data=view)
+
+    async def upload_stream(self, source, chunk_size=DEFAULT_CHUNK_SIZE, content_type=None):
+        """
+        Stream the new content of this object from any source.
+
+        "source" may be an async iterable of byte chunks, or anything accepted
+        by SwiftestObject.upload_stream(). Buffers are sliced in place; file-like
+        objects and other iterables are read in the event loop's default
+        executor, so blocking reads don't stall the loop. The body is sent with
+        chunked transfer encoding and its MD5 is compared with the ETag that
+        Swift returns; a ChecksumError is raised if they differ.
+
+        Return the hex MD5 digest of the uploaded content.
+        """
+
+        if hasattr(source, '__aiter__'):
+            checksum = md5()
+
+            async def body():
+                async for chunk in source:
+                    checksum.update(chunk)
+                    yield chunk
+
+            digest = checksum.hexdigest
+        else:
+            stream = HashingStream(source, chunk_size)
+            buffered = is_buffer(source)
+
+            async def body():
+                loop = asyncio.get_event_loop()
+                while True:
+                    if buffered:
+                        chunk = stream.read(chunk_size)
+                    else:
+                        chunk = await loop.run_in_executor(None, stream.read, chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+
+            digest = stream.hexdigest
+
+        headers = {'Content-Type': content_type} if content_type else {}
+        r = await self.client._call('PUT', self._endpoint(), headers=headers, data=body())
+        verify_etag(r, digest(), self._endpoint())
+        return digest()
+
+    def _endpoint(self):
+        return '/{0}/{1}'.format(self.container_name, self.name)
+
+
+async def _walk(client, path, page, key, params, marker, end_marker, limit, page_size):
+    """
+    Request successive pages of a listing until it's exhausted.
+
+    "page" is a coroutine that parses a response into a list of entries and
+    "key" extracts the name that the next request's marker should resume after.
+    """
+
+    remaining = limit
+    while remaining is None or remaining > 0:
+        request_size = page_size if remaining is None else min(page_size, remaining)
+        r = await client._call('GET', path, accept_status=[404],
+            params=page_query(params, marker, end_marker, request_size))
+        if r.status == 404:
+            raise DoesNotExistError.container(path.lstrip('/'))
+        entries = await page(r)
+
+        for entry in entries:
+            yield entry
+        if remaining is not None:
+            remaining -= len(entries)
+
+        # A short page is the last one.
+        if len(entries) < request_size:
+            return
+        marker = key(entries[-1])
+
+
+def _walk_names(client, path, prefix, delimiter, marker, end_marker, limit, page_size):
+    async def page(r):
+        return parse_names(await r.text())
+
+    return _walk(client, path, page, lambda name: name, {'prefix': prefix, 'delimiter': delimiter},
+        marker, end_marker, limit, page_size)
+
+
+async def _walk_objects(client, path, prefix, delimiter, marker, end_marker, limit, page_size):
+    async def page(r):
+        if r.status == 204 or not await r.read():
+            return []
+        return await r.json()
+
+    params = {'prefix': prefix, 'delimiter': delimiter, 'format': 'json'}
+    async for entry in _walk(client, path, page, record_key, params, marker, end_marker, limit, page_size):
+        yield object_record(entry)
@@ -0,0 +1,281 @@
+"""
+Operate on many objects per request through Swift's bulk middleware.
+"""
+
+import time
+import zlib
+
+from itertools import islice
+
+from .compat import quote
+from .exception import ProtocolError
+from .pool import bounded_map
+from .streams import is_buffer, byte_view, remaining_length, DEFAULT_CHUNK_SIZE
+
+# The bulk middleware's default cap on the number of paths deleted per request.
+MAX_BULK_DELETE = 10000
+
+# Default number of concurrent DELETEs used when the bulk middleware isn't available.
+DEFAULT_DELETE_CONCURRENCY = 16
+
+# Default number of concurrent PUTs used when the bulk middleware isn't available.
+DEFAULT_UPLOAD_CONCURRENCY = 16
+
+# Size of a tar block. Every member header and data section is padded to a multiple of this.
+TAR_BLOCK_SIZE = 512
+
+
+class BulkDeleteResult(object):
+    """
+    The aggregated outcome of deleting many objects.
+
+    "errors" lists a (path, status) tuple for each path that couldn't be
+    deleted, where "status" is a string such as '409 Conflict'.
+    """
+
+    def __init__(self, deleted=0, not_found=0, errors=None):
+        self.deleted = deleted
+        self.not_found = not_found
+        self.errors = errors or []
+
+    def ok(self):
+        return not self.errors
+
+    def add(self, other):
+        self.deleted += other.deleted
+        self.not_found += other.not_found
+        self.errors.extend(other.errors)
+
+    @classmethod
+    def from_report(cls, report):
+        """
+        Parse the JSON report that the bulk middleware returns.
+        """
+
+        status = report.get('Response Status', '')
+        errors = [(path, error_status) for path, error_status in report.get('Errors', [])]
+        if not errors and not status.startswith('2'):
+            raise ProtocolError("Bulk delete failed: {0} {1}".format(status, report.get('Response Body', '')))
+        return cls(report.get('Number Deleted', 0), report.get('Number Not Found', 0), errors)
+
+    def __repr__(self):
+        return "<BulkDeleteResult(deleted={},not_found={},errors={})>".format(
+            self.deleted, self.not_found, len(self.errors))
+
+
+class ArchiveUploadResult(object):
+    """
+    The aggregated outcome of uploading objects through extract-archive.
+
+    "errors" lists a (path, status) tuple for each file that couldn't be
+    created, where "status" is a string such as '400 Bad Request'.
+    """
+
+    def __init__(self, created=0, errors=None):
+        self.created = created
+        self.errors = errors or []
+
+    def ok(self):
+        return not self.errors
+
+    def add(self, other):
+        self.created += other.created
+        self.errors.extend(other.errors)
+
+    @classmethod
+    def from_report(cls, report):
+        """
+        Parse the JSON report that the bulk middleware returns.
+        """
+
+        status = report.get('Response Status', '')
+        errors = [(path, error_status) for path, error_status in report.get('Errors', [])]
+        if not errors and not status.startswith('2'):
+            raise ProtocolError("Archive extraction failed: {0} {1}".format(status, report.get('Response Body', '')))
+        return cls(report.get('Number Files Created', 0), errors)
+
+    def __repr__(self):
+        return "<ArchiveUploadResult(created={},errors={})>".format(self.created, len(self.errors))
+
+
+def batches(items, size):
+    """
+    Lazily group an iterable into lists of at most "size" items.
+    """
+
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_delete(client, paths, batch_size=MAX_BULK_DELETE, concurrency=DEFAULT_DELETE_CONCURRENCY):
+    """
+    Delete every "container/object" path in an iterable.
+
+    If the cluster advertises the bulk middleware, paths are sent in batches
+    of up to "batch_size" (or the cluster's own limit, if lower) per request.
+    Otherwise each path is deleted individually, "concurrency" at a time.
+    Return a BulkDeleteResult.
+    """
+
+    capability = client.capabilities().get('bulk_delete')
+    if capability is None:
+        return _delete_each(client, paths, concurrency)
+
+    batch_size = min(batch_size, capability.get('max_deletes_per_request', batch_size))
+    result = BulkDeleteResult()
+    for batch in batches(paths, batch_size):
+        body = "\n".join(quote(('/' + path.lstrip('/')).encode('utf-8')) for path in batch)
+        r = client._call('DELETE', '', params={'bulk-delete': 'true'}, data=body.encode('utf-8'),
+            headers={'Content-Type': 'text/plain', 'Accept': 'application/json'})
+        try:
+            report = r.json()
+        except ValueError:
+            raise ProtocolError("Unparseable bulk delete response.")
+        result.add(BulkDeleteResult.from_report(report))
+    return result
+
+
+def _delete_each(client, paths, concurrency):
+    """
+    Delete paths with one concurrent DELETE request apiece.
+    """
+
+    def delete(path):
+        return client._call('DELETE', '/' + path.lstrip('/'), accept_status=[404]).status_code
+
+    result = BulkDeleteResult()
+    for path, status, error in bounded_map(delete, paths, concurrency):
+        if error is not None:
+            result.errors.append((path, _describe(error)))
+        elif status == 404:
+            result.not_found += 1
+        else:
+            result.deleted += 1
+    return result
+
+
+def tar_stream(entries, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Generate an uncompressed tar archive from (name, content) entries on the fly.
+
+    Each "content" may be a buffer, which is emitted without copying, or a
+    file-like object whose remaining length can be determined, which is read
+    "chunk_size" bytes at a time. Only one chunk is held in memory at once.
+    """
+
+    # tarfile is only needed here, so it isn't imported along with Swiftest.
+    import tarfile
+
+    now = int(time.time())
+    for name, content in entries:
+        if is_buffer(content):
+            content = byte_view(content)
+            size = len(content)
+        else:
+            size = remaining_length(content)
+            if size is None:
+                raise ValueError("Can't determine the size of the content for {0}.".format(name))
+
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = now
+        yield info.tobuf(format=tarfile.PAX_FORMAT, encoding='utf-8', errors='strict')
+
+        if is_buffer(content):
+            for offset in range(0, size, chunk_size):
+                yield content[offset:offset + chunk_size]
+        else:
+            remaining = size
+            while remaining > 0:
+                chunk = content.read(min(chunk_size, remaining))
+                if not chunk:
+                    raise ValueError("Content for {0} ended {1} bytes early.".format(name, remaining))
+                remaining -= len(chunk)
+                yield chunk
+
+        if size % TAR_BLOCK_SIZE:
+            yield tarfile.NUL * (TAR_BLOCK_SIZE - size % TAR_BLOCK_SIZE)
+
+    # An archive ends with two zero blocks.
+    yield tarfile.NUL * (TAR_BLOCK_SIZE * 2)
+
+
+def gzip_stream(chunks, level=6):
+    """
+    Compress a stream of chunks into gzip format on the fly.
+    """
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def upload_archive(client, container_name, entries, compress=False, batch_size=None,
+                   concurrency=DEFAULT_UPLOAD_CONCURRENCY):
+    """
+    Create many objects within a container from (name, content) entries.
+
+    If the cluster advertises the bulk middleware, the entries are packed into
+    a tar stream as it's sent with a single extract-archive PUT per
+    "batch_size" entries (or per call, if no batch size is given), gzipped if
+    "compress" is set. Otherwise each entry is uploaded individually,
+    "concurrency" at a time. Return an ArchiveUploadResult.
+    """
+
+    if client.capabilities().get('bulk_upload') is None:
+        return _upload_each(client, container_name, entries, concurrency)
+
+    archive_format = 'tar.gz' if compress else 'tar'
+    groups = batches(entries, batch_size) if batch_size else [entries]
+
+    result = ArchiveUploadResult()
+    for group in groups:
+        body = tar_stream(group)
+        if compress:
+            body = gzip_stream(body)
+        r = client._call('PUT', '/' + container_name, params={'extract-archive': archive_format},
+            data=body, headers={'Accept': 'application/json'})
+        try:
+            report = r.json()
+        except ValueError:
+            raise ProtocolError("Unparseable extract-archive response.")
+        result.add(ArchiveUploadResult.from_report(report))
+    return result
+
+
+def _upload_each(client, container_name, entries, concurrency):
+    """
+    Upload entries with one concurrent PUT request apiece.
+    """
+
+    container = client.container(container_name)
+
+    def upload(entry):
+        name, content = entry
+        container.object(name).upload_stream(content)
+
+    result = ArchiveUploadResult()
+    for (name, _), _, error in bounded_map(upload, entries, concurrency):
+        if error is not None:
+            result.errors.append(('/{0}/{1}'.format(container_name, name), _describe(error)))
+        else:
+            result.created += 1
+    return result
+
+
+def _describe(error):
+    """
+    Summarize a failed request as an HTTP status line, like the bulk middleware reports.
+    """
+
+    response = getattr(error, 'response', None)
+    if response is None:
+        return repr(error)
+    return '{0} {1}'.format(response.status_code, response.reason)
@@ -0,0 +1,326 @@
+"""
+Remember the results of metadata HEAD requests for a short while, and the
+content of downloaded objects for as long as it remains unchanged.
+"""
+
+import json
+import os
+import threading
+
+from collections import namedtuple, OrderedDict
+from hashlib import sha1
+from tempfile import mkstemp
+
+from .compat import monotonic, replace
+from .transport import requests_module
+
+# Default number of seconds that a cached HEAD result remains valid.
+DEFAULT_TTL = 30.0
+
+# Default number of HEAD results to keep before evicting the least recently used.
+DEFAULT_MAXSIZE = 4096
+
+# Default number of bytes of object content to keep before evicting the least recently used.
+DEFAULT_CONTENT_BYTES = 64 * 1024 * 1024
+
+# Response headers that are remembered alongside cached content.
+CACHED_HEADERS = ('Content-Type', 'Content-Length', 'ETag', 'Last-Modified', 'X-Timestamp')
+
+
+class HeadResult(namedtuple('HeadResult', ['status_code', 'headers'])):
+    """
+    The parts of a HEAD response that metadata is read from.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_response(cls, response):
+        return cls(response.status_code, response.headers)
+
+
+class TTLCache(object):
+    """
+    A thread-safe, size-bounded LRU mapping whose entries expire after "ttl" seconds.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, maxsize=DEFAULT_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the live value stored at "key", or None.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= monotonic():
+                del self._entries[key]
+                return None
+            # Mark as most recently used.
+            del self._entries[key]
+            self._entries[key] = entry
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (monotonic() + self.ttl, value)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "<TTLCache(ttl={},maxsize={})>".format(self.ttl, self.maxsize)
+
+
+class ContentCache(object):
+    """
+    A thread-safe LRU store of object content, bounded to "max_bytes" in total.
+
+    Content is kept in memory, or in files within "directory" if one is given,
+    in which case it survives from one process to the next. Cached content is
+    always revalidated with a conditional GET before it's used, so it's never
+    stale: an unchanged object costs only a 304 response.
+
+    "hits" counts downloads answered from the cache, and "misses" those that
+    transferred the full body.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CONTENT_BYTES, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        # Maps each key to (headers, size, body). Bodies are None when stored on disk.
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if directory is not None:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            self._load()
+
+    def fetch(self, client, path, **kwargs):
+        """
+        GET "path" through "client", revalidating any cached copy of its content.
+
+        Return a requests Response whose content was read either from the
+        network or from this cache. Missing objects are forgotten.
+        """
+
+        entry = self._get(path)
+        given = kwargs.pop('headers', None) or {}
+        headers = dict(given)
+        if entry is not None:
+            cached_headers = entry[0]
+            if 'ETag' in cached_headers:
+                headers['If-None-Match'] = cached_headers['ETag']
+            if 'Last-Modified' in cached_headers:
+                headers['If-Modified-Since'] = cached_headers['Last-Modified']
+
+        try:
+            r = client._call('GET', path, accept_status=[304], headers=headers, **kwargs)
+        except requests_module().HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                self.invalidate(path)
+            raise
+
+        if r.status_code == 304:
+            body = self._body(path, entry)
+            if body is not None:
+                self._count(hit=True)
+                return _cached_response(r, entry[0], body)
+            # The cached body vanished since it was validated; fetch it again.
+            self.invalidate(path)
+            return self.fetch(client, path, headers=given, **kwargs)
+
+        self._count(hit=False)
+        self.set(path, r.headers, r.content)
+        return r
+
+    def set(self, key, headers, body):
+        """
+        Remember "body" and the cacheable subset of its response "headers" under "key".
+        """
+
+        headers = dict((name, headers[name]) for name in CACHED_HEADERS if name in headers)
+        if 'ETag' not in headers and 'Last-Modified' not in headers:
+            # Without a validator, the content could never be revalidated.
+            return
+        size = len(body)
+        if size > self.max_bytes:
+            self.invalidate(key)
+            return
+
+        staged = None
+        if self.directory is not None:
+            staged = self._stage(key, headers, body)
+            body = None
+
+        with self._lock:
+            if staged is not None:
+                # Files are swapped in under the lock, so a key's body, headers and entry all come from one writer.
+                self._commit(key, staged)
+            # Any files for "key" were just replaced with the new content, so only the old entry goes.
+            self._discard(key, remove_files=False)
+            self._entries[key] = (headers, size, body)
+            self.bytes += size
+            self._evict()
+
+    def invalidate(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._discard(key)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # Mark as most recently used.
+                del self._entries[key]
+                self._entries[key] = entry
+            return entry
+
+    def _body(self, key, entry):
+        headers, size, body = entry
+        if body is not None:
+            return body
+        try:
+            with open(self._filename(key) + '.body', 'rb') as f:
+                return f.read()
+        except (IOError, OSError):
+            return None
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def _discard(self, key, remove_files=True):
+        """
+        Remove "key", and its files if any unless "remove_files" is False. The lock must be held.
+        """
+
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry[1]
+        if self.directory is not None and remove_files:
+            for suffix in ('.body', '.json'):
+                try:
+                    os.remove(self._filename(key) + suffix)
+                except OSError:
+                    pass
+
+    def _evict(self):
+        """
+        Drop least recently used entries until the cache fits. The lock must be held.
+        """
+
+        while self.bytes > self.max_bytes and self._entries:
+            self._discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _filename(self, key):
+        return os.path.join(self.directory, sha1(key.encode('utf-8')).hexdigest())
+
+    def _stage(self, key, headers, body):
+        """
+        Write "body" and its index record to uniquely named temporary files. Return their paths.
+        """
+
+        body_fd, body_path = mkstemp(suffix='.tmp', dir=self.directory)
+        record_fd, record_path = mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(body_fd, 'wb') as f:
+                f.write(body)
+            with os.fdopen(record_fd, 'w') as f:
+                json.dump({'key': key, 'headers': headers}, f)
+        except BaseException:
+            os.remove(body_path)
+            os.remove(record_path)
+            raise
+        return body_path, record_path
+
+    def _commit(self, key, staged):
+        """
+        Move files written by _stage() into place for "key". The lock must be held.
+        """
+
+        filename = self._filename(key)
+        body_path, record_path = staged
+        replace(body_path, filename + '.body')
+        replace(record_path, filename + '.json')
+
+    def _load(self):
+        """
+        Rebuild the index from files left in "directory" by an earlier process.
+        """
+
+        found = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.json'):
+                continue
+            base = os.path.join(self.directory, filename[:-len('.json')])
+            try:
+                with open(base + '.json') as f:
+                    record = json.load(f)
+                stat = os.stat(base + '.body')
+            except (IOError, OSError, ValueError):
+                continue
+            found.append((stat.st_mtime, record['key'], record['headers'], stat.st_size))
+
+        with self._lock:
+            for _, key, headers, size in sorted(found):
+                self._entries[key] = (headers, size, None)
+                self.bytes += size
+            self._evict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "<ContentCache(bytes={},max_bytes={},hits={},misses={})>".format(
+            self.bytes, self.max_bytes, self.hits, self.misses)
+
+
+def _cached_response(not_modified, headers, body):
+    """
+    Build a 200 Response carrying cached content in place of a 304 response.
+    """
+
+    requests = requests_module()
+    r = requests.Response()
+    r.status_code = 200
+    r.reason = 'OK'
+    r.url = not_modified.url
+    r.request = not_modified.request
+    r.headers = requests.structures.CaseInsensitiveDict(headers)
+    r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+    r._content = body
+    return r
@@ -0,0 +1,27 @@
+"""
+Verify transferred data against the ETags that Swift reports.
+"""
+
+from .exception import ChecksumError
+
+
+def normalize_etag(etag):
+    """
+    Strip the quotes that Swift places around some ETags and lower-case the digest.
+    """
+
+    if etag is None:
+        return None
+    return etag.strip().strip('"').lower()
+
+
+def verify_etag(response, digest, description):
+    """
+    Raise a ChecksumError unless the response's ETag header matches a hex digest.
+
+    Responses without an ETag are accepted.
+    """
+
+    etag = normalize_etag(response.headers.get('ETag'))
+    if etag is not None and etag != digest.lower():
+        raise ChecksumError.mismatch(description, digest, etag)
@@ -1,10 +1,33 @@
-import requests
+import threading
 
 from .exception import ProtocolError
 from .account import Account
 from .container import Container
+from .transport import Transport, requests_module
+from .listing import iter_names, MAX_PAGE_SIZE
+from .retry import RetryPolicy, rewinder
+from .cache import HeadResult
+from .bulk import bulk_delete, MAX_BULK_DELETE, DEFAULT_DELETE_CONCURRENCY
+from .stats import scan_containers, DEFAULT_SCAN_CONCURRENCY
+from .metadata import update_metadata, DEFAULT_UPDATE_CONCURRENCY
+from .compat import urlsplit, monotonic
+from .metrics import RequestEvent, path_template, body_length
 
-class Client:
+def _received(method, r, stream):
+    """
+    Count the bytes received in a response's body.
+
+    Streamed bodies haven't been read yet, so their Content-Length is trusted.
+    """
+
+    if r is None or method == 'HEAD':
+        return 0
+    if not stream:
+        return len(r.content or b'')
+    length = r.headers.get('Content-Length')
+    return int(length) if length is not None else None
+
+class Client(object):
     """
     The main entry point into Swiftest.
 
@@ -14,25 +37,82 @@ class Client:
     account() or container().
     """
 
-    def __init__(self, endpoint, username, auth_key):
+    def __init__(self, endpoint, username, auth_key, transport=None, retry=None, metadata_cache=None,
+                 content_cache=None, instrument=None, rate_limit=None, concurrency_limit=None):
         """
         Construct a ready-to-use Client.
 
         Authenticate to the specified OpenStack endpoint. Remember the generated
         token and storage URL.
+
+        Every request is issued through "transport", which defaults to a new
+        Transport with a pool of keep-alive connections. Provide your own to
+        tune pool sizes or timeouts.
+
+        Transient failures are retried according to "retry", which defaults to
+        a RetryPolicy with jittered exponential backoff. Pass NO_RETRY to
+        disable retries.
+
+        Provide a TTLCache as "metadata_cache" to reuse the results of Account,
+        Container and object HEAD requests across instances until they expire.
+        Entries are keyed by full URL, so one TTLCache may be shared by Clients
+        for different accounts. Writes made through this Client invalidate the
+        affected entries.
+
+        Provide a ContentCache as "content_cache" to keep downloaded object
+        content and revalidate it with conditional GETs, so that unchanged
+        objects aren't transferred again.
+
+        Provide an Instrument, such as a MetricsAggregator, as "instrument" to
+        observe the method, status, latency, byte counts and retries of every
+        storage request.
+
+        Provide a TokenBucket as "rate_limit" to pace every storage request,
+        retries included, and an AdaptiveLimiter as "concurrency_limit" to
+        bound the requests in flight at once, shrinking the bound when the
+        cluster throttles or slows down and growing it as it recovers.
         """
 
         self.endpoint = endpoint
         self.username = username
+        self.transport = transport or Transport()
+        self.retry = retry or RetryPolicy()
+        self.metadata_cache = metadata_cache
+        self.content_cache = content_cache
+        self.instrument = instrument
+        self.rate_limit = rate_limit
+        self.concurrency_limit = concurrency_limit
+        self._auth_key = auth_key
+        self._auth_lock = threading.Lock()
+        self._capabilities = None
 
-        auth_headers = {'X-Auth-User': username, 'X-Auth-Key': auth_key}
-        auth_response = requests.get(self.endpoint, headers=auth_headers)
+        self._authenticate()
+
+    def _authenticate(self):
+        """
+        Authenticate, remembering a fresh token and storage URL.
+        """
+
+        auth_headers = {'X-Auth-User': self.username, 'X-Auth-Key': self._auth_key}
+        auth_response = self.transport.request('GET', self.endpoint, headers=auth_headers)
         auth_response.raise_for_status()
 
         # Read the storage URL and auth token from the response.
         self.storage_url = auth_response.headers['X-Storage-Url']
         self.auth_token = auth_response.headers['X-Auth-Token']
 
+    def _reauthenticate(self, stale_token):
+        """
+        Replace a token that the storage endpoint has rejected.
+
+        Only one thread authenticates at a time. Threads that were turned away
+        with the same stale token wait for it and then reuse its new token.
+        """
+
+        with self._auth_lock:
+            if self.auth_token == stale_token:
+                self._authenticate()
+
     def account(self):
         """
         Access metadata about your account.
@@ -50,44 +130,250 @@ class Client:
 
         try:
             return Container(self, name)
-        except requests.HTTPError as e:
+        except requests_module().HTTPError as e:
             if e.response.status_code == 404:
                 return NullContainer(self, name)
             else:
                 raise
 
-    def container_names(self):
+    def container_names(self, prefix=None, delimiter=None, marker=None, end_marker=None, limit=None):
         """
         List the names of Containers available in this account.
+
+        Accepts the same filters as iter_container_names().
         """
 
-        names = self._call(requests.get, '').text.split("\n")
-        return [name for name in names if name.strip()]
+        return list(self.iter_container_names(prefix=prefix, delimiter=delimiter,
+            marker=marker, end_marker=end_marker, limit=limit))
 
-    def containers(self):
+    def iter_container_names(self, prefix=None, delimiter=None, marker=None, end_marker=None,
+                             limit=None, page_size=MAX_PAGE_SIZE):
+        """
+        Lazily generate the names of Containers available in this account.
+
+        The listing is fetched "page_size" names at a time, so accounts of any
+        size are walked completely in constant memory. Restrict the listing
+        to names beginning with "prefix", or to names after "marker" and
+        before "end_marker". If a "delimiter" is given, names are rolled up
+        at its first occurrence after the prefix. Stop after "limit" names.
+        """
+
+        return iter_names(self, '', prefix=prefix, delimiter=delimiter, marker=marker,
+            end_marker=end_marker, limit=limit, page_size=page_size)
+
+    def containers(self, prefix=None, delimiter=None, marker=None, end_marker=None, limit=None):
         """
         Generate each existing Container.
+
+        Accepts the same filters as iter_container_names().
         """
 
-        for name in self.container_names():
+        for name in self.iter_container_names(prefix=prefix, delimiter=delimiter,
+                marker=marker, end_marker=end_marker, limit=limit):
             yield self.container(name)
 
+    def scan_containers(self, prefix=None, exact=False, concurrency=DEFAULT_SCAN_CONCURRENCY,
+                        page_size=MAX_PAGE_SIZE):
+        """
+        Measure every container in this account, or those beginning with "prefix".
+
+        Object counts and bytes used are taken from the JSON account listing,
+        so an account of any size is scanned in a request per "page_size"
+        containers. Listing counts may lag behind recent writes; set "exact"
+        to HEAD each container instead, "concurrency" at a time. Return a
+        ContainerStats, which stores the results in compact arrays and can
+        report totals and the largest containers.
+        """
+
+        return scan_containers(self, prefix=prefix, exact=exact, concurrency=concurrency, page_size=page_size)
+
+    def capabilities(self, refresh=False):
+        """
+        Discover the middleware and limits that the cluster advertises at its /info endpoint.
+
+        The result is remembered for the life of this Client unless "refresh"
+        is set. An empty dictionary is returned if the cluster doesn't publish
+        its capabilities.
+        """
+
+        if self._capabilities is None or refresh:
+            parts = urlsplit(self.storage_url)
+            root = parts.path.split('/v1')[0]
+            url = '{0}://{1}{2}/info'.format(parts.scheme, parts.netloc, root)
+            try:
+                r = self.transport.request('GET', url)
+                self._capabilities = r.json() if r.status_code == 200 else {}
+            except (requests_module().RequestException, ValueError):
+                self._capabilities = {}
+        return self._capabilities
+
+    def bulk_delete(self, paths, batch_size=MAX_BULK_DELETE, concurrency=DEFAULT_DELETE_CONCURRENCY):
+        """
+        Delete many objects, given an iterable of "container/object" paths.
+
+        Paths are batched into bulk-delete requests of up to "batch_size" each
+        when the cluster supports the bulk middleware, or deleted with
+        "concurrency" concurrent DELETE requests when it doesn't. Failures
+        don't stop the operation; return a BulkDeleteResult that reports the
+        number deleted, the number not found and any per-path errors.
+        """
+
+        return bulk_delete(self, paths, batch_size=batch_size, concurrency=concurrency)
+
+    def update_metadata(self, changes, concurrency=DEFAULT_UPDATE_CONCURRENCY):
+        """
+        Change the metadata of many containers or objects concurrently.
+
+        "changes" is an iterable of (target, values) tuples, where "target" is
+        a Container or SwiftestObject and "values" maps metadata keys to their
+        new values, or to None to delete them. Container updates are a single
+        POST each; object updates are a HEAD, to merge with the metadata that
+        the object already has, and a POST. Up to "concurrency" run at once.
+        Failures don't stop the operation; return a MetadataUpdateResult that
+        counts the targets updated and lists any per-target errors.
+        """
+
+        return update_metadata(changes, concurrency=concurrency)
+
     def _call(self, method, path, accept_status=[], **kwargs):
         """
         Perform an HTTP request against the storage endpoint.
 
-        Always include the auth token as a header and add "path" to the storage_url.
+        "method" is an HTTP verb like 'GET' or 'PUT'. Always include the auth
+        token as a header and add "path" to the storage_url.
+
+        If the token is rejected, authenticate again and repeat the request
+        once. Idempotent requests that fail with a connection error or a
+        transient 5xx status are retried according to this Client's retry
+        policy. Seekable upload bodies are rewound before each repeat; bodies
+        that can't be replayed, like generators, are never retried.
+
+        Report the request to this Client's instrument, if it has one.
+        """
+
+        if self.instrument is None:
+            return self._send(method, path, accept_status, kwargs, {})
+
+        start = monotonic()
+        data = kwargs.get('data')
+        sent = body_length(data)
+        state = {}
+        r, error = None, None
+        try:
+            r = self._send(method, path, accept_status, kwargs, state)
+            return r
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            r = getattr(error, 'response', None) if r is None else r
+            if sent is None:
+                sent = getattr(data, 'bytes', None)
+            self.instrument.request(RequestEvent(method, path, path_template(path),
+                r.status_code if r is not None else None, monotonic() - start,
+                sent, _received(method, r, kwargs.get('stream')), state.get('retries', 0), error))
+
+    def _send(self, method, path, accept_status, extra, state):
+        """
+        Perform a request on behalf of _call(), counting the times it's repeated in "state".
+        """
+
+        extra['headers'] = dict(extra.get('headers') or {})
+        rewind = rewinder(extra.get('data'))
+        attempt = 0
+        reauthenticated = False
+
+        while True:
+            state['retries'] = attempt + (1 if reauthenticated else 0)
+            token = self.auth_token
+            extra['headers']['X-Auth-Token'] = token
+            retry_after = None
+
+            try:
+                r = self._request(method, path, extra)
+            except (requests_module().ConnectionError, requests_module().Timeout):
+                if rewind is None or not self.retry.should_retry(method, attempt):
+                    raise
+            else:
+                status = r.status_code
+                if status < 400 or status in accept_status:
+                    return r
+
+                if status == 401 and not reauthenticated:
+                    reauthenticated = True
+                    self._reauthenticate(token)
+                    if rewind is None:
+                        r.raise_for_status()
+                    r.close()
+                    rewind()
+                    continue
+
+                if rewind is None or not self.retry.should_retry(method, attempt, status):
+                    r.raise_for_status()
+                retry_after = r.headers.get('Retry-After')
+                r.close()
+
+            self.retry.wait(attempt, retry_after)
+            attempt += 1
+            rewind()
+
+    def _request(self, method, path, extra):
+        """
+        Make a single attempt at a request, within this Client's rate and concurrency limits.
+        """
+
+        if self.rate_limit is not None:
+            self.rate_limit.acquire()
+
+        limiter = self.concurrency_limit
+        if limiter is None:
+            return self.transport.request(method, self.storage_url + path, **extra)
+
+        ticket = limiter.acquire()
+        status, elapsed = None, None
+        try:
+            r = self.transport.request(method, self.storage_url + path, **extra)
+            status = r.status_code
+            # Time spent sending a body says nothing about congestion, so only bodiless requests are timed.
+            if extra.get('data') is None:
+                elapsed = r.elapsed.total_seconds()
+            return r
+        finally:
+            limiter.release(ticket, status, elapsed)
+
+    def _head(self, path, accept_status=[], refresh=False):
+        """
+        HEAD "path" and return a HeadResult, consulting the metadata cache.
+
+        A fresh request is always made if "refresh" is set. Responses with an
+        accepted status, like a 404 for a missing container, are cached too.
+        """
+
+        cache = self.metadata_cache
+        if cache is not None and not refresh:
+            cached = cache.get(self.storage_url + path)
+            if cached is not None:
+                return cached
+
+        result = HeadResult.from_response(self._call('HEAD', path, accept_status=accept_status))
+        if cache is not None:
+            cache.set(self.storage_url + path, result)
+        return result
+
+    def _invalidate(self, path):
+        """
+        Forget any cached metadata for "path" after it has been modified.
+        """
+
+        if self.metadata_cache is not None:
+            self.metadata_cache.invalidate(self.storage_url + path)
+
+    def close(self):
+        """
+        Release every connection held by this Client's transport.
         """
 
-        extra = kwargs
-        if 'headers' in extra:
-            extra['headers']['X-Auth-Token'] = self.auth_token
-        else:
-            extra['headers'] = {'X-Auth-Token': self.auth_token}
-        r = method(self.storage_url + path, **extra)
-        if r.status_code not in accept_status:
-            r.raise_for_status()
-        return r
+        self.transport.close()
 
     def __repr__(self):
         cli_str = "<Client(endpoint='{}',username='{}',auth_key={})>"
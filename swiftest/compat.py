@@ -11,3 +11,46 @@ try:
 except NameError:
     # Python 3.3
     to_long = int
+
+import os
+import time
+
+try:
+    # Python 3.3
+    replace = os.replace
+except AttributeError:
+    # Python 2.7. rename() replaces an existing file everywhere but Windows.
+    replace = os.rename
+
+try:
+    # Python 3.3
+    monotonic = time.monotonic
+except AttributeError:
+    # Python 2.7
+    monotonic = time.time
+
+try:
+    # Python 3.3
+    from urllib.parse import quote, urlsplit
+except ImportError:
+    # Python 2.7
+    from urllib import quote
+    from urlparse import urlsplit
+
+try:
+    # Python 2.7
+    _intern = intern
+except NameError:
+    # Python 3.3
+    from sys import intern as _intern
+
+def intern(string):
+    """
+    Intern "string" so that equal names share one copy, passing through anything that can't be interned.
+    """
+
+    try:
+        return _intern(string)
+    except TypeError:
+        # Python 2.7 can't intern unicode, and None is common in listings.
+        return string
@@ -1,22 +1,32 @@
-import requests
-
 from .swiftest_object import SwiftestObject
 from .metadata import Metadata
 from .exception import ProtocolError, AlreadyExistsError, DoesNotExistError
-from .compat import to_long
+from .compat import to_long, intern
+from .listing import iter_names, iter_objects, MAX_PAGE_SIZE
+from .bulk import upload_archive, MAX_BULK_DELETE, DEFAULT_DELETE_CONCURRENCY, DEFAULT_UPLOAD_CONCURRENCY
+from .transfer import run_transfers, upload_path, download_path, copy_objects, DEFAULT_CONCURRENCY
+from .sync import sync_directory, UPLOAD
+from .fetch import fetch_objects, DEFAULT_FETCH_CONCURRENCY, DEFAULT_MAX_BYTES_IN_FLIGHT
 
-class Container:
+class Container(object):
 
     _METADATA_ATTRS = ('metadata', 'object_count', 'bytes_used')
 
+    _METADATA_PREFIX = 'Container'
+
+    __slots__ = ('name', 'client', '_fetched')
+
     def __init__(self, client, name):
         """
         Construct a Container with a provided name.
+
+        Like SwiftestObjects, Containers are slotted and keep fetched metadata
+        in a single tuple.
         """
 
-        self.name = name
+        self.name = intern(name)
         self.client = client
-        self._metadata_fetched = False
+        self._fetched = None
 
     def exists(self):
         try:
@@ -25,6 +35,16 @@ class Container:
         except DoesNotExistError:
             return False
 
+    def refresh(self):
+        """
+        Fetch this container's metadata again, bypassing the Client's metadata cache.
+
+        Raises a DoesNotExistError if the container doesn't exist.
+        """
+
+        self._fetch_metadata(refresh=True)
+        return self
+
     def create(self):
         """
         Create a container with this name.
@@ -59,6 +79,132 @@ class Container:
 
         return SwiftestObject(self.client, self.name, name)
 
+    def object_names(self, prefix=None, delimiter=None, marker=None, end_marker=None,
+                     limit=None, page_size=MAX_PAGE_SIZE):
+        """
+        Lazily generate the names of objects stored within this container.
+
+        The listing is fetched "page_size" names at a time, so containers of
+        any size are walked in constant memory. Restrict the listing to names
+        beginning with "prefix", or to names after "marker" and before
+        "end_marker"; pass the last name you've seen as "marker" to resume an
+        interrupted walk. If a "delimiter" is given, names are rolled up into
+        pseudo-directories at its first occurrence after the prefix. Stop
+        after "limit" names.
+
+        Raises a DoesNotExistError if this container doesn't exist.
+        """
+
+        return iter_names(self.client, self._endpoint(), prefix=prefix, delimiter=delimiter,
+            marker=marker, end_marker=end_marker, limit=limit, page_size=page_size)
+
+    def objects(self, prefix=None, delimiter=None, marker=None, end_marker=None,
+                limit=None, page_size=MAX_PAGE_SIZE):
+        """
+        Lazily generate an ObjectInfo for each object stored within this container.
+
+        Each record carries the object's name, bytes, hash, content_type and
+        last_modified as reported by a JSON listing; pseudo-directories rolled
+        up by a "delimiter" are generated as PseudoDirectory records instead.
+        Accepts the same arguments as object_names().
+        """
+
+        return iter_objects(self.client, self._endpoint(), prefix=prefix, delimiter=delimiter,
+            marker=marker, end_marker=end_marker, limit=limit, page_size=page_size)
+
+    def fetch_many(self, names, concurrency=DEFAULT_FETCH_CONCURRENCY, deadline=None,
+                   max_bytes=DEFAULT_MAX_BYTES_IN_FLIGHT):
+        """
+        Download the content of many objects within this container concurrently.
+
+        Generate a FetchResult for each of "names" as its GET completes, in
+        completion order rather than the order given. Up to "concurrency" GETs
+        share the Client's connection pool at once, and no more than
+        "max_bytes" of content is read ahead of the caller. Failures, like a
+        missing object, are reported on their own result without interrupting
+        the rest. If "deadline" is given, every object still outstanding after
+        that many seconds is reported with a DeadlineExceededError.
+
+        Collect the results into a dict to wait for all of them:
+
+            contents = dict((r.name, r.content) for r in container.fetch_many(names))
+        """
+
+        return fetch_objects(self, names, concurrency=concurrency, deadline=deadline, max_bytes=max_bytes)
+
+    def upload_files(self, pairs, concurrency=DEFAULT_CONCURRENCY, callback=None):
+        """
+        Upload many local files into this container concurrently.
+
+        "pairs" is an iterable of (local path, object name) tuples, consumed
+        lazily. Up to "concurrency" uploads run at once, sharing the Client's
+        connection pool; size its Transport's pool_size to match. "callback",
+        if provided, is called with each TransferResult as it completes.
+
+        Failed uploads don't interrupt the batch. Return a TransferReport with
+        per-item results and aggregate throughput.
+        """
+
+        def upload(path, name):
+            return upload_path(self, path, name)
+
+        return run_transfers(upload, pairs, concurrency, callback)
+
+    def download_files(self, pairs, concurrency=DEFAULT_CONCURRENCY, callback=None):
+        """
+        Download many objects from this container to local files concurrently.
+
+        "pairs" is an iterable of (local path, object name) tuples. Missing
+        parent directories are created. Otherwise behaves like upload_files().
+        """
+
+        def download(path, name):
+            return download_path(self, path, name)
+
+        return run_transfers(download, pairs, concurrency, callback)
+
+    def copy_objects(self, destination, prefix=None, rename=None, concurrency=DEFAULT_CONCURRENCY,
+                     callback=None):
+        """
+        Copy every object in this container, or those beginning with "prefix",
+        to the "destination" Container or container name.
+
+        Copies are made server-side, "concurrency" at a time, as the listing is
+        paged in. "rename", if provided, maps each source name to its
+        destination name. Return a TransferReport like upload_files().
+        """
+
+        return copy_objects(self, destination, self.objects(prefix=prefix), concurrency=concurrency,
+            rename=rename, callback=callback)
+
+    def move_objects(self, destination, prefix=None, rename=None, concurrency=DEFAULT_CONCURRENCY,
+                     callback=None):
+        """
+        Move objects to another container, like copy_objects(), deleting each
+        source object once its copy has been made. An object whose destination
+        is itself is left alone and reported as failed with a ValueError.
+        """
+
+        return copy_objects(self, destination, self.objects(prefix=prefix), concurrency=concurrency,
+            move=True, rename=rename, callback=callback)
+
+    def sync(self, root, direction=UPLOAD, prefix='', delete=False, concurrency=DEFAULT_CONCURRENCY,
+             index_path=None, callback=None):
+        """
+        Mirror the local directory at "root" into this container, transferring only differences.
+
+        Files are stored as objects named by their "/"-separated path relative
+        to "root", beneath "prefix". Pass direction=DOWNLOAD to mirror the
+        container into the directory instead, and "delete" to remove whatever
+        has no counterpart on the other side. Files are compared by size, then
+        by MD5; digests of local files are remembered in an index file, so
+        unchanged files aren't hashed again on later runs. Return a SyncReport.
+        Uploading from a "root" that isn't a directory raises a ValueError.
+        """
+
+        return sync_directory(self, root, direction=direction, prefix=prefix, delete=delete,
+            concurrency=concurrency, index_path=index_path, callback=callback)
+
     def delete(self):
         """
         Delete this container.
@@ -80,21 +226,57 @@ class Container:
         self._internal_delete()
         return self
 
+    def upload_archive(self, entries, compress=False, batch_size=None, concurrency=DEFAULT_UPLOAD_CONCURRENCY):
+        """
+        Create many small objects within this container in a single request.
+
+        "entries" is an iterable of (object name, content) tuples, where each
+        content is a bytes-like buffer or a file-like object of determinable
+        size. The entries are packed into a tar stream as it is sent, so memory
+        use stays bounded, and uploaded with one extract-archive PUT per
+        "batch_size" entries (or one in total, by default), gzip-compressed if
+        "compress" is set.
+
+        Clusters without the bulk middleware receive one PUT per entry,
+        "concurrency" at a time. Return an ArchiveUploadResult that counts the
+        objects created and lists any per-file errors.
+        """
+
+        return upload_archive(self.client, self.name, entries, compress=compress,
+            batch_size=batch_size, concurrency=concurrency)
+
+    def purge(self, batch_size=MAX_BULK_DELETE, concurrency=DEFAULT_DELETE_CONCURRENCY):
+        """
+        Delete every object within this container, then the container itself.
+
+        The object listing is streamed straight into Client.bulk_delete(), so
+        containers of any size are emptied in constant memory. If any object
+        can't be deleted, the container is left in place. Return the
+        BulkDeleteResult.
+        """
+
+        paths = ('{0}/{1}'.format(self.name, name) for name in self.object_names())
+        result = self.client.bulk_delete(paths, batch_size=batch_size, concurrency=concurrency)
+        if result.ok():
+            self.delete_if_necessary()
+        return result
+
     def __getattr__(self, attr_name):
         """
         Resolve this container's metadata properties if necessary.
         """
 
         if attr_name in Container._METADATA_ATTRS:
-            self._fetch_metadata()
-            return getattr(self, attr_name)
+            if self._fetched is None:
+                self._fetch_metadata()
+            return self._fetched[Container._METADATA_ATTRS.index(attr_name)]
         else:
             raise AttributeError("Attribute {0} does not exist in a Container.".format(attr_name))
 
     def __repr__(self):
         return "<Container(name={})>".format(self.name)
 
-    def _fetch_metadata(self):
+    def _fetch_metadata(self, refresh=False):
         """
         Fetch and populate this container's metadata attributes.
 
@@ -107,26 +289,33 @@ class Container:
             except ValueError:
                 raise ProtocolError("Non-integer received in header {}.".format(header_name))
             except KeyError:
-                raise ProtocolError("Missing expected header value {}.}".format(header_name))
+                raise ProtocolError("Missing expected header value {}.".format(header_name))
 
-        r = self.client._call(requests.head, '/' + self.name, accept_status=[404])
+        r = self.client._head(self._endpoint(), accept_status=[404], refresh=refresh)
         if r.status_code == 404:
             raise DoesNotExistError.container(self.name)
 
-        self.metadata = Metadata.from_response(self, r, 'Container')
-        self.object_count = long_header(r, 'X-Container-Object-Count')
-        self.bytes_used = long_header(r, 'X-Container-Bytes-Used')
+        # Ordered as _METADATA_ATTRS.
+        self._fetched = (Metadata.from_response(self, r, self._METADATA_PREFIX),
+            long_header(r, 'X-Container-Object-Count'), long_header(r, 'X-Container-Bytes-Used'))
 
     def _internal_delete(self):
         """
         Internal deletion method. Use delete() or delete_if_necessary().
         """
 
-        return self.client._call(requests.delete, '/' + self.name, accept_status=[404])
+        r = self.client._call('DELETE', self._endpoint(), accept_status=[404])
+        self.client._invalidate(self._endpoint())
+        return r
 
     def _internal_create(self):
         """
         Internal creation method. Use create() or create_if_necessary().
         """
 
-        return self.client._call(requests.put, '/' + self.name)
+        r = self.client._call('PUT', self._endpoint())
+        self.client._invalidate(self._endpoint())
+        return r
+
+    def _endpoint(self):
+        return '/' + self.name
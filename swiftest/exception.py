@@ -34,3 +34,34 @@ class DoesNotExistError(SwiftestError):
     @classmethod
     def container(cls, container_name):
         return cls._message("Container", container_name)
+
+    @classmethod
+    def object(cls, container_name, object_name):
+        return cls._message("Object", "{0}/{1}".format(container_name, object_name))
+
+class ChecksumError(ProtocolError):
+    """
+    The ETag reported by Swift doesn't match the checksum of the data that was sent or received.
+    """
+
+    @classmethod
+    def mismatch(cls, description, expected, actual):
+        return cls("Checksum mismatch for {0}: expected {1}, got {2}.".format(description, expected, actual))
+
+class PartialDownloadError(SwiftestError):
+    """
+    Some byte ranges of a ranged download could not be fetched.
+
+    "missing" lists the (offset, length) of each range that's still absent. Repeating the download to the same
+    destination refetches only those ranges.
+    """
+
+    def __init__(self, message, missing, cause=None):
+        SwiftestError.__init__(self, message)
+        self.missing = missing
+        self.cause = cause
+
+class DeadlineExceededError(SwiftestError):
+    """
+    An operation ran out of time before it could be completed.
+    """
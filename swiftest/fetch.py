@@ -0,0 +1,196 @@
+"""
+Download many small objects from a Container at once, as each one arrives.
+"""
+
+import threading
+
+from .compat import monotonic, to_long
+from .exception import DoesNotExistError, DeadlineExceededError
+
+# Default number of GETs to keep in flight at once.
+DEFAULT_FETCH_CONCURRENCY = 16
+
+# Default cap on the bytes of content being read or waiting to be handed over at once.
+DEFAULT_MAX_BYTES_IN_FLIGHT = 64 * 1024 * 1024
+
+
+class FetchResult(object):
+    """
+    The outcome of fetching a single object.
+
+    "content" is the object's bytes, or None if the fetch failed, in which
+    case "error" is the exception that it raised.
+    """
+
+    def __init__(self, name, content=None, elapsed=0.0, error=None):
+        self.name = name
+        self.content = content
+        self.elapsed = elapsed
+        self.error = error
+
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        outcome = "{} bytes".format(len(self.content)) if self.ok() else repr(self.error)
+        return "<FetchResult(name={},{})>".format(self.name, outcome)
+
+
+class ByteBudget(object):
+    """
+    Admit reservations of bytes until "limit" bytes are reserved at once.
+
+    A reservation larger than the whole budget is admitted only when nothing
+    else is reserved, so oversized objects are read one at a time rather
+    than never.
+    """
+
+    def __init__(self, limit):
+        if limit < 1:
+            raise ValueError("A ByteBudget's limit must be at least 1 byte.")
+        self.limit = limit
+        self.reserved = 0
+        self.closed = False
+        self._condition = threading.Condition()
+
+    def acquire(self, size, timeout=None):
+        """
+        Reserve "size" bytes, waiting up to "timeout" seconds for room.
+
+        Return False if time ran out or the budget was closed first.
+        """
+
+        size = min(size, self.limit)
+        expires = None if timeout is None else monotonic() + timeout
+        with self._condition:
+            while self.reserved and self.reserved + size > self.limit:
+                if self.closed:
+                    return False
+                remaining = None if expires is None else expires - monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self.reserved += size
+            return True
+
+    def release(self, size):
+        with self._condition:
+            self.reserved -= min(size, self.limit)
+            self._condition.notify_all()
+
+    def close(self):
+        """
+        Turn away every waiting and future reservation that doesn't fit.
+        """
+
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def __repr__(self):
+        return "<ByteBudget(limit={},reserved={})>".format(self.limit, self.reserved)
+
+
+def fetch_objects(container, names, concurrency=DEFAULT_FETCH_CONCURRENCY, deadline=None,
+                  max_bytes=DEFAULT_MAX_BYTES_IN_FLIGHT):
+    """
+    GET each of "names" from "container", "concurrency" at a time, generating a FetchResult as each completes.
+
+    An object's Content-Length is reserved from a budget of "max_bytes"
+    before its body is read, and given back as its result is generated;
+    objects of unknown length reserve the whole budget. Content is always
+    read from Swift, bypassing the Client's content cache. If "deadline"
+    seconds pass before every object has arrived, the fetches still
+    outstanding are abandoned and generated with a DeadlineExceededError.
+    """
+
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1.")
+
+    # Deferred like bounded_map's; see pool.
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+    client = container.client
+    budget = ByteBudget(max_bytes)
+    expires = None if deadline is None else monotonic() + deadline
+
+    def remaining():
+        return None if expires is None else expires - monotonic()
+
+    def expired(name):
+        return DeadlineExceededError("Gave up on {0}/{1} after {2} seconds.".format(
+            container.name, name, deadline))
+
+    def fetch(name):
+        start = monotonic()
+        left = remaining()
+        if left is not None and left <= 0:
+            raise expired(name)
+
+        kwargs = {'stream': True}
+        if left is not None:
+            kwargs['timeout'] = left
+        path = '/{0}/{1}'.format(container.name, name)
+        r = client._call('GET', path, accept_status=[404], **kwargs)
+        try:
+            if r.status_code == 404:
+                raise DoesNotExistError.object(container.name, name)
+
+            length = r.headers.get('Content-Length')
+            size = to_long(length) if length is not None else max_bytes
+            if not budget.acquire(size, remaining()):
+                raise expired(name)
+            try:
+                content = r.content
+            except BaseException:
+                budget.release(size)
+                raise
+            return content, size, monotonic() - start
+        finally:
+            r.close()
+
+    names = iter(names)
+    pending = {}
+    exhausted = False
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency * 2:
+                try:
+                    name = next(names)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(fetch, name)] = name
+
+            if not pending:
+                return
+
+            left = remaining()
+            done, _ = wait(pending, timeout=None if left is None else max(left, 0), return_when=FIRST_COMPLETED)
+            if not done:
+                # Out of time: abandon whatever is still running and report everything left over.
+                for future, name in list(pending.items()):
+                    future.cancel()
+                    yield FetchResult(name, elapsed=deadline, error=expired(name))
+                pending.clear()
+                for name in names:
+                    yield FetchResult(name, error=expired(name))
+                return
+
+            for future in done:
+                name = pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    yield FetchResult(name, error=error)
+                    continue
+                content, size, elapsed = future.result()
+                budget.release(size)
+                yield FetchResult(name, content, elapsed)
+    finally:
+        # Don't wait on abandoned fetches. Their requests are bounded by the deadline's timeout, and
+        # any that are waiting for room in the budget give up.
+        budget.close()
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
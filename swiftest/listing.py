@@ -0,0 +1,143 @@
+"""
+Walk account and container listings one page at a time.
+"""
+
+from collections import namedtuple
+
+from .compat import intern
+from .exception import DoesNotExistError
+
+# Swift never returns more than this many entries from a single listing request.
+MAX_PAGE_SIZE = 10000
+
+
+class ObjectInfo(namedtuple('ObjectInfo', ['name', 'bytes', 'hash', 'content_type', 'last_modified'])):
+    """
+    A single object as reported by a JSON container listing.
+
+    "last_modified" is left as the ISO 8601 string that Swift reports.
+    """
+
+    __slots__ = ()
+
+
+class PseudoDirectory(namedtuple('PseudoDirectory', ['name'])):
+    """
+    A common prefix rolled up by a delimited container listing.
+    """
+
+    __slots__ = ()
+
+
+def iter_names(client, path, prefix=None, delimiter=None, marker=None,
+               end_marker=None, limit=None, page_size=MAX_PAGE_SIZE):
+    """
+    Lazily generate every name in the plain-text listing found at "path".
+
+    Requests are issued with "marker" advanced to the last name seen, so
+    listings larger than Swift's per-request cap are walked completely while
+    holding only a single page in memory. Stop after "limit" names, if given.
+    """
+
+    def page(r):
+        return parse_names(r.text)
+
+    return _walk(client, path, page, lambda name: name, {'prefix': prefix, 'delimiter': delimiter},
+        marker, end_marker, limit, page_size)
+
+
+def iter_records(client, path, prefix=None, delimiter=None, marker=None,
+                 end_marker=None, limit=None, page_size=MAX_PAGE_SIZE):
+    """
+    Lazily generate the parsed entries of the JSON listing found at "path".
+
+    Each entry is yielded as the dictionary that Swift reports. Paging and
+    filtering behave as in iter_names().
+    """
+
+    def page(r):
+        if r.status_code == 204 or not r.content:
+            return []
+        return r.json()
+
+    params = {'prefix': prefix, 'delimiter': delimiter, 'format': 'json'}
+    return _walk(client, path, page, record_key, params, marker, end_marker, limit, page_size)
+
+
+def iter_objects(client, path, **kwargs):
+    """
+    Lazily generate ObjectInfo records for each object in a container listing.
+
+    Common prefixes produced by a "delimiter" are generated as PseudoDirectory
+    records instead. Accepts the same arguments as iter_records().
+    """
+
+    for entry in iter_records(client, path, **kwargs):
+        yield object_record(entry)
+
+
+def parse_names(text):
+    """
+    Split a plain-text listing into names.
+    """
+
+    return [name for name in text.split("\n") if name.strip()]
+
+
+def record_key(entry):
+    """
+    The name that a JSON listing entry should be resumed after.
+    """
+
+    return entry['subdir'] if 'subdir' in entry else entry['name']
+
+
+def object_record(entry):
+    """
+    Translate a JSON container listing entry into an ObjectInfo or PseudoDirectory.
+
+    Content types repeat across a listing, so each is interned rather than
+    kept once per record.
+    """
+
+    if 'subdir' in entry:
+        return PseudoDirectory(entry['subdir'])
+    return ObjectInfo(entry['name'], entry.get('bytes'), entry.get('hash'),
+        intern(entry.get('content_type')), entry.get('last_modified'))
+
+
+def page_query(params, marker, end_marker, request_size):
+    """
+    Build the query parameters for one page of a listing, omitting unset filters.
+    """
+
+    query = dict(params, limit=request_size, marker=marker, end_marker=end_marker)
+    return dict((k, v) for k, v in query.items() if v is not None)
+
+
+def _walk(client, path, page, key, params, marker, end_marker, limit, page_size):
+    """
+    Request successive pages of a listing until it's exhausted.
+
+    "page" parses a response into a list of entries and "key" extracts the
+    name that the next request's marker should resume after.
+    """
+
+    remaining = limit
+    while remaining is None or remaining > 0:
+        request_size = page_size if remaining is None else min(page_size, remaining)
+        r = client._call('GET', path, accept_status=[404],
+            params=page_query(params, marker, end_marker, request_size))
+        if r.status_code == 404:
+            raise DoesNotExistError.container(path.lstrip('/'))
+        entries = page(r)
+
+        for entry in entries:
+            yield entry
+        if remaining is not None:
+            remaining -= len(entries)
+
+        # A short page is the last one.
+        if len(entries) < request_size:
+            return
+        marker = key(entries[-1])
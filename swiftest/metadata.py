@@ -1,11 +1,30 @@
-import re
-import requests
+from .compat import monotonic
+from .pool import bounded_map
+
+# Default number of concurrent metadata updates made by update_metadata().
+DEFAULT_UPDATE_CONCURRENCY = 16
+
+# Header prefixes for each kind of metadata, keyed by the prefix given to Metadata.
+_HEADER_PREFIXES = {}
+
+
+def header_prefix(prefix):
+    """
+    Return the header name prefix, like "X-Container-Meta-", for metadata of the kind "prefix".
+    """
+
+    header = _HEADER_PREFIXES.get(prefix)
+    if header is None:
+        header = _HEADER_PREFIXES[prefix] = "X-{0}-Meta-".format(prefix)
+    return header
+
 
 class Metadata(dict):
     """
-    Provide dict-like access to account metadata.
+    Provide dict-like access to account, container or object metadata.
 
-    save() must be called to commit any changes.
+    save() must be called to commit any changes. Only the keys changed since
+    the last save() are sent, except for objects; see _save_headers().
     """
 
     def __init__(self, parent, prefix, existing):
@@ -21,12 +40,44 @@ class Metadata(dict):
         made to this dictionary.
         """
 
-        h = {}
-        for update in self.updates:
-            h["X-{0}-Meta-{1}".format(self.prefix, update)] = self[update]
+        if not self.changed():
+            return
+        path = self.parent._endpoint()
+        self.parent.client._call('POST', path, headers=self._save_headers())
+        self.parent.client._invalidate(path)
+        self._saved()
+
+    def changed(self):
+        """
+        Return True if there are changes that save() hasn't committed yet.
+        """
+
+        return bool(self.updates or self.deletions)
+
+    def _save_headers(self):
+        """
+        Produce the headers that commit the changes made to this dictionary.
+
+        An object POST replaces all of an object's metadata at once, so every
+        remaining value is sent for objects rather than only the changes.
+        """
+
+        header = header_prefix(self.prefix)
+        if self.prefix == 'Object':
+            return dict((header + key, value) for key, value in self.items())
+
+        h = dict((header + update, self[update]) for update in self.updates)
         for deletion in self.deletions:
-            h["X-{0}-Meta-{1}".format(self.prefix, deletion)] = ''
-        self.parent.client._call(requests.post, '', headers=h)
+            h[header + deletion] = ''
+        return h
+
+    def _saved(self):
+        """
+        Forget the changes that have just been committed.
+        """
+
+        self.updates.clear()
+        self.deletions.clear()
 
     def __setitem__(self, key, value):
         """
@@ -45,11 +96,19 @@ class Metadata(dict):
         Record the deletion of a value.
         """
 
+        if key.lower() not in self:
+            raise KeyError(key)
+        self.discard(key)
+
+    def discard(self, key):
+        """
+        Record the deletion of a value, whether or not it's present.
+        """
+
         lkey = key.lower()
-        dict.__delitem__(self, lkey)
+        dict.pop(self, lkey, None)
         self.deletions.add(lkey)
-        if key in self.updates:
-            self.updates.remove(lkey)
+        self.updates.discard(lkey)
 
     @classmethod
     def from_response(cls, parent, response, prefix):
@@ -57,11 +116,72 @@ class Metadata(dict):
         Populate Metadata from a GET or HEAD response.
         """
 
-        existing = {}
-        meta = re.compile("X-{0}-Meta-(.+)".format(prefix), re.IGNORECASE)
-        for (header, value) in response.headers.items():
-            match = meta.match(header)
-            if match:
-                existing[match.group(1).lower()] = value
+        start = header_prefix(prefix).lower()
+        n = len(start)
+        existing = dict((header[n:].lower(), value) for header, value in response.headers.items()
+            if len(header) > n and header.lower().startswith(start))
 
         return cls(parent, prefix, existing)
+
+
+class MetadataUpdateResult(object):
+    """
+    The aggregated outcome of updating the metadata of many containers or objects.
+
+    "errors" lists a (target, exception) tuple for each update that failed.
+    """
+
+    def __init__(self, updated=0, errors=None, elapsed=0.0):
+        self.updated = updated
+        self.errors = errors or []
+        self.elapsed = elapsed
+
+    def ok(self):
+        return not self.errors
+
+    def __repr__(self):
+        return "<MetadataUpdateResult(updated={},errors={})>".format(self.updated, len(self.errors))
+
+
+def apply_metadata(target, values):
+    """
+    Apply "values" to the metadata of the Account, Container or SwiftestObject "target" and save it.
+
+    Keys mapped to None are deleted. An object POST replaces all of its
+    metadata, so an object's current metadata is read first, bypassing the
+    metadata cache and any that "target" already holds, and merged; account
+    and container changes are sent as-is, without reading anything.
+    """
+
+    if target._METADATA_PREFIX == 'Object':
+        # Merging into stale metadata would silently revert whatever changed since it was read.
+        metadata = target.refresh().metadata
+    else:
+        metadata = Metadata(target, target._METADATA_PREFIX, {})
+
+    for key, value in values.items():
+        if value is None:
+            metadata.discard(key)
+        else:
+            metadata[key] = value
+    metadata.save()
+
+
+def update_metadata(changes, concurrency=DEFAULT_UPDATE_CONCURRENCY):
+    """
+    Apply many metadata changes, "concurrency" at a time.
+
+    "changes" is an iterable of (target, values) tuples, consumed lazily, as
+    accepted by apply_metadata(). Failures don't stop the rest. Return a
+    MetadataUpdateResult.
+    """
+
+    result = MetadataUpdateResult()
+    start = monotonic()
+    for (target, _), _, error in bounded_map(lambda change: apply_metadata(*change), changes, concurrency):
+        if error is None:
+            result.updated += 1
+        else:
+            result.errors.append((target, error))
+    result.elapsed = monotonic() - start
+    return result
@@ -0,0 +1,196 @@
+"""
+Observe every request that a Client makes, and aggregate what's observed.
+"""
+
+import threading
+
+from collections import namedtuple, deque
+
+from .streams import HashingStream
+
+# Default number of recent latencies kept per operation to compute percentiles from.
+DEFAULT_WINDOW = 10000
+
+# Percentiles reported by MetricsAggregator.summary().
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+class RequestEvent(namedtuple('RequestEvent', ['method', 'path', 'template', 'status', 'elapsed',
+                                               'bytes_sent', 'bytes_received', 'retries', 'error'])):
+    """
+    A single request made through Client._call(), including any retries.
+
+    "template" is the path with names replaced by placeholders, like
+    '/{container}/{object}'. "status" is None if no response was received.
+    "elapsed" counts every attempt and the backoff between them.
+    "bytes_received" is the declared Content-Length of streamed responses,
+    which are read after the request returns. Either byte count is None if
+    it can't be known, like the size of a generator body.
+    """
+
+    __slots__ = ()
+
+    @property
+    def operation(self):
+        """
+        Name the kind of request, like 'GET object' or 'HEAD container'.
+        """
+
+        return '{0} {1}'.format(self.method, TEMPLATE_SCOPES[self.template])
+
+
+# The path templates that Client requests fall into, and the resources they name.
+TEMPLATE_SCOPES = {
+    '/': 'account',
+    '/{container}': 'container',
+    '/{container}/{object}': 'object',
+}
+
+
+def path_template(path):
+    """
+    Replace the container and object names within a storage path with placeholders.
+    """
+
+    parts = path.lstrip('/').split('/', 1)
+    if not parts[0]:
+        return '/'
+    if len(parts) == 1:
+        return '/{container}'
+    return '/{container}/{object}'
+
+
+def body_length(data):
+    """
+    Determine the size of a request body before it's sent, or None if it can't be known yet.
+
+    HashingStreams count their bytes as they're read, so their size is only
+    known afterwards, from their "bytes" attribute.
+    """
+
+    if data is None:
+        return 0
+    if isinstance(data, HashingStream):
+        return None
+    if not isinstance(data, bytes) and hasattr(data, 'encode'):
+        data = data.encode('utf-8')
+    try:
+        return len(data)
+    except TypeError:
+        return None
+
+
+class Instrument(object):
+    """
+    Receives a RequestEvent as each Client request completes.
+
+    Subclass this and provide an instance to Client as "instrument".
+    Events are delivered on the thread that made the request.
+    """
+
+    def request(self, event):
+        pass
+
+
+class MetricsAggregator(Instrument):
+    """
+    An in-process Instrument that totals requests and latency percentiles per operation.
+
+    Percentiles are computed over the most recent "window" latencies of each
+    operation, so memory stays bounded however long the process runs.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, percentiles=DEFAULT_PERCENTILES):
+        self.window = window
+        self.percentiles = percentiles
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def request(self, event):
+        with self._lock:
+            stats = self._operations.get(event.operation)
+            if stats is None:
+                stats = self._operations[event.operation] = _OperationStats(self.window)
+            stats.add(event)
+
+    def summary(self):
+        """
+        Report each operation's totals and latency percentiles, in seconds.
+
+        Return a dictionary keyed by operation name, like 'GET object'.
+        """
+
+        with self._lock:
+            return dict((operation, stats.summary(self.percentiles))
+                        for operation, stats in self._operations.items())
+
+    def export(self, exporter, reset=False):
+        """
+        Hand the current summary() to "exporter", a callable, and return it.
+
+        Set "reset" to begin a fresh interval afterwards, as periodic exports
+        to a metrics system usually want.
+        """
+
+        summary = self.summary()
+        if reset:
+            self.reset()
+        exporter(summary)
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._operations = {}
+
+    def __repr__(self):
+        return "<MetricsAggregator(operations={})>".format(len(self._operations))
+
+
+class _OperationStats(object):
+    """
+    Running totals for a single operation. Not thread-safe on its own.
+    """
+
+    def __init__(self, window):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.total_elapsed = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def add(self, event):
+        self.count += 1
+        if event.error is not None:
+            self.errors += 1
+        self.retries += event.retries
+        self.bytes_sent += event.bytes_sent or 0
+        self.bytes_received += event.bytes_received or 0
+        self.total_elapsed += event.elapsed
+        self.latencies.append(event.elapsed)
+
+    def summary(self, percentiles):
+        ordered = sorted(self.latencies)
+        result = {
+            'count': self.count,
+            'errors': self.errors,
+            'retries': self.retries,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'mean': self.total_elapsed / self.count if self.count else 0.0,
+        }
+        for p in percentiles:
+            result['p{0}'.format(p)] = percentile(ordered, p)
+        return result
+
+
+def percentile(ordered, p):
+    """
+    Find the "p"th percentile of a sorted list by the nearest-rank method.
+    """
+
+    if not ordered:
+        return 0.0
+    rank = max(1, int(-(-p * len(ordered) // 100)))
+    return ordered[min(rank, len(ordered)) - 1]
@@ -0,0 +1,45 @@
+"""
+Run blocking Swift calls concurrently over a bounded pool of threads.
+"""
+
+
+def bounded_map(func, items, concurrency):
+    """
+    Call "func" on each of "items" using up to "concurrency" threads.
+
+    Generate an (item, result, error) tuple as each call completes. If a call
+    raises, "error" is the exception and "result" is None. Items are drawn
+    from the iterable lazily and no more than twice "concurrency" calls are
+    queued at once, so arbitrarily long streams are processed in constant
+    memory.
+    """
+
+    if concurrency < 1:
+        raise ValueError("Concurrency must be at least 1.")
+
+    # concurrent.futures pulls in logging and friends, so defer it until something runs concurrently.
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+    items = iter(items)
+    pending = {}
+    exhausted = False
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            while not exhausted and len(pending) < concurrency * 2:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(func, item)] = item
+
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                result = None if error is not None else future.result()
+                yield item, result, error
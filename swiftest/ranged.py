@@ -0,0 +1,211 @@
+"""
+Download large objects over several connections at once with Range requests.
+
+Each range is written at its own offset within a preallocated destination
+file. Progress is recorded in a small state file next to the destination so
+that an interrupted download can be resumed by refetching only the ranges
+that are still missing.
+"""
+
+import json
+import mmap
+import os
+import threading
+
+from hashlib import md5
+
+from .checksum import normalize_etag
+from .compat import to_long
+from .exception import ChecksumError, PartialDownloadError, ProtocolError
+from .pool import bounded_map
+from .segments import segment_ranges
+
+# Default size of each ranged GET, in bytes.
+DEFAULT_RANGE_SIZE = 64 * 1024 * 1024
+
+# Default number of ranges to fetch at once.
+DEFAULT_RANGE_CONCURRENCY = 4
+
+# Size of the reads used to copy each response body into place.
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Suffix of the file used to track which ranges have been written.
+STATE_SUFFIX = '.swiftest-ranges'
+
+
+class _FileWriter(object):
+    """
+    Write blocks at arbitrary offsets of an open file from many threads.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.lock = threading.Lock()
+
+    def write_at(self, offset, data):
+        if hasattr(os, 'pwrite'):
+            os.pwrite(self.f.fileno(), data, offset)
+        else:
+            with self.lock:
+                self.f.seek(offset)
+                self.f.write(data)
+
+    def close(self):
+        self.f.close()
+
+
+class _MmapWriter(object):
+    """
+    Write blocks at arbitrary offsets of a memory-mapped file.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.map = mmap.mmap(f.fileno(), 0)
+
+    def write_at(self, offset, data):
+        self.map[offset:offset + len(data)] = data
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self.f.close()
+
+
+class _State(object):
+    """
+    The persistent record of which ranges of a download are complete.
+    """
+
+    def __init__(self, path, etag, size, range_size):
+        self.path = path
+        self.etag = etag
+        self.size = size
+        self.range_size = range_size
+        self.done = set()
+        self.lock = threading.Lock()
+
+    def load(self, destination):
+        """
+        Adopt previously completed ranges, if the destination and recorded
+        progress belong to this same version of the object.
+        """
+
+        if not os.path.exists(self.path) or not os.path.exists(destination):
+            return
+        if os.path.getsize(destination) != self.size:
+            return
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (IOError, ValueError):
+            return
+        if (saved.get('etag'), saved.get('size'), saved.get('range_size')) == (self.etag, self.size, self.range_size):
+            self.done = set(saved.get('done', []))
+
+    def complete(self, index):
+        with self.lock:
+            self.done.add(index)
+            self.save()
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump({'etag': self.etag, 'size': self.size, 'range_size': self.range_size,
+                       'done': sorted(self.done)}, f)
+
+    def discard(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def download_ranged(obj, path, range_size=DEFAULT_RANGE_SIZE, concurrency=DEFAULT_RANGE_CONCURRENCY,
+                    use_mmap=False, verify=True):
+    """
+    Download a SwiftestObject to the file at "path" with concurrent Range GETs.
+
+    The object is HEADed for its size and ETag and the destination is
+    preallocated to that size. Up to "concurrency" ranges of "range_size"
+    bytes are then fetched at once, each written at its own offset, either
+    with positioned writes or, if "use_mmap" is set, through a memory map.
+    Every ranged GET is conditional on the ETag, so a concurrent overwrite of
+    the object is detected rather than producing a mixed file.
+
+    If any range fails, a PartialDownloadError listing the missing ranges is
+    raised; calling again with the same "path" fetches only those. Once
+    complete, the file's MD5 is checked against the ETag if "verify" is set
+    and the ETag is a plain content MD5 (large object manifests aren't).
+    """
+
+    head = obj.client._call('HEAD', obj._endpoint())
+    try:
+        size = to_long(head.headers['Content-Length'])
+    except (KeyError, ValueError):
+        raise ProtocolError("Missing or non-integer Content-Length in HEAD response.")
+    etag = normalize_etag(head.headers.get('ETag'))
+    is_manifest = 'X-Static-Large-Object' in head.headers or 'X-Object-Manifest' in head.headers
+
+    state = _State(path + STATE_SUFFIX, etag, size, range_size)
+    state.load(path)
+
+    ranges = segment_ranges(size, range_size)
+    missing = [(index, offset, length) for index, (offset, length) in enumerate(ranges)
+               if index not in state.done]
+
+    f = open(path, 'r+b' if state.done else 'w+b')
+    f.truncate(size)
+    if use_mmap and size > 0:
+        writer = _MmapWriter(f)
+    else:
+        writer = _FileWriter(f)
+
+    def fetch(item):
+        index, offset, length = item
+        headers = {'Range': 'bytes={0}-{1}'.format(offset, offset + length - 1)}
+        if etag:
+            headers['If-Match'] = etag
+        r = obj.client._call('GET', obj._endpoint(), headers=headers, stream=True)
+        try:
+            if r.status_code != 206 and not (r.status_code == 200 and offset == 0 and length == size):
+                raise ProtocolError("Unexpected status {0} for a ranged GET.".format(r.status_code))
+
+            position = offset
+            while position < offset + length:
+                block = r.raw.read(min(COPY_BUFFER_SIZE, offset + length - position))
+                if not block:
+                    break
+                writer.write_at(position, block)
+                position += len(block)
+            if position != offset + length:
+                raise ProtocolError("Short read for range starting at {0}.".format(offset))
+        finally:
+            r.close()
+        state.complete(index)
+
+    failures = []
+    try:
+        for item, _, error in bounded_map(fetch, missing, concurrency):
+            if error is not None:
+                failures.append((item, error))
+    finally:
+        writer.close()
+
+    if failures:
+        failures.sort()
+        gaps = [(offset, length) for (_, offset, length), _ in failures]
+        raise PartialDownloadError("{0} of {1} ranges could not be downloaded.".format(len(gaps), len(ranges)),
+            gaps, failures[0][1])
+
+    state.discard()
+
+    if verify and etag and not is_manifest:
+        digest = _file_md5(path)
+        if digest != etag:
+            raise ChecksumError.mismatch(obj._endpoint(), etag, digest)
+
+
+def _file_md5(path):
+    checksum = md5()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+            checksum.update(block)
+    return checksum.hexdigest()
@@ -0,0 +1,92 @@
+"""
+Decide when and how long to wait before retrying a failed request.
+"""
+
+import random
+import time
+
+from .compat import to_long
+
+# Methods that Swift treats as idempotent, so repeating them is always safe.
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'COPY'])
+
+# Response statuses that indicate a transient, server-side failure, or that the
+# cluster's ratelimit middleware wants the client to slow down (498 and 429).
+RETRY_STATUSES = frozenset([429, 498, 500, 502, 503, 504])
+
+
+class RetryPolicy(object):
+    """
+    Retry idempotent requests that fail transiently, with jittered exponential backoff.
+
+    The delay before retry "n" (counting from zero) is drawn uniformly from
+    zero to min(max_backoff, backoff * 2 ** n) seconds, unless the server
+    asks for a longer wait with a Retry-After header.
+    """
+
+    def __init__(self, max_retries=3, backoff=0.5, max_backoff=30.0,
+                 statuses=RETRY_STATUSES, methods=IDEMPOTENT_METHODS):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(methods)
+        self.sleep = time.sleep
+
+    def should_retry(self, method, attempt, status=None):
+        """
+        Determine whether a request that has failed "attempt" times should be retried.
+
+        "status" is the response status, or None if the request failed to
+        complete at all.
+        """
+
+        if attempt >= self.max_retries or method.upper() not in self.methods:
+            return False
+        return status is None or status in self.statuses
+
+    def delay(self, attempt, retry_after=None):
+        """
+        Compute the number of seconds to wait before the next attempt.
+        """
+
+        wait = random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+        if retry_after:
+            try:
+                wait = max(wait, min(self.max_backoff, float(to_long(retry_after))))
+            except ValueError:
+                # Retry-After may also be an HTTP date, which isn't worth parsing here.
+                pass
+        return wait
+
+    def wait(self, attempt, retry_after=None):
+        self.sleep(self.delay(attempt, retry_after))
+
+    def __repr__(self):
+        return "<RetryPolicy(max_retries={},backoff={})>".format(self.max_retries, self.backoff)
+
+
+# A policy that never retries.
+NO_RETRY = RetryPolicy(max_retries=0)
+
+
+def rewinder(data):
+    """
+    Produce a callable that restores an upload body to its current position before a retry.
+
+    Return None if the body can't be replayed, as with a generator.
+    """
+
+    if data is None or isinstance(data, (bytes, bytearray, memoryview, str, dict, list, tuple)):
+        return lambda: None
+    if hasattr(data, 'rewind'):
+        if not data.rewindable():
+            return None
+        return data.rewind
+    if hasattr(data, 'seek') and hasattr(data, 'tell'):
+        try:
+            position = data.tell()
+        except (IOError, OSError, ValueError):
+            return None
+        return lambda: data.seek(position)
+    return None
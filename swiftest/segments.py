@@ -0,0 +1,137 @@
+"""
+Upload files larger than Swift's single-object limit as Static Large Objects.
+
+The source file is divided into fixed-size segments, each uploaded
+concurrently as its own object within a segments container, then stitched
+together with an SLO manifest stored at the destination name.
+"""
+
+import json
+import os
+import time
+
+from hashlib import md5
+
+from .checksum import verify_etag
+from .pool import bounded_map
+
+# Default size of each segment, in bytes.
+DEFAULT_SEGMENT_SIZE = 128 * 1024 * 1024
+
+# Default number of segments to upload at once.
+DEFAULT_SEGMENT_CONCURRENCY = 4
+
+
+class FileSegment(object):
+    """
+    A read-only, file-like window onto a byte range of a file on disk.
+
+    Data is read from the file's own offsets as the HTTP layer asks for it, so
+    a segment is never buffered in memory as a whole. The MD5 digest of the
+    bytes read so far is maintained incrementally.
+    """
+
+    def __init__(self, path, offset, length):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self._file = None
+        self._remaining = length
+        self._md5 = md5()
+
+    def read(self, size=-1):
+        if self._file is None:
+            self._file = open(self.path, 'rb')
+            self._file.seek(self.offset)
+
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        chunk = self._file.read(size)
+        self._remaining -= len(chunk)
+        self._md5.update(chunk)
+        return chunk
+
+    def hexdigest(self):
+        return self._md5.hexdigest()
+
+    def rewindable(self):
+        return True
+
+    def rewind(self):
+        """
+        Return to the start of the segment and reset the digest.
+        """
+
+        if self._file is not None:
+            self._file.seek(self.offset)
+        self._remaining = self.length
+        self._md5 = md5()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return self.length
+
+
+def segment_ranges(size, segment_size):
+    """
+    Divide "size" bytes into a list of (offset, length) tuples.
+    """
+
+    return [(offset, min(segment_size, size - offset)) for offset in range(0, size, segment_size)]
+
+
+def upload_segmented(obj, path, segment_size=DEFAULT_SEGMENT_SIZE, segment_container=None,
+                     concurrency=DEFAULT_SEGMENT_CONCURRENCY, content_type=None):
+    """
+    Upload the file at "path" to a SwiftestObject as a Static Large Object.
+
+    Segments are stored within "segment_container", which defaults to the
+    object's container name suffixed with "_segments" and is created if
+    necessary. Each segment's ETag is checked as it completes. If any segment
+    fails, its error is raised before a manifest is written, leaving the
+    already uploaded segments in place.
+
+    Files no larger than a single segment are uploaded as ordinary objects.
+    """
+
+    size = os.path.getsize(path)
+    if size <= segment_size:
+        with open(path, 'rb') as f:
+            obj.upload_file(f)
+        return
+
+    segment_container = segment_container or obj.container_name + '_segments'
+    obj.client.container(segment_container).create_if_necessary()
+
+    base = '{0}/slo/{1:f}/{2}/{3}'.format(obj.name, time.time(), size, segment_size)
+    segments = [('{0}/{1:08d}'.format(base, index), offset, length)
+                for index, (offset, length) in enumerate(segment_ranges(size, segment_size))]
+
+    def upload(segment):
+        segment_name, offset, length = segment
+        segment_path = '/{0}/{1}'.format(segment_container, segment_name)
+        body = FileSegment(path, offset, length)
+        try:
+            r = obj.client._call('PUT', segment_path, data=body)
+        finally:
+            body.close()
+        verify_etag(r, body.hexdigest(), segment_path)
+        return body.hexdigest()
+
+    etags = {}
+    for segment, etag, error in bounded_map(upload, segments, concurrency):
+        if error is not None:
+            raise error
+        etags[segment[0]] = etag
+
+    manifest = [{'path': '/{0}/{1}'.format(segment_container, segment_name),
+                 'etag': etags[segment_name],
+                 'size_bytes': length} for segment_name, _, length in segments]
+
+    headers = {'Content-Type': content_type} if content_type else {}
+    obj.client._call('PUT', obj._endpoint(), params={'multipart-manifest': 'put'},
+        headers=headers, data=json.dumps(manifest))
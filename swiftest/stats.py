@@ -0,0 +1,124 @@
+"""
+Summarize the object counts and sizes of every container in an account.
+"""
+
+import heapq
+
+from array import array
+from collections import namedtuple
+
+from .compat import to_long
+from .exception import ProtocolError
+from .listing import iter_records, MAX_PAGE_SIZE
+from .pool import bounded_map
+
+# Default number of concurrent container HEADs made when the listing can't be used.
+DEFAULT_SCAN_CONCURRENCY = 16
+
+try:
+    array('q')
+    _INT_CODE = 'q'
+except ValueError:
+    # Python 2.7 has no 64-bit code; 'l' is 64 bits on most platforms that matter.
+    _INT_CODE = 'l'
+
+
+class ContainerStat(namedtuple('ContainerStat', ['name', 'count', 'bytes'])):
+    """
+    The object count and bytes used by a single container.
+    """
+
+    __slots__ = ()
+
+
+class ContainerStats(object):
+    """
+    Compact, array-backed statistics for many containers.
+
+    Each container costs a name and two machine integers rather than a full
+    Container. Iterate to generate ContainerStat records in the order they
+    were added: by scan_containers(), those read from the listing, in
+    listing order, then those that were HEADed, as each HEAD completed.
+    "errors" lists a (name, exception) tuple for each container that
+    couldn't be measured.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.counts = array(_INT_CODE)
+        self.bytes = array(_INT_CODE)
+        self.errors = []
+
+    def add(self, name, count, bytes_used):
+        self.names.append(name)
+        self.counts.append(count)
+        self.bytes.append(bytes_used)
+
+    @property
+    def total_count(self):
+        return sum(self.counts)
+
+    @property
+    def total_bytes(self):
+        return sum(self.bytes)
+
+    def top(self, n=10, by='bytes'):
+        """
+        Return a list of ContainerStat records for the "n" largest containers, by 'bytes' or by 'count'.
+        """
+
+        values = self.bytes if by == 'bytes' else self.counts
+        indices = heapq.nlargest(n, range(len(self.names)), key=values.__getitem__)
+        return [self[i] for i in indices]
+
+    def __getitem__(self, index):
+        return ContainerStat(self.names[index], self.counts[index], self.bytes[index])
+
+    def __iter__(self):
+        for i in range(len(self.names)):
+            yield self[i]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __repr__(self):
+        return "<ContainerStats(containers={},objects={},bytes={},errors={})>".format(
+            len(self), self.total_count, self.total_bytes, len(self.errors))
+
+
+def scan_containers(client, prefix=None, exact=False, concurrency=DEFAULT_SCAN_CONCURRENCY,
+                    page_size=MAX_PAGE_SIZE):
+    """
+    Gather the object count and bytes used of each container in the account.
+
+    Counts are read from the JSON account listing, a page of up to
+    "page_size" containers per request. Swift updates those counts
+    asynchronously, so set "exact" to HEAD every container instead,
+    bypassing the Client's metadata cache. Any
+    container that the listing doesn't report on is HEADed as well,
+    "concurrency" at a time. Return a ContainerStats.
+    """
+
+    stats = ContainerStats()
+    pending = []
+    for entry in iter_records(client, '', prefix=prefix, page_size=page_size):
+        if 'subdir' in entry:
+            continue
+        if exact or entry.get('count') is None or entry.get('bytes') is None:
+            pending.append(entry['name'])
+        else:
+            stats.add(entry['name'], entry['count'], entry['bytes'])
+
+    def head(name):
+        r = client._head('/' + name, refresh=exact)
+        try:
+            return to_long(r.headers['X-Container-Object-Count']), to_long(r.headers['X-Container-Bytes-Used'])
+        except (KeyError, ValueError):
+            raise ProtocolError("Missing or non-integer container statistics for {0}.".format(name))
+
+    for name, result, error in bounded_map(head, pending, concurrency):
+        if error is not None:
+            stats.errors.append((name, error))
+        else:
+            stats.add(name, result[0], result[1])
+    return stats
@@ -0,0 +1,201 @@
+"""
+Present upload sources to the HTTP layer, and read downloads back from it,
+without materializing or copying them.
+"""
+
+import os
+import stat
+
+from hashlib import md5
+
+# Default size of the chunks read from file-like upload sources.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def is_buffer(data):
+    return isinstance(data, (bytes, bytearray, memoryview))
+
+
+def byte_view(data):
+    """
+    Produce a flat, byte-formatted memoryview over any buffer without copying it.
+    """
+
+    view = memoryview(data)
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+    return view
+
+
+def read_into(source, view):
+    """
+    Fill a memoryview from a readable source with readinto() until it's full or the source is exhausted.
+
+    Return the number of bytes read.
+    """
+
+    filled = 0
+    while filled < len(view):
+        count = source.readinto(view[filled:])
+        if not count:
+            break
+        filled += count
+    return filled
+
+
+class BufferReader(object):
+    """
+    A file-like reader over an in-memory buffer.
+
+    Each read() returns a memoryview slice of the original buffer, so sending
+    a bytearray or memoryview never copies its contents.
+    """
+
+    def __init__(self, data):
+        self.view = byte_view(data)
+        self.position = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            end = len(self.view)
+        else:
+            end = min(len(self.view), self.position + size)
+        chunk = self.view[self.position:end]
+        self.position = end
+        return chunk
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self.position
+        elif whence == 2:
+            offset += len(self.view)
+        self.position = max(0, min(offset, len(self.view)))
+        return self.position
+
+    def __len__(self):
+        return len(self.view) - self.position
+
+
+class HashingStream(object):
+    """
+    A file-like upload body that computes its MD5 digest as it is sent.
+
+    "source" may be a buffer (bytes, bytearray or memoryview), which is sliced
+    without copying; a file-like object, which is read as the HTTP layer asks
+    for data; or any iterable of byte chunks. The body is never held in
+    memory as a whole.
+
+    When the source's remaining length can be determined it is reported by
+    len(), so the upload carries a Content-Length. Otherwise len() is zero
+    and the upload falls back to chunked transfer encoding. Reading the
+    stream is what feeds the digest, so hexdigest() is only meaningful once
+    the body has been sent.
+    """
+
+    def __init__(self, source, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.md5 = md5()
+        self.bytes = 0
+
+        self._start = None
+
+        if is_buffer(source):
+            self.source = BufferReader(source)
+            self.length = len(self.source)
+            self._start = 0
+        elif hasattr(source, 'read'):
+            self.source = source
+            self.length = remaining_length(source)
+            if hasattr(source, 'seek'):
+                try:
+                    self._start = source.tell()
+                except (AttributeError, IOError, OSError, ValueError):
+                    pass
+        else:
+            self.source = None
+            self.length = None
+            self._chunks = iter(source)
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.chunk_size
+
+        if self.source is None:
+            # Skip empty chunks, which would otherwise signal the end of the body.
+            chunk = next(self._chunks, None)
+            while chunk is not None and len(chunk) == 0:
+                chunk = next(self._chunks, None)
+            if chunk is None:
+                chunk = b''
+        else:
+            if self.length is not None:
+                size = min(size, self.length - self.bytes)
+            chunk = self.source.read(size) if size > 0 else b''
+
+        self.md5.update(chunk)
+        self.bytes += len(chunk)
+        return chunk
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def __len__(self):
+        if self.length is None:
+            return 0
+        return self.length - self.bytes
+
+    def __bool__(self):
+        # An unknown length is reported as zero, but the body is never falsy.
+        return True
+
+    __nonzero__ = __bool__
+
+    def hexdigest(self):
+        return self.md5.hexdigest()
+
+    def rewindable(self):
+        """
+        Determine whether this stream can be replayed from the start by rewind().
+        """
+
+        return self._start is not None
+
+    def rewind(self):
+        """
+        Seek the source back to where it started and reset the digest.
+        """
+
+        self.source.seek(self._start)
+        self.md5 = md5()
+        self.bytes = 0
+
+
+def remaining_length(f):
+    """
+    Determine how many bytes remain to be read from a file-like object, or None if it can't be known.
+    """
+
+    try:
+        position = f.tell()
+        info = os.fstat(f.fileno())
+        if stat.S_ISREG(info.st_mode):
+            return max(0, info.st_size - position)
+        return None
+    except (AttributeError, OSError, IOError, ValueError):
+        pass
+
+    try:
+        position = f.tell()
+        f.seek(0, 2)
+        end = f.tell()
+        f.seek(position)
+        return max(0, end - position)
+    except (AttributeError, OSError, IOError, ValueError):
+        return None
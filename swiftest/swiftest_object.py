@@ -2,24 +2,62 @@
 Download and upload individual OpenStack Swift objects.
 """
 
-import requests
 import shutil
 
 from hashlib import md5
 
-class SwiftestObject:
+from .checksum import verify_etag, normalize_etag
+from .compat import quote, to_long, intern
+from .exception import ProtocolError, DoesNotExistError
+from .metadata import Metadata
+from .ranged import download_ranged, DEFAULT_RANGE_SIZE, DEFAULT_RANGE_CONCURRENCY
+from .segments import upload_segmented, DEFAULT_SEGMENT_SIZE, DEFAULT_SEGMENT_CONCURRENCY
+from .streams import byte_view, read_into, BufferReader, HashingStream, DEFAULT_CHUNK_SIZE
+
+class SwiftestObject(object):
     """
     A single object stored within a Container.
 
     SwiftestObjects may represent a named object already uploaded to OpenStack
     Swift, or a potential object that can be uploaded with one of the "upload_"
     methods.
+
+    An object's size, etag, content_type, last_modified and metadata are
+    fetched with a HEAD request the first time that any of them is accessed.
+
+    Handles are slotted, keep fetched metadata in a single tuple and share
+    one interned copy of their container's name, so that millions of them
+    can be kept in memory at once.
     """
 
+    _METADATA_ATTRS = ('metadata', 'size', 'etag', 'content_type', 'last_modified')
+
+    _METADATA_PREFIX = 'Object'
+
+    __slots__ = ('client', 'container_name', 'name', '_fetched')
+
     def __init__(self, client, container_name, name):
         self.client = client
-        self.container_name = container_name
+        self.container_name = intern(container_name)
         self.name = name
+        self._fetched = None
+
+    def exists(self):
+        try:
+            self._fetch_metadata()
+            return True
+        except DoesNotExistError:
+            return False
+
+    def refresh(self):
+        """
+        Fetch this object's metadata again, bypassing the Client's metadata cache.
+
+        Raises a DoesNotExistError if the object doesn't exist.
+        """
+
+        self._fetch_metadata(refresh=True)
+        return self
 
     def download_string(self, encoding=None):
         """
@@ -27,10 +65,11 @@ class SwiftestObject:
 
         By default, the String's encoding will be inferred from header
         information by the underlying requests call, overridden by an
-        explicit encoding if one is provided.
+        explicit encoding if one is provided. Unchanged content is served from
+        the Client's content cache, if it has one.
         """
 
-        resp = self._content_resp()
+        resp = self._cached_content_resp()
         if encoding:
             resp.encoding = encoding
         return resp.text
@@ -38,9 +77,11 @@ class SwiftestObject:
     def download_binary(self):
         """
         Download this object's content as uninterpreted binary.
+
+        Unchanged content is served from the Client's content cache, if it has one.
         """
 
-        return self._content_resp().content
+        return self._cached_content_resp().content
 
     def download_file(self, io, buffer_size=None):
         """
@@ -56,27 +97,255 @@ class SwiftestObject:
         resp = self._content_resp(stream=True)
         shutil.copyfileobj(resp.raw, io, buffer_size)
 
+    def download_into(self, buffer):
+        """
+        Download this object's content directly into a writable buffer.
+
+        "buffer" may be a bytearray, mmap, writable memoryview or any other
+        object supporting the buffer protocol, such as a NumPy array. The
+        response is read into it with readinto(), without building an
+        intermediate bytes object. Raises a ValueError if the content doesn't
+        fit. Return the number of bytes written.
+        """
+
+        view = byte_view(buffer)
+        resp = self._content_resp(stream=True)
+        try:
+            length = resp.headers.get('Content-Length')
+            if length is not None and to_long(length) > len(view):
+                raise ValueError("{0} is {1} bytes, larger than the {2} byte buffer.".format(
+                    self._endpoint(), length, len(view)))
+
+            filled = read_into(resp.raw, view)
+            if filled == len(view) and resp.raw.read(1):
+                raise ValueError("{0} is larger than the {1} byte buffer.".format(self._endpoint(), len(view)))
+            return filled
+        finally:
+            resp.close()
+
+    def iter_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE, buffer=None):
+        """
+        Generate this object's content as memoryviews over a single reused buffer.
+
+        Each chunk is read into the same "chunk_size" bytearray, or into
+        "buffer" if one is provided, so a view is only valid until the next
+        chunk is requested; copy any data that must outlive it.
+        """
+
+        view = byte_view(buffer if buffer is not None else bytearray(chunk_size))
+        resp = self._content_resp(stream=True)
+        try:
+            while True:
+                filled = read_into(resp.raw, view)
+                if not filled:
+                    return
+                yield view[:filled]
+        finally:
+            resp.close()
+
+    def download_ranged(self, path, range_size=DEFAULT_RANGE_SIZE, concurrency=DEFAULT_RANGE_CONCURRENCY,
+                        use_mmap=False, verify=True):
+        """
+        Download this object to the file at "path" over several connections.
+
+        The destination is preallocated to the object's size, then "range_size"
+        byte ranges are fetched "concurrency" at a time and written at their
+        offsets, through a memory map if "use_mmap" is set. The completed file
+        is checked against the object's ETag unless "verify" is False.
+
+        If some ranges fail, a PartialDownloadError is raised; calling this
+        again with the same "path" refetches only the missing ranges.
+        """
+
+        download_ranged(self, path, range_size=range_size, concurrency=concurrency,
+            use_mmap=use_mmap, verify=verify)
+
     def upload_string(self, string):
         """
         Upload a String as the new content of this object.
+
+        bytes, bytearray and memoryview contents are sent without being copied.
         """
 
         # Compute the string's checksum.
-        checksum = md5(string).hexdigest()
-        self.client._call(requests.put, self._endpoint(), headers={'ETag': checksum}, data=string)
+        view = byte_view(string)
+        checksum = md5(view).hexdigest()
+        data = string if isinstance(string, bytes) else BufferReader(view)
+        self.client._call('PUT', self._endpoint(), headers={'ETag': checksum}, data=data)
+        self._modified()
 
     def upload_file(self, io):
         """
         Upload the contents of an open file.
+
+        The file is streamed and its checksum is verified against the ETag
+        that Swift reports; see upload_stream().
+        """
+
+        return self.upload_stream(io)
+
+    def upload_stream(self, source, chunk_size=DEFAULT_CHUNK_SIZE, content_type=None):
+        """
+        Stream the new content of this object from any source.
+
+        "source" may be an open file, any iterable of byte chunks (such as a
+        generator), or a bytes, bytearray or memoryview buffer. The body is
+        read as it is sent, so it never needs to be fully in memory; sources
+        of unknown length are sent with chunked transfer encoding. Its MD5 is
+        computed as each chunk is sent and compared with the ETag that Swift
+        returns; a ChecksumError is raised if they differ.
+
+        Return the hex MD5 digest of the uploaded content.
+        """
+
+        body = HashingStream(source, chunk_size)
+        headers = {'Content-Type': content_type} if content_type else {}
+        r = self.client._call('PUT', self._endpoint(), headers=headers, data=body)
+        self._modified()
+        verify_etag(r, body.hexdigest(), self._endpoint())
+        return body.hexdigest()
+
+    def upload_segmented(self, path, segment_size=DEFAULT_SEGMENT_SIZE, segment_container=None,
+                         concurrency=DEFAULT_SEGMENT_CONCURRENCY, content_type=None):
         """
+        Upload the file at "path" as a Static Large Object.
 
-        self.client._call(requests.put, self._endpoint(), data=io)
+        Use this for files beyond Swift's 5 GB single-object limit, or to spread
+        a large upload across several connections. The file is split into
+        "segment_size" segments that are uploaded "concurrency" at a time into
+        "segment_container", which defaults to this object's container name
+        suffixed with "_segments". Each segment is read straight from its file
+        offset and checked against the ETag that Swift reports, then an SLO
+        manifest is written to this object's name.
+        """
+
+        upload_segmented(self, path, segment_size=segment_size, segment_container=segment_container,
+            concurrency=concurrency, content_type=content_type)
+        self._modified()
+
+    def copy_to(self, container, name=None, headers=None):
+        """
+        Copy this object to another location within the cluster.
+
+        "container" may be a Container or a container name, and "name"
+        defaults to this object's own name. The copy is made by Swift itself
+        with a PUT and an X-Copy-From header, so no data passes through this
+        client. Extra "headers", such as a new Content-Type or X-Object-Meta-*
+        values, are applied to the copy. Return the new SwiftestObject.
+        """
+
+        container_name = getattr(container, 'name', container)
+        copy = SwiftestObject(self.client, container_name, name or self.name)
+
+        h = dict(headers or {})
+        h['X-Copy-From'] = quote(self._endpoint().encode('utf-8'))
+        h['Content-Length'] = '0'
+        self.client._call('PUT', copy._endpoint(), headers=h)
+        copy._modified()
+        return copy
+
+    def move_to(self, container, name=None, headers=None):
+        """
+        Move this object to another location within the cluster.
+
+        Performs a server-side copy_to() and then deletes this object. Return
+        the new SwiftestObject. Raises a ValueError, without making any
+        request, if the destination is this object itself.
+        """
+
+        container_name = getattr(container, 'name', container)
+        if (container_name, name or self.name) == (self.container_name, self.name):
+            raise ValueError("Can't move {0} onto itself.".format(self._endpoint()))
+
+        copy = self.copy_to(container, name, headers)
+        self.delete()
+        return copy
+
+    def delete(self):
+        """
+        Delete this object.
+
+        Raises a DoesNotExistError if this object doesn't exist to be deleted.
+        Use delete_if_necessary() for a more lenient deletion.
+        """
+
+        r = self._internal_delete()
+        if r.status_code == 404:
+            raise DoesNotExistError.object(self.container_name, self.name)
+        return self
+
+    def delete_if_necessary(self):
+        """
+        Delete this object if it exists.
+        """
 
+        self._internal_delete()
+        return self
+
+    def __getattr__(self, attr_name):
+        """
+        Resolve this object's metadata properties if necessary.
+        """
+
+        if attr_name in SwiftestObject._METADATA_ATTRS:
+            if self._fetched is None:
+                self._fetch_metadata()
+            return self._fetched[SwiftestObject._METADATA_ATTRS.index(attr_name)]
+        else:
+            raise AttributeError("Attribute {0} does not exist in a SwiftestObject.".format(attr_name))
+
+    def __repr__(self):
+        return "<SwiftestObject(container={},name={})>".format(self.container_name, self.name)
+
+    def _fetch_metadata(self, refresh=False):
+        """
+        Fetch and populate this object's metadata attributes.
+
+        Translate a 404 into a DoesNotExistError.
+        """
+
+        r = self.client._head(self._endpoint(), accept_status=[404], refresh=refresh)
+        if r.status_code == 404:
+            raise DoesNotExistError.object(self.container_name, self.name)
+
+        try:
+            size = to_long(r.headers['Content-Length'])
+        except ValueError:
+            raise ProtocolError("Non-integer received in header Content-Length.")
+        except KeyError:
+            raise ProtocolError("Missing expected header value Content-Length.")
+
+        # Ordered as _METADATA_ATTRS.
+        self._fetched = (Metadata.from_response(self, r, self._METADATA_PREFIX), size,
+            normalize_etag(r.headers.get('ETag')), r.headers.get('Content-Type'), r.headers.get('Last-Modified'))
+
+    def _modified(self):
+        """
+        Forget this object's metadata after its content has been replaced or removed.
+        """
+
+        self.client._invalidate(self._endpoint())
+        self._fetched = None
+
+    def _internal_delete(self):
+        """
+        Internal deletion method. Use delete() or delete_if_necessary().
+        """
+
+        r = self.client._call('DELETE', self._endpoint(), accept_status=[404])
+        self._modified()
+        return r
 
     def _content_resp(self, **kwargs):
-        return self.client._call(requests.get,
+        return self.client._call('GET',
             self._endpoint(),
             **kwargs)
 
+    def _cached_content_resp(self):
+        cache = self.client.content_cache
+        if cache is None:
+            return self._content_resp()
+        return cache.fetch(self.client, self._endpoint())
+
     def _endpoint(self):
         return '/{0}/{1}'.format(self.container_name, self.name)
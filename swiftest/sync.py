@@ -0,0 +1,270 @@
+"""
+Mirror a local directory tree into a Container, or a Container into a local directory.
+
+Only differences are transferred. Files and objects of different sizes are
+always transferred; those of equal size are compared by MD5, using digests
+remembered in an index file from earlier runs for local files whose size and
+modification time haven't changed.
+"""
+
+import json
+import os
+import threading
+
+from hashlib import md5
+
+from .checksum import normalize_etag
+from .compat import monotonic
+from .pool import bounded_map
+from .streams import DEFAULT_CHUNK_SIZE
+from .transfer import TransferResult, TransferReport, download_path, DEFAULT_CONCURRENCY
+
+# Copy local files into the container.
+UPLOAD = 'upload'
+
+# Copy objects into the local directory.
+DOWNLOAD = 'download'
+
+# The action recorded for a file and object found to be identical.
+SKIP = 'skip'
+
+# The action recorded for a file or object removed because its counterpart is gone.
+DELETE = 'delete'
+
+# Suffix appended to the synced directory's path to name its default index file.
+INDEX_SUFFIX = '.swiftest-index'
+
+
+class SyncResult(TransferResult):
+    """
+    The outcome of synchronizing a single file and object.
+
+    "action" is UPLOAD, DOWNLOAD, DELETE or SKIP.
+    """
+
+    def __init__(self, action, name, path, bytes=0, elapsed=0.0, error=None):
+        TransferResult.__init__(self, name, path, bytes=bytes, elapsed=elapsed, error=error)
+        self.action = action
+
+    def __repr__(self):
+        outcome = "ok" if self.ok() else repr(self.error)
+        return "<SyncResult({},name={},bytes={},{})>".format(self.action, self.name, self.bytes, outcome)
+
+
+class SyncReport(TransferReport):
+    """
+    Aggregate results of a synchronization, broken down by action.
+    """
+
+    def _with_action(self, action):
+        return [r for r in self.results if r.ok() and r.action == action]
+
+    @property
+    def uploaded(self):
+        return self._with_action(UPLOAD)
+
+    @property
+    def downloaded(self):
+        return self._with_action(DOWNLOAD)
+
+    @property
+    def deleted(self):
+        return self._with_action(DELETE)
+
+    @property
+    def skipped(self):
+        return self._with_action(SKIP)
+
+    def __repr__(self):
+        return "<SyncReport(uploaded={},downloaded={},deleted={},skipped={},failed={},bytes={})>".format(
+            len(self.uploaded), len(self.downloaded), len(self.deleted), len(self.skipped),
+            len(self.failed), self.bytes)
+
+
+class HashIndex(object):
+    """
+    MD5 digests of local files, each remembered with the size and mtime it was computed at.
+
+    The index is a JSON file mapping relative names to [size, mtime, digest].
+    Only entries looked up or recorded since it was loaded are written back
+    by save(), so files that have disappeared are forgotten.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}
+        self._live = {}
+        self._lock = threading.Lock()
+
+        try:
+            with open(path) as f:
+                self._entries = json.load(f)
+        except (IOError, OSError, ValueError):
+            pass
+
+    def digest(self, name, local_path):
+        """
+        Return the MD5 hex digest of the file at "local_path", hashing it only if it has changed.
+        """
+
+        st = os.stat(local_path)
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime:
+            with self._lock:
+                self._live[name] = entry
+            return entry[2]
+
+        h = md5()
+        with open(local_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(DEFAULT_CHUNK_SIZE), b''):
+                h.update(chunk)
+        self.record(name, local_path, h.hexdigest(), st)
+        return h.hexdigest()
+
+    def record(self, name, local_path, digest, st=None):
+        """
+        Remember the digest of a file that has just been written or read.
+        """
+
+        st = st or os.stat(local_path)
+        entry = [st.st_size, st.st_mtime, digest]
+        with self._lock:
+            self._entries[name] = entry
+            self._live[name] = entry
+
+    def forget(self, name):
+        with self._lock:
+            self._entries.pop(name, None)
+            self._live.pop(name, None)
+
+    def save(self):
+        """
+        Write the live entries back to the index file, replacing it atomically.
+        """
+
+        with self._lock:
+            entries = dict(self._live)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(entries, f)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        os.rename(temp_path, self.path)
+
+
+def local_files(root):
+    """
+    Map the "/"-separated relative name of every file beneath "root" to its size.
+    """
+
+    files = {}
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            local_path = os.path.join(directory, filename)
+            name = os.path.relpath(local_path, root).replace(os.sep, '/')
+            files[name] = os.path.getsize(local_path)
+    return files
+
+
+def sync_directory(container, root, direction=UPLOAD, prefix='', delete=False,
+                   concurrency=DEFAULT_CONCURRENCY, index_path=None, callback=None):
+    """
+    Make the objects beneath "prefix" in "container" match the directory at "root", or vice versa.
+
+    With the UPLOAD direction, new and changed files are uploaded and, if
+    "delete" is set, objects with no local counterpart are deleted. With
+    DOWNLOAD, new and changed objects are downloaded and, if "delete" is set,
+    local files with no object counterpart are removed.
+
+    The object listing is streamed and compared against a walk of "root".
+    Transfers and the hashing of equal-sized files run "concurrency" at a
+    time. Digests are kept in "index_path", which defaults to "root" with
+    INDEX_SUFFIX appended. Return a SyncReport; failures don't interrupt it.
+    Uploading raises a ValueError, before anything is listed, if "root"
+    isn't a directory.
+    """
+
+    if direction not in (UPLOAD, DOWNLOAD):
+        raise ValueError("Unknown sync direction {0}.".format(direction))
+
+    root = os.path.abspath(root)
+    if direction == DOWNLOAD and not os.path.isdir(root):
+        os.makedirs(root)
+    elif direction == UPLOAD and not os.path.isdir(root):
+        # A missing root would otherwise look empty, and "delete" would empty the container to match.
+        raise ValueError("Can't upload from {0}: it isn't a directory.".format(root))
+    index = HashIndex(index_path or root.rstrip(os.sep) + INDEX_SUFFIX)
+    local = local_files(root)
+
+    def local_path(name):
+        return os.path.join(root, *name.split('/'))
+
+    def actions():
+        for info in container.objects(prefix=prefix or None):
+            name = info.name[len(prefix):]
+            if not name or name.endswith('/'):
+                # Skip pseudo-directory marker objects.
+                continue
+            size = local.pop(name, None)
+            if size is None:
+                if direction == DOWNLOAD:
+                    yield DOWNLOAD, name, info
+                elif delete:
+                    yield DELETE, name, info
+            elif size != info.bytes:
+                yield direction, name, info
+            else:
+                yield SKIP, name, info
+
+        for name in sorted(local):
+            if direction == UPLOAD:
+                yield UPLOAD, name, None
+            elif delete:
+                yield DELETE, name, None
+
+    def run(action):
+        kind, name, info = action
+        start = monotonic()
+        path = local_path(name)
+        if not os.path.normpath(path).startswith(root + os.sep):
+            raise ValueError("Object name {0} falls outside of {1}.".format(prefix + name, root))
+        if kind == SKIP:
+            if index.digest(name, path) == normalize_etag(info.hash):
+                return SKIP, 0, monotonic() - start
+            kind = direction
+
+        if kind == UPLOAD:
+            with open(path, 'rb') as f:
+                digest = container.object(prefix + name).upload_stream(f)
+                size = f.tell()
+            index.record(name, path, digest)
+        elif kind == DOWNLOAD:
+            size = download_path(container, path, prefix + name)
+            index.record(name, path, normalize_etag(info.hash))
+        elif direction == UPLOAD:
+            container.object(prefix + name).delete_if_necessary()
+            size = 0
+        else:
+            os.remove(path)
+            index.forget(name)
+            size = 0
+        return kind, size, monotonic() - start
+
+    results = []
+    start = monotonic()
+    try:
+        for (kind, name, _), outcome, error in bounded_map(run, actions(), concurrency):
+            if error is None:
+                kind, size, elapsed = outcome
+                result = SyncResult(kind, prefix + name, local_path(name), bytes=size, elapsed=elapsed)
+            else:
+                result = SyncResult(direction if kind == SKIP else kind, prefix + name, local_path(name),
+                    error=error)
+            results.append(result)
+            if callback:
+                callback(result)
+    finally:
+        index.save()
+
+    return SyncReport(results, monotonic() - start)
@@ -0,0 +1,265 @@
+"""
+Unit tests for the asyncio client, run against an in-process aiohttp server.
+
+These use async syntax, so they're collected through test_aio only on
+interpreters that can compile them.
+"""
+
+import asyncio
+import json
+import tempfile
+import threading
+import unittest
+
+from hashlib import md5
+from io import BytesIO
+
+try:
+    from aiohttp import web, ClientResponseError
+    from aiohttp.test_utils import TestServer
+    from swiftest.aio import AsyncClient
+except ImportError:
+    web = None
+
+from swiftest.exception import AlreadyExistsError, ChecksumError, DoesNotExistError
+from swiftest.listing import ObjectInfo, PseudoDirectory
+
+
+class FakeSwift(object):
+    """
+    Just enough of the Swift API to exercise AsyncClient.
+    """
+
+    def __init__(self):
+        self.containers = {}
+        self.requests = []
+
+    def app(self):
+        app = web.Application()
+        app.router.add_route('GET', '/auth/v1.0', self.auth)
+        app.router.add_route('*', '/v1/acct', self.account)
+        app.router.add_route('*', '/v1/acct/{container}', self.container)
+        app.router.add_route('*', '/v1/acct/{container}/{obj:.+}', self.object)
+        return app
+
+    async def auth(self, request):
+        if request.headers.get('X-Auth-Key') != 'swordfish':
+            return web.Response(status=401)
+        storage = str(request.url.with_path('/v1/acct').with_query(None))
+        return web.Response(status=204, headers={'X-Auth-Token': 'token', 'X-Storage-Url': storage})
+
+    async def account(self, request):
+        self.requests.append(request)
+        if request.headers.get('X-Auth-Token') != 'token':
+            return web.Response(status=401)
+        if request.method == 'HEAD':
+            return web.Response(status=204, headers={
+                'X-Account-Container-Count': str(len(self.containers)),
+                'X-Account-Bytes-Used': '0',
+                'X-Account-Meta-Color': 'blue'})
+        return self._listing(request, sorted(self.containers))
+
+    async def container(self, request):
+        self.requests.append(request)
+        name = request.match_info['container']
+        if request.method == 'PUT':
+            existed = name in self.containers
+            self.containers.setdefault(name, {})
+            return web.Response(status=202 if existed else 201)
+        if name not in self.containers:
+            return web.Response(status=404)
+        if request.method == 'DELETE':
+            del self.containers[name]
+            return web.Response(status=204)
+        if request.method == 'HEAD':
+            objects = self.containers[name]
+            return web.Response(status=204, headers={
+                'X-Container-Object-Count': str(len(objects)),
+                'X-Container-Bytes-Used': str(sum(len(v) for v in objects.values()))})
+        if request.method == 'POST':
+            return web.Response(status=204)
+        objects = self.containers[name]
+        if request.query.get('format') == 'json':
+            return self._json_listing(request, objects)
+        return self._listing(request, sorted(objects))
+
+    async def object(self, request):
+        self.requests.append(request)
+        container = self.containers.setdefault(request.match_info['container'], {})
+        name = request.match_info['obj']
+        if request.method == 'PUT':
+            body = await request.read()
+            container[name] = body
+            return web.Response(status=201, headers={'ETag': md5(body).hexdigest()})
+        if name not in container:
+            return web.Response(status=404)
+        return web.Response(body=container[name], headers={'ETag': md5(container[name]).hexdigest()})
+
+    def _page(self, request, names):
+        marker = request.query.get('marker', '')
+        prefix = request.query.get('prefix', '')
+        limit = int(request.query.get('limit', 10000))
+        return [n for n in names if n > marker and n.startswith(prefix)][:limit]
+
+    def _listing(self, request, names):
+        page = self._page(request, names)
+        return web.Response(status=200 if page else 204, text="\n".join(page))
+
+    def _json_listing(self, request, objects):
+        page = [{'name': n, 'bytes': len(objects[n]), 'hash': md5(objects[n]).hexdigest(),
+                 'content_type': 'application/octet-stream', 'last_modified': '2013-08-01T00:00:00.000000'}
+                for n in self._page(request, sorted(objects))]
+        return web.Response(status=200, text=json.dumps(page), content_type='application/json')
+
+
+@unittest.skipIf(web is None, "aiohttp is not installed")
+class AsyncClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.swift = FakeSwift()
+
+    def run_with_client(self, test, auth_key='swordfish'):
+        async def run():
+            server = TestServer(self.swift.app())
+            await server.start_server()
+            try:
+                async with AsyncClient(endpoint=str(server.make_url('/auth/v1.0')),
+                        username='me', auth_key=auth_key) as cli:
+                    return await test(cli)
+            finally:
+                await server.close()
+        return asyncio.run(run())
+
+    def test_authenticate(self):
+        async def test(cli):
+            self.assertEqual('token', cli.auth_token)
+            self.assertTrue(cli.storage_url.endswith('/v1/acct'))
+        self.run_with_client(test)
+
+    def test_authentication_failure(self):
+        async def test(cli):
+            self.fail('Did not raise an error with bad credentials')
+        self.assertRaises(ClientResponseError, self.run_with_client, test, auth_key='bad')
+
+    def test_reauthenticate_on_rejected_token(self):
+        async def test(cli):
+            cli.auth_token = 'expired'
+            account = await cli.account()
+            self.assertEqual('token', cli.auth_token)
+            self.assertEqual(0, account.container_count)
+        self.run_with_client(test)
+
+    def test_account_metadata(self):
+        self.swift.containers = {'a': {}, 'b': {}}
+
+        async def test(cli):
+            account = await cli.account()
+            self.assertEqual(2, account.container_count)
+            self.assertEqual('blue', account.metadata['color'])
+
+            account.metadata['size'] = 'large'
+            await account.metadata.save()
+            self.assertEqual('large', self.swift.requests[-1].headers['X-Account-Meta-Size'])
+        self.run_with_client(test)
+
+    def test_container_lifecycle(self):
+        async def test(cli):
+            c = cli.container('contname')
+            self.assertFalse(await c.exists())
+            await c.create()
+            with self.assertRaises(AlreadyExistsError):
+                await c.create()
+            self.assertTrue(await c.exists())
+            self.assertEqual(0, c.object_count)
+            await c.delete()
+            with self.assertRaises(DoesNotExistError):
+                await c.delete()
+        self.run_with_client(test)
+
+    def test_paginated_listings(self):
+        self.swift.containers = dict(('c{0:02d}'.format(i), {}) for i in range(7))
+        self.swift.containers['c03'] = {'dir/a': b'aa', 'dir/b': b'bbb', 'top': b'x'}
+
+        async def test(cli):
+            names = [n async for n in cli.iter_container_names(page_size=3)]
+            self.assertEqual(sorted(self.swift.containers), names)
+            self.assertEqual(['c01', 'c02'], await cli.container_names(prefix='c0', marker='c00', limit=2))
+
+            c = cli.container('c03')
+            objects = [o async for o in c.objects(page_size=2)]
+            self.assertEqual(ObjectInfo('dir/b', 3, md5(b'bbb').hexdigest(), 'application/octet-stream',
+                '2013-08-01T00:00:00.000000'), objects[1])
+            self.assertEqual(['dir/a', 'dir/b'], [n async for n in c.object_names(prefix='dir/')])
+        self.run_with_client(test)
+
+    def test_missing_container_listing(self):
+        async def test(cli):
+            with self.assertRaises(DoesNotExistError):
+                [o async for o in cli.container('missing').objects()]
+        self.run_with_client(test)
+
+    def test_upload_and_download(self):
+        async def test(cli):
+            o = cli.container('contname').object('path/to/obj')
+            await o.upload_string(bytearray(b'object content'))
+            self.assertEqual(md5(b'object content').hexdigest(), self.swift.requests[-1].headers['ETag'])
+
+            self.assertEqual(b'object content', await o.download_binary())
+            self.assertEqual(u'object content', await o.download_string(encoding='utf-8'))
+
+            chunks = [bytes(c) async for c in o.iter_content(chunk_size=4)]
+            self.assertEqual(b'object content', b''.join(chunks))
+
+            dest = BytesIO()
+            await o.download_file(dest)
+            self.assertEqual(b'object content', dest.getvalue())
+        self.run_with_client(test)
+
+    def test_upload_stream(self):
+        async def generate():
+            yield b'streamed '
+            yield b'content'
+
+        async def test(cli):
+            o = cli.container('contname').object('streamed')
+            digest = await o.upload_stream(generate())
+            self.assertEqual(md5(b'streamed content').hexdigest(), digest)
+            self.assertEqual(b'streamed content', self.swift.containers['contname']['streamed'])
+
+            await o.upload_stream(BytesIO(b'from a file'))
+            self.assertEqual(b'from a file', self.swift.containers['contname']['streamed'])
+        self.run_with_client(test)
+
+    def test_upload_stream_reads_files_off_the_loop(self):
+        readers = []
+
+        class RecordingFile(BytesIO):
+            def read(self, size=-1):
+                readers.append(threading.current_thread())
+                return BytesIO.read(self, size)
+
+        async def test(cli):
+            o = cli.container('contname').object('fromfile')
+            with tempfile.TemporaryFile() as f:
+                f.write(b'on disk')
+                f.seek(0)
+                digest = await o.upload_stream(f, chunk_size=3)
+            self.assertEqual(md5(b'on disk').hexdigest(), digest)
+            self.assertEqual(b'on disk', self.swift.containers['contname']['fromfile'])
+
+            await o.upload_stream(RecordingFile(b'recorded'), chunk_size=3)
+            self.assertEqual(b'recorded', self.swift.containers['contname']['fromfile'])
+            self.assertTrue(readers)
+            self.assertNotIn(threading.current_thread(), readers)
+        self.run_with_client(test)
+
+    def test_upload_stream_checksum_mismatch(self):
+        async def corrupt(request):
+            await request.read()
+            return web.Response(status=201, headers={'ETag': md5(b'other').hexdigest()})
+        self.swift.object = corrupt
+
+        async def test(cli):
+            with self.assertRaises(ChecksumError):
+                await cli.container('contname').object('obj').upload_stream([b'data'])
+        self.run_with_client(test)
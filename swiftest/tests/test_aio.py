@@ -0,0 +1,11 @@
+"""
+Collect the asyncio client's tests on interpreters that support them.
+
+swiftest.aio relies on async and await, which Python 2.7 and 3.3 can't
+compile, so its tests live in aio_cases and are only imported on 3.6+.
+"""
+
+import sys
+
+if sys.version_info >= (3, 6):
+    from .aio_cases import *
@@ -0,0 +1,75 @@
+"""
+Unit tests for the bulk middleware helpers.
+"""
+
+import gzip
+import tarfile
+import unittest
+
+from io import BytesIO
+
+from swiftest.bulk import tar_stream, gzip_stream, batches, BulkDeleteResult, ArchiveUploadResult
+from swiftest.exception import ProtocolError
+
+class BulkTest(unittest.TestCase):
+
+    def _entries(self):
+        return [('small.txt', b'tiny'),
+                ('dir/exact.bin', bytearray(b'x' * 512)),
+                ('from-file.txt', BytesIO(b'file content')),
+                (u'unicodé/' + 'n' * 120, memoryview(b'long name'))]
+
+    def _members(self, archive):
+        with tarfile.open(fileobj=BytesIO(archive)) as tar:
+            return dict((m.name, tar.extractfile(m).read()) for m in tar.getmembers())
+
+    def test_tar_stream(self):
+        archive = b''.join(bytes(chunk) for chunk in tar_stream(self._entries(), chunk_size=100))
+
+        self.assertEqual(0, len(archive) % 512)
+        members = self._members(archive)
+        self.assertEqual(b'tiny', members['small.txt'])
+        self.assertEqual(b'x' * 512, members['dir/exact.bin'])
+        self.assertEqual(b'file content', members['from-file.txt'])
+        self.assertEqual(b'long name', members[u'unicodé/' + 'n' * 120])
+
+    def test_tar_stream_is_incremental(self):
+        consumed = []
+        def entries():
+            for i in range(1000):
+                consumed.append(i)
+                yield ('obj{0}'.format(i), b'data')
+
+        stream = tar_stream(entries())
+        next(stream)
+        self.assertEqual([0], consumed)
+
+    def test_tar_stream_unsized_content(self):
+        class Pipe(object):
+            def read(self, size=-1):
+                return b''
+
+        self.assertRaises(ValueError, list, tar_stream([('pipe', Pipe())]))
+
+    def test_gzip_stream(self):
+        archive = b''.join(gzip_stream(bytes(chunk) for chunk in tar_stream(self._entries())))
+        members = self._members(gzip.GzipFile(fileobj=BytesIO(archive)).read())
+        self.assertEqual(b'tiny', members['small.txt'])
+
+    def test_batches(self):
+        self.assertEqual([[0, 1, 2], [3, 4]], list(batches(range(5), 3)))
+        self.assertEqual([], list(batches([], 3)))
+
+    def test_parse_reports(self):
+        result = BulkDeleteResult.from_report({'Response Status': '400 Bad Request', 'Number Deleted': 3,
+            'Number Not Found': 1, 'Errors': [['/cont/obj', '409 Conflict']]})
+        self.assertEqual((3, 1), (result.deleted, result.not_found))
+        self.assertEqual([('/cont/obj', '409 Conflict')], result.errors)
+
+        upload = ArchiveUploadResult.from_report({'Response Status': '201 Created', 'Number Files Created': 4,
+            'Errors': []})
+        self.assertEqual(4, upload.created)
+        self.assertTrue(upload.ok())
+
+        self.assertRaises(ProtocolError, ArchiveUploadResult.from_report,
+            {'Response Status': '413 Request Entity Too Large', 'Errors': []})
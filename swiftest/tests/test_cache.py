@@ -0,0 +1,146 @@
+"""
+Unit tests for the TTLCache and ContentCache classes.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from swiftest import cache
+from swiftest.cache import TTLCache, ContentCache
+
+class TTLCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.original_monotonic = cache.monotonic
+        cache.monotonic = lambda: self.now
+
+    def test_get_and_set(self):
+        c = TTLCache(ttl=10)
+        self.assertIsNone(c.get('/contname'))
+        c.set('/contname', 'result')
+        self.assertEqual('result', c.get('/contname'))
+
+    def test_expiry(self):
+        c = TTLCache(ttl=10)
+        c.set('/contname', 'result')
+        self.now += 9.9
+        self.assertEqual('result', c.get('/contname'))
+        self.now += 0.1
+        self.assertIsNone(c.get('/contname'))
+        self.assertEqual(0, len(c))
+
+    def test_lru_eviction(self):
+        c = TTLCache(ttl=10, maxsize=2)
+        c.set('a', 1)
+        c.set('b', 2)
+        c.get('a')
+        c.set('c', 3)
+
+        self.assertEqual(1, c.get('a'))
+        self.assertIsNone(c.get('b'))
+        self.assertEqual(3, c.get('c'))
+
+    def test_invalidate(self):
+        c = TTLCache()
+        c.set('a', 1)
+        c.set('b', 2)
+        c.invalidate('a')
+        c.invalidate('missing')
+        self.assertIsNone(c.get('a'))
+        c.clear()
+        self.assertEqual(0, len(c))
+
+    def tearDown(self):
+        cache.monotonic = self.original_monotonic
+
+class ContentCacheTest(unittest.TestCase):
+
+    headers = {'ETag': 'abc', 'Content-Type': 'text/plain', 'X-Trans-Id': 'tx123'}
+
+    def test_set_and_get(self):
+        c = ContentCache()
+        c.set('/contname/obj', self.headers, b'content')
+        headers, size, body = c._get('/contname/obj')
+        self.assertEqual({'ETag': 'abc', 'Content-Type': 'text/plain'}, headers)
+        self.assertEqual((7, b'content'), (size, body))
+        self.assertEqual(7, c.bytes)
+
+    def test_requires_validator(self):
+        c = ContentCache()
+        c.set('/contname/obj', {'Content-Type': 'text/plain'}, b'content')
+        self.assertEqual(0, len(c))
+
+    def test_lru_eviction_by_size(self):
+        c = ContentCache(max_bytes=10)
+        c.set('a', self.headers, b'aaaa')
+        c.set('b', self.headers, b'bbbb')
+        c._get('a')
+        c.set('c', self.headers, b'cccc')
+        c.set('huge', self.headers, b'x' * 11)
+
+        self.assertEqual(['a', 'c'], list(c._entries))
+        self.assertEqual(8, c.bytes)
+        self.assertEqual(1, c.evictions)
+
+    def test_disk_persistence(self):
+        directory = tempfile.mkdtemp()
+        try:
+            c = ContentCache(directory=directory)
+            c.set('/contname/obj', self.headers, b'content')
+            c.set('/contname/gone', self.headers, b'gone')
+            c.invalidate('/contname/gone')
+
+            reloaded = ContentCache(directory=directory)
+            self.assertEqual(1, len(reloaded))
+            entry = reloaded._get('/contname/obj')
+            self.assertEqual(b'content', reloaded._body('/contname/obj', entry))
+            self.assertEqual(7, reloaded.bytes)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_disk_replacement(self):
+        directory = tempfile.mkdtemp()
+        try:
+            c = ContentCache(directory=directory)
+            c.set('/contname/obj', self.headers, b'old content')
+            c.set('/contname/obj', dict(self.headers, ETag='def'), b'new')
+
+            self.assertEqual(2, len(os.listdir(directory)))
+            entry = c._get('/contname/obj')
+            self.assertEqual('def', entry[0]['ETag'])
+            self.assertEqual(b'new', c._body('/contname/obj', entry))
+            self.assertEqual(3, c.bytes)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_concurrent_disk_writes(self):
+        directory = tempfile.mkdtemp()
+        try:
+            c = ContentCache(directory=directory)
+            errors = []
+
+            def write(n):
+                try:
+                    for i in range(50):
+                        body = '{0}-{1}'.format(n, i).encode('ascii')
+                        c.set('/contname/obj', dict(self.headers, ETag=body.decode('ascii')), body)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+            self.assertEqual([], errors)
+            self.assertEqual(2, len(os.listdir(directory)))
+            reloaded = ContentCache(directory=directory)
+            entry = reloaded._get('/contname/obj')
+            self.assertEqual(entry[0]['ETag'].encode('ascii'), reloaded._body('/contname/obj', entry))
+        finally:
+            shutil.rmtree(directory)
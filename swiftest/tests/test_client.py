@@ -2,12 +2,16 @@
 Unit tests for the Client class.
 """
 
+import json
 import unittest
 import httpretty
 import requests
 
-from httpretty import GET, HEAD
+from io import BytesIO
+
+from httpretty import GET, HEAD, POST, PUT, DELETE
 from swiftest.client import Client
+from swiftest.retry import RetryPolicy
 
 from . import util
 
@@ -66,6 +70,61 @@ class ClientTest(unittest.TestCase):
         client = self.create_client()
         self.assertEqual(['foo', 'bar', 'baz'], client.container_names())
 
+    def test_paginate_container_names(self):
+        """
+        Container names are fetched page by page, advancing the marker.
+        """
+
+        names = ['c{0:02d}'.format(i) for i in range(7)]
+        queries = []
+        def listing(request, uri, headers):
+            queries.append(request.querystring)
+            marker = request.querystring.get('marker', [''])[0]
+            limit = int(request.querystring['limit'][0])
+            page = [n for n in names if n > marker][:limit]
+            return (200, headers, "\n".join(page))
+
+        httpretty.register_uri(GET, util.STORAGE_URL, body=listing)
+
+        client = util.create_client()
+        generated = client.iter_container_names(page_size=3)
+        self.assertEqual(names, list(generated))
+
+        self.assertEqual(3, len(queries))
+        self.assertNotIn('marker', queries[0])
+        self.assertEqual(['c02'], queries[1]['marker'])
+        self.assertEqual(['c05'], queries[2]['marker'])
+
+    def test_container_name_filters(self):
+        """
+        Listing filters are passed through as query parameters.
+        """
+
+        httpretty.register_uri(GET, 'http://storage.endpoint.com/v1/account', status=200,
+            body="logs-a\nlogs-b")
+
+        client = self.create_client()
+        names = client.container_names(prefix='logs-', delimiter='/', marker='logs-', end_marker='logs-z')
+        self.assertEqual(['logs-a', 'logs-b'], names)
+
+        query = httpretty.last_request().querystring
+        self.assertEqual(['logs-'], query['prefix'])
+        self.assertEqual(['/'], query['delimiter'])
+        self.assertEqual(['logs-'], query['marker'])
+        self.assertEqual(['logs-z'], query['end_marker'])
+
+    def test_container_name_limit(self):
+        """
+        A limit stops the listing early and shrinks the final request.
+        """
+
+        httpretty.register_uri(GET, 'http://storage.endpoint.com/v1/account', status=200,
+            body="foo\nbar")
+
+        client = self.create_client()
+        self.assertEqual(['foo', 'bar'], client.container_names(limit=2))
+        self.assertEqual(['2'], httpretty.last_request().querystring['limit'])
+
     def test_container_generator(self):
         """
         The containers() method generates Container objects.
@@ -97,5 +156,142 @@ class ClientTest(unittest.TestCase):
         container = client.container('contname')
         self.assertTrue(container.exists())
 
+    def test_reauthenticate_on_rejected_token(self):
+        """
+        An expired token is replaced and the request repeated once.
+        """
+
+        tokens = iter(['expired', 'fresh'])
+        def auth(request, uri, headers):
+            headers.update({'x-auth-token': next(tokens), 'x-storage-url': util.STORAGE_URL})
+            return (204, headers, '')
+        def listing(request, uri, headers):
+            if request.headers['X-Auth-Token'] != 'fresh':
+                return (401, headers, '')
+            return (200, headers, 'foo')
+
+        httpretty.register_uri(GET, 'https://reauth.endpoint.com/v1/', body=auth)
+        httpretty.register_uri(GET, util.STORAGE_URL + '/reauth', body=listing)
+
+        client = Client(endpoint='https://reauth.endpoint.com/v1/', username='me', auth_key='swordfish')
+        self.assertEqual('foo', client._call('GET', '/reauth').text)
+        self.assertEqual('fresh', client.auth_token)
+
+    def test_reauthenticate_only_once(self):
+        """
+        A token that's still rejected after reauthenticating raises.
+        """
+
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/locked', status=401)
+
+        client = util.create_client()
+        self.assertRaises(requests.HTTPError, client._call, 'HEAD', '/locked')
+
+    def test_retry_transient_failures(self):
+        """
+        Idempotent requests are retried on transient server errors, rewinding their bodies.
+        """
+
+        bodies = []
+        def flaky(request, uri, headers):
+            bodies.append(request.body)
+            if len(bodies) < 3:
+                return (503, headers, '')
+            return (201, headers, '')
+
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname/flaky', body=flaky)
+
+        client = util.create_client()
+        r = client._call('PUT', '/contname/flaky', data=BytesIO(b'payload'))
+        self.assertEqual(201, r.status_code)
+        self.assertEqual([b'payload'] * 3, bodies)
+
+    def test_retries_exhausted(self):
+        attempts = []
+        def down(request, uri, headers):
+            attempts.append(request)
+            return (500, headers, '')
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/down', body=down)
+
+        client = util.create_client()
+        client.retry = RetryPolicy(max_retries=2, backoff=0)
+        self.assertRaises(requests.HTTPError, client._call, 'HEAD', '/down')
+        self.assertEqual(3, len(attempts))
+
+    def test_no_retry_for_unsafe_requests(self):
+        """
+        Non-idempotent requests and bodies that can't be replayed are never retried.
+        """
+
+        attempts = []
+        def unavailable(request, uri, headers):
+            attempts.append(request.method)
+            return (503, headers, '')
+        httpretty.register_uri(POST, util.STORAGE_URL + '/unsafe', body=unavailable)
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname/generated', body=unavailable)
+
+        client = util.create_client()
+        self.assertRaises(requests.HTTPError, client._call, 'POST', '/unsafe')
+
+        generated = (chunk for chunk in [b'one', b'two'])
+        self.assertRaises(requests.HTTPError, client._call, 'PUT', '/contname/generated', data=generated)
+        self.assertEqual(['POST', 'PUT'], attempts)
+
+    def test_capabilities(self):
+        httpretty.register_uri(GET, 'http://storage.endpoint.com/info', status=200,
+            body=json.dumps({'swift': {'version': '1.10.0'}, 'bulk_delete': {'max_deletes_per_request': 10000}}))
+
+        client = self.create_client()
+        self.assertIn('bulk_delete', client.capabilities())
+
+    def test_capabilities_unavailable(self):
+        httpretty.register_uri(GET, 'https://storage.endpoint.com/info', status=404)
+
+        client = util.create_client()
+        self.assertEqual({}, client.capabilities())
+
+    def test_bulk_delete(self):
+        """
+        Paths are batched into bulk-delete requests and their reports aggregated.
+        """
+
+        httpretty.register_uri(GET, 'http://storage.endpoint.com/info', status=200,
+            body=json.dumps({'bulk_delete': {'max_deletes_per_request': 2}}))
+        bodies = []
+        def bulk(request, uri, headers):
+            bodies.append(request.body.decode('utf-8').split("\n"))
+            report = {'Response Status': '200 OK', 'Number Deleted': len(bodies[-1]), 'Number Not Found': 0, 'Errors': []}
+            if len(bodies) == 2:
+                report.update({'Response Status': '400 Bad Request', 'Number Deleted': 0,
+                    'Errors': [['/cont/obj 3', '409 Conflict']]})
+            return (200, headers, json.dumps(report))
+        httpretty.register_uri(DELETE, 'http://storage.endpoint.com/v1/account', body=bulk)
+
+        client = self.create_client()
+        result = client.bulk_delete(['cont/obj1', 'cont/obj2', 'cont/obj 3'], batch_size=5)
+
+        self.assertEqual([['/cont/obj1', '/cont/obj2'], ['/cont/obj%203']], bodies)
+        self.assertEqual(2, result.deleted)
+        self.assertEqual([('/cont/obj 3', '409 Conflict')], result.errors)
+        self.assertFalse(result.ok())
+        self.assertIn('bulk-delete', httpretty.last_request().querystring)
+
+    def test_bulk_delete_fallback(self):
+        """
+        Objects are deleted one at a time when the cluster lacks the bulk middleware.
+        """
+
+        httpretty.register_uri(GET, 'https://storage.endpoint.com/info', status=200, body='{}')
+        httpretty.register_uri(DELETE, util.STORAGE_URL + '/cont/present', status=204)
+        httpretty.register_uri(DELETE, util.STORAGE_URL + '/cont/absent', status=404)
+        httpretty.register_uri(DELETE, util.STORAGE_URL + '/cont/forbidden', status=403)
+
+        client = util.create_client()
+        result = client.bulk_delete(['cont/present', 'cont/absent', 'cont/forbidden'], concurrency=1)
+
+        self.assertEqual(1, result.deleted)
+        self.assertEqual(1, result.not_found)
+        self.assertEqual([('cont/forbidden', '403 Forbidden')], result.errors)
+
     def tearDown(self):
         httpretty.disable()
@@ -4,6 +4,10 @@ Unit tests for the Container class.
 
 from io import BytesIO
 
+import json
+import os
+import shutil
+import tempfile
 import unittest
 import httpretty
 
@@ -12,8 +16,13 @@ from httpretty import GET, PUT, POST, HEAD, DELETE
 from swiftest.container import Container
 from swiftest.client import Client
 from swiftest.exception import AlreadyExistsError, DoesNotExistError
+from swiftest.listing import ObjectInfo, PseudoDirectory
+from swiftest.cache import TTLCache
 from . import util
 
+# httpretty's fake sockets aren't thread-safe, so batch transfers are driven
+# with a concurrency of 1 here. See test_pool for the concurrency guarantees.
+
 class ContainerTest(unittest.TestCase):
 
     def setUp(self):
@@ -55,6 +64,99 @@ class ContainerTest(unittest.TestCase):
         self.assertEqual('', hs['X-Container-Meta-Meta1'])
 
 
+    def _count_heads(self, path, **headers):
+        heads = []
+        def head(request, uri, response_headers):
+            heads.append(request)
+            response_headers.update(headers)
+            return (204, response_headers, '')
+        httpretty.register_uri(HEAD, util.STORAGE_URL + path, body=head)
+        return heads
+
+    def test_metadata_cache(self):
+        heads = self._count_heads('/cached', **{'X-Container-Object-Count': '5', 'X-Container-Bytes-Used': '50'})
+        self.client.metadata_cache = TTLCache(ttl=60)
+
+        self.assertEqual(5, Container(self.client, 'cached').object_count)
+        self.assertEqual(50, Container(self.client, 'cached').bytes_used)
+        self.assertTrue(Container(self.client, 'cached').exists())
+        self.assertEqual(1, len(heads))
+
+        Container(self.client, 'cached').refresh()
+        self.assertEqual(2, len(heads))
+
+    def test_metadata_cache_shared_between_accounts(self):
+        self._count_heads('/shared', **{'X-Container-Object-Count': '1', 'X-Container-Bytes-Used': '10'})
+        other_url = 'https://storage.endpoint.com/v1/other'
+        httpretty.register_uri(HEAD, other_url + '/shared', status=204,
+            x_container_object_count=2, x_container_bytes_used=20)
+        httpretty.register_uri(GET, 'https://other-auth.endpoint.com/v1/', status=204,
+            x_auth_token='othertoken', x_storage_url=other_url)
+        other = Client(endpoint='https://other-auth.endpoint.com/v1/', username='other', auth_key='swordfish')
+
+        cache = TTLCache(ttl=60)
+        self.client.metadata_cache = other.metadata_cache = cache
+
+        self.assertEqual(1, Container(self.client, 'shared').object_count)
+        self.assertEqual(2, Container(other, 'shared').object_count)
+        self.assertEqual(1, Container(self.client, 'shared').object_count)
+
+    def test_metadata_cache_invalidation(self):
+        heads = self._count_heads('/written', **{'X-Container-Object-Count': '0', 'X-Container-Bytes-Used': '0'})
+        httpretty.register_uri(POST, util.STORAGE_URL + '/written', status=204)
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/written', status=202)
+        httpretty.register_uri(DELETE, util.STORAGE_URL + '/written', status=204)
+        self.client.metadata_cache = TTLCache(ttl=60)
+
+        c = Container(self.client, 'written')
+        c.metadata['color'] = 'blue'
+        c.metadata.save()
+        self.assertEqual('/v1/me/written', httpretty.last_request().path)
+        Container(self.client, 'written').exists()
+        self.assertEqual(2, len(heads))
+
+        c.create_if_necessary()
+        Container(self.client, 'written').exists()
+        self.assertEqual(3, len(heads))
+
+        c.delete()
+        Container(self.client, 'written').exists()
+        self.assertEqual(4, len(heads))
+
+    def test_purge(self):
+        httpretty.register_uri(GET, 'https://storage.endpoint.com/info', status=200,
+            body=json.dumps({'bulk_delete': {'max_deletes_per_request': 10000}}))
+        httpretty.register_uri(GET, util.STORAGE_URL + '/purged', status=200, body="one\ntwo")
+        deleted = []
+        def delete(request, uri, headers):
+            deleted.append(request.body or request.path)
+            return (200, headers, json.dumps({'Response Status': '200 OK', 'Number Deleted': 2, 'Errors': []}))
+        httpretty.register_uri(DELETE, util.STORAGE_URL, body=delete)
+        httpretty.register_uri(DELETE, util.STORAGE_URL + '/purged', status=204)
+
+        c = Container(self.client, 'purged')
+        result = c.purge()
+
+        self.assertEqual(2, result.deleted)
+        self.assertEqual([b'/purged/one\n/purged/two'], deleted)
+        self.assertEqual('/v1/me/purged', httpretty.last_request().path)
+
+    def test_upload_archive(self):
+        httpretty.register_uri(GET, 'https://storage.endpoint.com/info', status=200,
+            body=json.dumps({'bulk_upload': {'max_containers_per_extraction': 10000}}))
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/archived', status=200,
+            body=json.dumps({'Response Status': '400 Bad Request', 'Number Files Created': 1,
+                'Errors': [['/archived/bad', '400 Bad Request']]}))
+
+        c = Container(self.client, 'archived')
+        result = c.upload_archive([('good', b'content'), ('bad', b'content')], compress=True)
+
+        self.assertEqual(1, result.created)
+        self.assertEqual([('/archived/bad', '400 Bad Request')], result.errors)
+        req = httpretty.last_request()
+        self.assertEqual(['tar.gz'], req.querystring['extract-archive'])
+        self.assertEqual('chunked', req.headers['Transfer-Encoding'])
+
     def test_null_container(self):
         httpretty.register_uri(HEAD, util.STORAGE_URL + '/contname', status=404)
 
@@ -147,5 +249,179 @@ class ContainerTest(unittest.TestCase):
         # Shouldn't raise.
         c.delete_if_necessary()
 
+    def test_object_names(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/contname', status=200,
+            body="one\ntwo\nthree")
+
+        c = Container(self.client, 'contname')
+        self.assertEqual(['one', 'two', 'three'], list(c.object_names(prefix='t')))
+        self.assertEqual(['t'], httpretty.last_request().querystring['prefix'])
+
+    def test_objects_paginated(self):
+        entries = [{'name': 'obj{0}'.format(i), 'bytes': i, 'hash': 'h{0}'.format(i),
+            'content_type': 'text/plain', 'last_modified': '2013-08-01T00:00:00.000000'}
+            for i in range(5)]
+        markers = []
+        def listing(request, uri, headers):
+            self.assertEqual(['json'], request.querystring['format'])
+            marker = request.querystring.get('marker', [''])[0]
+            markers.append(marker)
+            limit = int(request.querystring['limit'][0])
+            page = [e for e in entries if e['name'] > marker][:limit]
+            return (200, headers, json.dumps(page))
+
+        httpretty.register_uri(GET, util.STORAGE_URL + '/bigcont', body=listing)
+
+        c = Container(self.client, 'bigcont')
+        objects = list(c.objects(page_size=2))
+
+        self.assertEqual(['', 'obj1', 'obj3'], markers)
+        self.assertEqual(5, len(objects))
+        self.assertEqual(ObjectInfo('obj3', 3, 'h3', 'text/plain', '2013-08-01T00:00:00.000000'), objects[3])
+
+    def test_objects_resume_from_marker(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/contname', status=200,
+            body='[{"name": "obj2", "bytes": 2, "hash": "h2", "content_type": "text/plain", "last_modified": "2013-08-01T00:00:00.000000"}]')
+
+        c = Container(self.client, 'contname')
+        names = [o.name for o in c.objects(marker='obj1')]
+        self.assertEqual(['obj2'], names)
+        self.assertEqual(['obj1'], httpretty.last_request().querystring['marker'])
+
+    def test_objects_pseudo_directories(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/contname', status=200,
+            body='[{"subdir": "photos/2013/"}, {"name": "photos/index.html", "bytes": 10, "hash": "abc", "content_type": "text/html", "last_modified": "2013-08-01T00:00:00.000000"}]')
+
+        c = Container(self.client, 'contname')
+        listing = list(c.objects(prefix='photos/', delimiter='/'))
+
+        self.assertEqual(PseudoDirectory('photos/2013/'), listing[0])
+        self.assertEqual('photos/index.html', listing[1].name)
+        self.assertEqual(['/'], httpretty.last_request().querystring['delimiter'])
+
+    def test_objects_empty_container(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/contname', status=204, body='')
+
+        c = Container(self.client, 'contname')
+        self.assertEqual([], list(c.objects()))
+
+    def test_objects_missing_container(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/contname', status=404)
+
+        c = Container(self.client, 'contname')
+        try:
+            list(c.objects())
+            self.fail("Did not raise listing a nonexistent container")
+        except DoesNotExistError:
+            pass
+
+    def test_upload_files(self):
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname/a.txt', status=201)
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname/b.txt', status=201)
+
+        root = tempfile.mkdtemp()
+        try:
+            pairs = []
+            for name, content in [('a.txt', b'alpha'), ('b.txt', b'bravo!')]:
+                path = os.path.join(root, name)
+                with open(path, 'wb') as f:
+                    f.write(content)
+                pairs.append((path, name))
+
+            seen = []
+            c = Container(self.client, 'contname')
+            report = c.upload_files(pairs, concurrency=1, callback=seen.append)
+        finally:
+            shutil.rmtree(root)
+
+        self.assertEqual(2, len(report.succeeded))
+        self.assertEqual([], report.failed)
+        self.assertEqual(11, report.bytes)
+        self.assertEqual(2, len(seen))
+        bodies = dict((r.path, r.body) for r in httpretty.latest_requests() if r.method == 'PUT')
+        self.assertEqual(b'alpha', bodies['/v1/me/contname/a.txt'])
+        self.assertEqual(b'bravo!', bodies['/v1/me/contname/b.txt'])
+
+    def test_upload_files_reports_errors(self):
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname/a.txt', status=201)
+
+        root = tempfile.mkdtemp()
+        try:
+            path = os.path.join(root, 'a.txt')
+            with open(path, 'wb') as f:
+                f.write(b'alpha')
+            missing = os.path.join(root, 'missing.txt')
+
+            c = Container(self.client, 'contname')
+            report = c.upload_files([(path, 'a.txt'), (missing, 'missing.txt')], concurrency=1)
+        finally:
+            shutil.rmtree(root)
+
+        self.assertEqual(['a.txt'], [r.name for r in report.succeeded])
+        self.assertEqual(['missing.txt'], [r.name for r in report.failed])
+        self.assertIsInstance(report.failed[0].error, IOError)
+        self.assertRaises(IOError, report.raise_for_errors)
+
+    def test_download_files(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/contname/dir/a.txt', status=200, body='alpha')
+        httpretty.register_uri(GET, util.STORAGE_URL + '/contname/b.txt', status=200, body='bravo!')
+
+        root = tempfile.mkdtemp()
+        try:
+            c = Container(self.client, 'contname')
+            report = c.download_files([(os.path.join(root, 'dir', 'a.txt'), 'dir/a.txt'),
+                (os.path.join(root, 'b.txt'), 'b.txt')], concurrency=1)
+
+            with open(os.path.join(root, 'dir', 'a.txt'), 'rb') as f:
+                self.assertEqual(b'alpha', f.read())
+            with open(os.path.join(root, 'b.txt'), 'rb') as f:
+                self.assertEqual(b'bravo!', f.read())
+        finally:
+            shutil.rmtree(root)
+
+        self.assertEqual(11, report.bytes)
+        self.assertEqual([], report.failed)
+
+    def test_copy_objects(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/copysrc', status=200, body=json.dumps([
+            {'name': 'logs/a', 'bytes': 5, 'hash': 'h', 'content_type': 'text/plain', 'last_modified': ''},
+            {'name': 'logs/b', 'bytes': 7, 'hash': 'h', 'content_type': 'text/plain', 'last_modified': ''}]))
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/copydest/archive/a', status=201)
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/copydest/archive/b', status=404)
+
+        c = Container(self.client, 'copysrc')
+        report = c.copy_objects('copydest', prefix='logs/', concurrency=1,
+            rename=lambda name: name.replace('logs/', 'archive/'))
+
+        self.assertEqual(['copydest/archive/a'], [r.path for r in report.succeeded])
+        self.assertEqual(['logs/b'], [r.name for r in report.failed])
+        self.assertEqual(5, report.bytes)
+        copies = [r.headers['X-Copy-From'] for r in httpretty.latest_requests() if r.method == 'PUT']
+        self.assertEqual(['/copysrc/logs/a', '/copysrc/logs/b'], copies[-2:])
+
+    def test_move_objects(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/movesrc', status=200, body=json.dumps([
+            {'name': 'only', 'bytes': 3, 'hash': 'h', 'content_type': 'text/plain', 'last_modified': ''}]))
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/movedest/only', status=201)
+        httpretty.register_uri(DELETE, util.STORAGE_URL + '/movesrc/only', status=204)
+
+        c = Container(self.client, 'movesrc')
+        report = c.move_objects(Container(self.client, 'movedest'), concurrency=1)
+
+        self.assertEqual([], report.failed)
+        self.assertEqual('DELETE', httpretty.last_request().method)
+        self.assertEqual('/v1/me/movesrc/only', httpretty.last_request().path)
+
+    def test_move_objects_onto_themselves(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/samecont', status=200, body=json.dumps([
+            {'name': 'kept', 'bytes': 3, 'hash': 'h', 'content_type': 'text/plain', 'last_modified': ''}]))
+
+        c = Container(self.client, 'samecont')
+        report = c.move_objects(c, concurrency=1)
+
+        self.assertEqual(['kept'], [r.name for r in report.failed])
+        self.assertIsInstance(report.failed[0].error, ValueError)
+        self.assertEqual('GET', httpretty.last_request().method)
+
     def tearDown(self):
         httpretty.disable()
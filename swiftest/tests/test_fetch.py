@@ -0,0 +1,78 @@
+"""
+Unit tests for fetching many objects at once.
+"""
+
+import threading
+import unittest
+import httpretty
+
+from httpretty import GET
+
+from swiftest.container import Container
+from swiftest.exception import DoesNotExistError, DeadlineExceededError
+from swiftest.fetch import ByteBudget
+from . import util
+
+class ByteBudgetTest(unittest.TestCase):
+
+    def test_waits_for_room(self):
+        budget = ByteBudget(10)
+        self.assertTrue(budget.acquire(6))
+        self.assertFalse(budget.acquire(6, timeout=0.01))
+
+        admitted = []
+        waiter = threading.Thread(target=lambda: admitted.append(budget.acquire(6, timeout=5)))
+        waiter.start()
+        budget.release(6)
+        waiter.join()
+
+        self.assertEqual([True], admitted)
+        self.assertEqual(6, budget.reserved)
+
+    def test_oversized_reservation_runs_alone(self):
+        budget = ByteBudget(10)
+        self.assertTrue(budget.acquire(100))
+        self.assertEqual(10, budget.reserved)
+        self.assertFalse(budget.acquire(1, timeout=0.01))
+        budget.release(100)
+        self.assertEqual(0, budget.reserved)
+
+    def test_close_turns_waiters_away(self):
+        budget = ByteBudget(10)
+        budget.acquire(10)
+        budget.close()
+        self.assertFalse(budget.acquire(1))
+
+# httpretty's fake sockets aren't thread-safe, so fetches are made with a concurrency of 1.
+class FetchManyTest(unittest.TestCase):
+
+    def setUp(self):
+        httpretty.enable()
+        self.client = util.create_client()
+
+    def test_fetch_many(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/fetchcont/a', body=b'first')
+        httpretty.register_uri(GET, util.STORAGE_URL + '/fetchcont/b', body=b'second')
+        httpretty.register_uri(GET, util.STORAGE_URL + '/fetchcont/missing', status=404)
+
+        c = Container(self.client, 'fetchcont')
+        results = dict((r.name, r) for r in c.fetch_many(['a', 'missing', 'b'], concurrency=1, max_bytes=4))
+
+        self.assertEqual(b'first', results['a'].content)
+        self.assertEqual(b'second', results['b'].content)
+        self.assertFalse(results['missing'].ok())
+        self.assertIsInstance(results['missing'].error, DoesNotExistError)
+        self.assertIsNone(results['missing'].content)
+
+    def test_fetch_many_deadline(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/latecont/a', body=b'late')
+
+        c = Container(self.client, 'latecont')
+        results = list(c.fetch_many(['a', 'b'], concurrency=1, deadline=0))
+
+        self.assertEqual(['a', 'b'], sorted(r.name for r in results))
+        for r in results:
+            self.assertIsInstance(r.error, DeadlineExceededError)
+
+    def tearDown(self):
+        httpretty.disable()
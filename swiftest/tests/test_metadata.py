@@ -0,0 +1,118 @@
+"""
+Unit tests for metadata parsing, saving and batch updates.
+"""
+
+import unittest
+import httpretty
+
+from httpretty import HEAD, POST
+from requests.structures import CaseInsensitiveDict
+
+from swiftest.cache import TTLCache
+from swiftest.container import Container
+from swiftest.metadata import Metadata
+from . import util
+
+class FakeResponse(object):
+
+    def __init__(self, headers):
+        self.headers = CaseInsensitiveDict(headers)
+
+class MetadataTest(unittest.TestCase):
+
+    def test_from_response(self):
+        r = FakeResponse({'x-container-meta-Color': 'blue', 'X-CONTAINER-META-SHAPE': 'round',
+            'X-Container-Meta-': 'nameless', 'X-Object-Meta-Size': 'large', 'X-Container-Object-Count': '3'})
+
+        m = Metadata.from_response(None, r, 'Container')
+
+        self.assertEqual({'color': 'blue', 'shape': 'round'}, m)
+        self.assertFalse(m.changed())
+
+    def test_discard(self):
+        m = Metadata(None, 'Container', {'color': 'blue'})
+        m['shape'] = 'round'
+        m.discard('Shape')
+        m.discard('absent')
+        self.assertRaises(KeyError, m.__delitem__, 'absent')
+        del m['COLOR']
+
+        self.assertEqual({}, m)
+        self.assertEqual(set(), m.updates)
+        self.assertEqual(set(['shape', 'absent', 'color']), m.deletions)
+
+# httpretty's fake sockets aren't thread-safe, so batches are updated with a concurrency of 1.
+class MetadataSaveTest(unittest.TestCase):
+
+    def setUp(self):
+        httpretty.enable()
+        self.client = util.create_client()
+
+    def test_save_sends_only_changes_once(self):
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/diffcont', status=204, x_container_object_count=0,
+            x_container_bytes_used=0, x_container_meta_kept='same', x_container_meta_dropped='old')
+        httpretty.register_uri(POST, util.STORAGE_URL + '/diffcont', status=204)
+
+        c = Container(self.client, 'diffcont')
+        c.metadata['kept'] = 'same'
+        c.metadata['added'] = 'new'
+        del c.metadata['dropped']
+        c.metadata.save()
+
+        hs = httpretty.last_request().headers
+        self.assertEqual('new', hs['X-Container-Meta-Added'])
+        self.assertEqual('', hs['X-Container-Meta-Dropped'])
+        self.assertNotIn('X-Container-Meta-Kept', hs)
+        self.assertFalse(c.metadata.changed())
+
+        posts = len([r for r in httpretty.latest_requests() if r.method == 'POST'])
+        c.metadata.save()
+        self.assertEqual(posts, len([r for r in httpretty.latest_requests() if r.method == 'POST']))
+
+    def test_update_metadata(self):
+        httpretty.register_uri(POST, util.STORAGE_URL + '/batchcont', status=204)
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/batchcont/tagged', status=200,
+            forcing_headers={'Content-Length': '0', 'X-Object-Meta-Owner': 'me', 'X-Object-Meta-Stale': 'yes'})
+        httpretty.register_uri(POST, util.STORAGE_URL + '/batchcont/tagged', status=202)
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/batchcont/missing', status=404)
+
+        c = Container(self.client, 'batchcont')
+        result = self.client.update_metadata([
+            (c, {'Tag': 'batch', 'old': None}),
+            (c.object('tagged'), {'tag': 'batch', 'stale': None}),
+            (c.object('missing'), {'tag': 'batch'})], concurrency=1)
+
+        self.assertEqual(2, result.updated)
+        self.assertEqual(['missing'], [target.name for target, _ in result.errors])
+
+        posts = [r for r in httpretty.latest_requests() if r.method == 'POST']
+        container_post = [r for r in posts if r.path.endswith('/batchcont')][-1]
+        self.assertEqual('batch', container_post.headers['X-Container-Meta-Tag'])
+        self.assertEqual('', container_post.headers['X-Container-Meta-Old'])
+        object_post = [r for r in posts if r.path.endswith('/tagged')][-1]
+        self.assertEqual('me', object_post.headers['X-Object-Meta-Owner'])
+        self.assertEqual('batch', object_post.headers['X-Object-Meta-Tag'])
+        self.assertNotIn('X-Object-Meta-Stale', object_post.headers)
+
+    def test_update_metadata_rereads_cached_object(self):
+        self.client.metadata_cache = TTLCache(ttl=60)
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/rereadcont/obj', status=200,
+            forcing_headers={'Content-Length': '0', 'X-Object-Meta-Owner': 'me'})
+        o = Container(self.client, 'rereadcont').object('obj')
+        self.assertEqual({'owner': 'me'}, o.metadata)
+
+        # Someone else changes the object's metadata after it's been cached.
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/rereadcont/obj', status=200,
+            forcing_headers={'Content-Length': '0', 'X-Object-Meta-Owner': 'you', 'X-Object-Meta-Extra': 'kept'})
+        httpretty.register_uri(POST, util.STORAGE_URL + '/rereadcont/obj', status=202)
+
+        result = self.client.update_metadata([(o, {'tag': 'batch'})], concurrency=1)
+
+        self.assertEqual(1, result.updated)
+        hs = httpretty.last_request().headers
+        self.assertEqual('you', hs['X-Object-Meta-Owner'])
+        self.assertEqual('kept', hs['X-Object-Meta-Extra'])
+        self.assertEqual('batch', hs['X-Object-Meta-Tag'])
+
+    def tearDown(self):
+        httpretty.disable()
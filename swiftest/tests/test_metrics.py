@@ -0,0 +1,124 @@
+"""
+Unit tests for request instrumentation and the MetricsAggregator.
+"""
+
+import unittest
+import httpretty
+import requests
+
+from io import BytesIO
+
+from swiftest.metrics import (Instrument, MetricsAggregator, RequestEvent, path_template, body_length,
+    percentile)
+from swiftest.streams import HashingStream
+from httpretty import GET, HEAD, PUT
+
+from . import util
+
+class Recorder(Instrument):
+
+    def __init__(self):
+        self.events = []
+
+    def request(self, event):
+        self.events.append(event)
+
+def event(method='GET', template='/{container}/{object}', elapsed=0.1, **kwargs):
+    fields = dict(path='/c/o', status=200, bytes_sent=0, bytes_received=0, retries=0, error=None)
+    fields.update(kwargs)
+    return RequestEvent(method=method, template=template, elapsed=elapsed, **fields)
+
+class MetricsTest(unittest.TestCase):
+
+    def test_path_template(self):
+        self.assertEqual('/', path_template(''))
+        self.assertEqual('/{container}', path_template('/contname'))
+        self.assertEqual('/{container}/{object}', path_template('/contname/path/to/obj'))
+
+    def test_body_length(self):
+        self.assertEqual(0, body_length(None))
+        self.assertEqual(3, body_length(b'abc'))
+        self.assertEqual(2, body_length(u'é'))
+        self.assertIsNone(body_length(HashingStream(BytesIO(b'abc'))))
+        self.assertIsNone(body_length(c for c in [b'abc']))
+
+    def test_percentile(self):
+        ordered = [float(i) for i in range(1, 101)]
+        self.assertEqual(50.0, percentile(ordered, 50))
+        self.assertEqual(99.0, percentile(ordered, 99))
+        self.assertEqual(0.0, percentile([], 50))
+
+    def test_aggregator_summary(self):
+        agg = MetricsAggregator()
+        for i in range(1, 11):
+            agg.request(event(elapsed=i / 10.0, bytes_received=100, retries=1 if i == 10 else 0))
+        agg.request(event(method='HEAD', template='/{container}', status=404,
+            error=requests.HTTPError()))
+
+        summary = agg.summary()
+        self.assertEqual(set(['GET object', 'HEAD container']), set(summary))
+        get = summary['GET object']
+        self.assertEqual((10, 0, 1, 1000), (get['count'], get['errors'], get['retries'], get['bytes_received']))
+        self.assertAlmostEqual(0.5, get['p50'])
+        self.assertAlmostEqual(1.0, get['p99'])
+        self.assertAlmostEqual(0.55, get['mean'])
+        self.assertEqual(1, summary['HEAD container']['errors'])
+
+    def test_export(self):
+        agg = MetricsAggregator(window=2)
+        agg.request(event(elapsed=5.0))
+        agg.request(event(elapsed=1.0))
+        agg.request(event(elapsed=2.0))
+
+        exported = []
+        agg.export(exported.append, reset=True)
+        self.assertEqual(3, exported[0]['GET object']['count'])
+        self.assertEqual(2.0, exported[0]['GET object']['p99'])
+        self.assertEqual({}, agg.summary())
+
+class ClientInstrumentationTest(unittest.TestCase):
+
+    def setUp(self):
+        httpretty.enable()
+        self.client = util.create_client()
+        self.recorder = Recorder()
+        self.client.instrument = self.recorder
+
+    def test_request_events(self):
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/measured/obj', status=201, body='')
+        httpretty.register_uri(GET, util.STORAGE_URL + '/measured/obj', status=200, body='content')
+
+        obj = self.client.container('measured').object('obj')
+        obj.upload_string(b'payload')
+        obj.upload_stream(BytesIO(b'streamed'))
+        obj.download_binary()
+
+        put, stream, get = self.recorder.events
+        self.assertEqual(('PUT object', '/{container}/{object}', 201, 7, 0),
+            (put.operation, put.template, put.status, put.bytes_sent, put.bytes_received))
+        self.assertEqual(8, stream.bytes_sent)
+        self.assertEqual(('GET object', 7), (get.operation, get.bytes_received))
+
+    def test_retries_and_errors(self):
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/flaky', responses=[
+            httpretty.Response(body='', status=503),
+            httpretty.Response(body='', status=503),
+            httpretty.Response(body='', status=404)])
+
+        self.assertFalse(self.client.container('flaky').exists())
+
+        e = self.recorder.events[-1]
+        self.assertEqual(('HEAD container', 404, 2, None), (e.operation, e.status, e.retries, e.error))
+
+    def test_failed_request(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/broken/obj', status=400)
+
+        obj = self.client.container('broken').object('obj')
+        self.assertRaises(requests.HTTPError, obj.download_binary)
+
+        e = self.recorder.events[-1]
+        self.assertEqual(400, e.status)
+        self.assertIsInstance(e.error, requests.HTTPError)
+
+    def tearDown(self):
+        httpretty.disable()
@@ -0,0 +1,54 @@
+"""
+Unit tests for the bounded thread pool.
+"""
+
+import threading
+import time
+import unittest
+
+from swiftest.pool import bounded_map
+
+class PoolTest(unittest.TestCase):
+
+    def test_results_and_errors(self):
+        def call(item):
+            if item == 3:
+                raise ValueError("three")
+            return item * 10
+
+        outcomes = dict((item, (result, error)) for item, result, error in bounded_map(call, range(5), 2))
+
+        self.assertEqual(20, outcomes[2][0])
+        self.assertIsNone(outcomes[3][0])
+        self.assertIsInstance(outcomes[3][1], ValueError)
+        self.assertEqual(5, len(outcomes))
+
+    def test_concurrency_bound(self):
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0}
+
+        def call(item):
+            with lock:
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.01)
+            with lock:
+                state['active'] -= 1
+
+        list(bounded_map(call, range(20), 3))
+        self.assertLessEqual(state['peak'], 3)
+
+    def test_items_consumed_lazily(self):
+        consumed = []
+        def items():
+            for i in range(100):
+                consumed.append(i)
+                yield i
+
+        results = bounded_map(lambda item: item, items(), 2)
+        next(results)
+        self.assertLess(len(consumed), 100)
+        results.close()
+
+    def test_invalid_concurrency(self):
+        self.assertRaises(ValueError, list, bounded_map(lambda item: item, [1], 0))
@@ -0,0 +1,47 @@
+"""
+Unit tests for the RetryPolicy class.
+"""
+
+import unittest
+
+from io import BytesIO
+
+from swiftest.retry import RetryPolicy, rewinder
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def test_should_retry(self):
+        policy = RetryPolicy(max_retries=2)
+
+        self.assertTrue(policy.should_retry('GET', 0, 503))
+        self.assertTrue(policy.should_retry('put', 1))
+        self.assertFalse(policy.should_retry('GET', 2, 503))
+        self.assertFalse(policy.should_retry('GET', 0, 404))
+        self.assertFalse(policy.should_retry('POST', 0, 503))
+
+    def test_delay_bounds(self):
+        policy = RetryPolicy(backoff=1.0, max_backoff=5.0)
+
+        for attempt in range(6):
+            delay = policy.delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(5.0, 2 ** attempt))
+
+    def test_retry_after(self):
+        policy = RetryPolicy(backoff=0, max_backoff=10.0)
+
+        self.assertEqual(3.0, policy.delay(0, '3'))
+        self.assertEqual(10.0, policy.delay(0, '120'))
+        self.assertEqual(0, policy.delay(0, 'Wed, 21 Oct 2015 07:28:00 GMT'))
+
+    def test_rewinder(self):
+        body = BytesIO(b'0123456789')
+        body.read(2)
+        rewind = rewinder(body)
+        body.read()
+        rewind()
+        self.assertEqual(b'23456789', body.read())
+
+        self.assertIsNotNone(rewinder(b'bytes'))
+        self.assertIsNotNone(rewinder(None))
+        self.assertIsNone(rewinder(chunk for chunk in [b'one']))
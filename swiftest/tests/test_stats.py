@@ -0,0 +1,100 @@
+"""
+Unit tests for account container scans.
+"""
+
+import json
+import unittest
+import httpretty
+
+from swiftest.cache import TTLCache
+from swiftest.client import Client
+from swiftest.retry import RetryPolicy
+from swiftest.stats import ContainerStats, ContainerStat
+from httpretty import GET, HEAD
+
+class ContainerStatsTest(unittest.TestCase):
+
+    def test_totals_and_top(self):
+        stats = ContainerStats()
+        stats.add('small', 1, 10)
+        stats.add('large', 2, 1000)
+        stats.add('many', 500, 100)
+
+        self.assertEqual(3, len(stats))
+        self.assertEqual((503, 1110), (stats.total_count, stats.total_bytes))
+        self.assertEqual(['large', 'many'], [s.name for s in stats.top(2)])
+        self.assertEqual([ContainerStat('many', 500, 100)], stats.top(1, by='count'))
+        self.assertEqual(ContainerStat('small', 1, 10), list(stats)[0])
+
+# httpretty isn't thread-safe, so these tests scan with a concurrency of 1.
+class ScanContainersTest(unittest.TestCase):
+
+    def setUp(self):
+        httpretty.enable()
+        # httpretty registrations outlive each test, so every test gets an account of its own.
+        self.storage_url = 'https://stats.endpoint.com/v1/' + self.id().split('.')[-1]
+        httpretty.register_uri(GET, 'https://stats-auth.endpoint.com/v1/', status=204,
+            x_auth_token='faketoken', x_storage_url=self.storage_url)
+        self.client = Client(endpoint='https://stats-auth.endpoint.com/v1/', username='me',
+            auth_key='swordfish', retry=RetryPolicy(backoff=0))
+
+    def register_listing(self, entries):
+        markers = []
+        def listing(request, uri, headers):
+            self.assertEqual(['json'], request.querystring['format'])
+            marker = request.querystring.get('marker', [''])[0]
+            markers.append(marker)
+            limit = int(request.querystring['limit'][0])
+            return (200, headers, json.dumps([e for e in entries if e['name'] > marker][:limit]))
+        httpretty.register_uri(GET, self.storage_url, body=listing)
+        return markers
+
+    def register_head(self, name, count, bytes_used, status=204):
+        httpretty.register_uri(HEAD, self.storage_url + '/' + name, status=status, forcing_headers={
+            'X-Container-Object-Count': str(count), 'X-Container-Bytes-Used': str(bytes_used)})
+
+    def test_scan_from_listing(self):
+        markers = self.register_listing([
+            {'name': 'a', 'count': 1, 'bytes': 100},
+            {'name': 'b', 'count': 2, 'bytes': 300},
+            {'name': 'c', 'count': 3, 'bytes': 200}])
+
+        stats = self.client.scan_containers(page_size=2)
+
+        self.assertEqual(['', 'b'], markers)
+        self.assertEqual(['a', 'b', 'c'], stats.names)
+        self.assertEqual((6, 600), (stats.total_count, stats.total_bytes))
+        self.assertEqual('b', stats.top(1)[0].name)
+
+    def test_scan_falls_back_to_head(self):
+        self.register_listing([{'name': 'listed', 'count': 1, 'bytes': 10}, {'name': 'unlisted'},
+            {'name': 'broken'}])
+        self.register_head('unlisted', 5, 50)
+        self.register_head('broken', 0, 0, status=500)
+
+        stats = self.client.scan_containers(concurrency=1)
+
+        self.assertEqual([ContainerStat('listed', 1, 10), ContainerStat('unlisted', 5, 50)], list(stats))
+        self.assertEqual(['broken'], [name for name, _ in stats.errors])
+
+    def test_exact_scan(self):
+        self.register_listing([{'name': 'stale', 'count': 1, 'bytes': 10}])
+        self.register_head('stale', 2, 20)
+
+        stats = self.client.scan_containers(exact=True, concurrency=1)
+
+        self.assertEqual([ContainerStat('stale', 2, 20)], list(stats))
+
+    def test_exact_scan_bypasses_metadata_cache(self):
+        self.client.metadata_cache = TTLCache(ttl=60)
+        self.register_listing([{'name': 'cached', 'count': 1, 'bytes': 10}])
+        self.register_head('cached', 2, 20)
+        self.client.container('cached').exists()
+        self.register_head('cached', 3, 30)
+
+        stats = self.client.scan_containers(exact=True, concurrency=1)
+
+        self.assertEqual([ContainerStat('cached', 3, 30)], list(stats))
+
+    def tearDown(self):
+        httpretty.disable()
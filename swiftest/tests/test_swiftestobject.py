@@ -2,13 +2,22 @@
 Unit tests for the SwiftestObject class.
 """
 
+import json
+import os
+import re
+import tempfile
 import unittest
 import httpretty
+import requests
 
+from hashlib import md5
 from io import BytesIO
 
+from swiftest.cache import ContentCache, TTLCache
+from swiftest.container import Container
 from swiftest.swiftest_object import SwiftestObject
-from httpretty import GET, PUT
+from swiftest.exception import ChecksumError, DoesNotExistError, PartialDownloadError
+from httpretty import GET, HEAD, PUT, POST, DELETE
 
 from . import util
 
@@ -35,6 +44,121 @@ class SwiftestObjectTest(unittest.TestCase):
         string = o.download_string(encoding='utf-8')
         self.assertEqual(string, u'object content')
 
+    def test_download_from_content_cache(self):
+        conditions = []
+        def get(request, uri, headers):
+            conditions.append(request.headers.get('If-None-Match'))
+            if request.headers.get('If-None-Match') == '"etag1"':
+                return (304, headers, '')
+            headers.update({'ETag': '"etag1"', 'Content-Type': 'text/plain; charset=utf-8'})
+            return (200, headers, 'cached content')
+        httpretty.register_uri(GET, util.STORAGE_URL + '/contname/cached', body=get)
+
+        self.client.content_cache = ContentCache()
+        o = SwiftestObject(self.client, 'contname', 'cached')
+
+        self.assertEqual(b'cached content', o.download_binary())
+        self.assertEqual(u'cached content', o.download_string())
+        self.assertEqual(b'cached content', o.download_binary())
+        self.assertEqual([None, '"etag1"', '"etag1"'], conditions)
+        self.assertEqual((2, 1), (self.client.content_cache.hits, self.client.content_cache.misses))
+
+    def test_content_cache_forgets_missing_objects(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/contname/uncached', status=404)
+
+        self.client.content_cache = ContentCache()
+        self.client.content_cache.set('/contname/uncached', {'ETag': 'abc'}, b'stale')
+        o = SwiftestObject(self.client, 'contname', 'uncached')
+
+        self.assertRaises(requests.HTTPError, o.download_binary)
+        self.assertEqual(0, len(self.client.content_cache))
+
+    def test_object_metadata(self):
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/contname/described', status=200,
+            forcing_headers={'Content-Length': '14', 'ETag': '"ABC123"', 'Content-Type': 'text/plain',
+                'Last-Modified': 'Thu, 01 Aug 2013 00:00:00 GMT', 'X-Object-Meta-Color': 'blue'})
+
+        o = SwiftestObject(self.client, 'contname', 'described')
+        self.assertTrue(o.exists())
+        self.assertEqual(14, o.size)
+        self.assertEqual('abc123', o.etag)
+        self.assertEqual('text/plain', o.content_type)
+        self.assertEqual('Thu, 01 Aug 2013 00:00:00 GMT', o.last_modified)
+        self.assertEqual({'color': 'blue'}, o.metadata)
+        self.assertRaises(AttributeError, getattr, o, 'nonsense')
+
+    def test_compact_handles(self):
+        o = SwiftestObject(self.client, ''.join(['cont', 'name']), 'compact')
+        self.assertFalse(hasattr(o, '__dict__'))
+        self.assertIs(SwiftestObject(self.client, 'contname', 'other').container_name, o.container_name)
+        self.assertRaises(AttributeError, setattr, o, 'nonsense', 1)
+
+    def test_missing_object_metadata(self):
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/contname/absent', status=404)
+
+        o = SwiftestObject(self.client, 'contname', 'absent')
+        self.assertFalse(o.exists())
+        self.assertRaises(DoesNotExistError, getattr, o, 'size')
+
+    def test_update_object_metadata(self):
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/contname/tagged', status=200,
+            forcing_headers={'Content-Length': '0', 'X-Object-Meta-Color': 'blue', 'X-Object-Meta-Shape': 'round'})
+        httpretty.register_uri(POST, util.STORAGE_URL + '/contname/tagged', status=202)
+
+        o = SwiftestObject(self.client, 'contname', 'tagged')
+        o.metadata['size'] = 'large'
+        del o.metadata['shape']
+        o.metadata.save()
+
+        req = httpretty.last_request()
+        self.assertEqual('POST', req.method)
+        self.assertEqual('blue', req.headers['X-Object-Meta-Color'])
+        self.assertEqual('large', req.headers['X-Object-Meta-Size'])
+        self.assertNotIn('X-Object-Meta-Shape', req.headers)
+
+    def test_upload_invalidates_metadata(self):
+        heads = []
+        def head(request, uri, headers):
+            heads.append(request)
+            headers['Content-Length'] = str(len(heads))
+            return (200, headers, '')
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/contname/rewritten', body=head)
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname/rewritten', status=201)
+        self.client.metadata_cache = TTLCache(ttl=60)
+
+        o = SwiftestObject(self.client, 'contname', 'rewritten')
+        self.assertEqual(1, o.size)
+        self.assertEqual(1, SwiftestObject(self.client, 'contname', 'rewritten').size)
+        o.upload_string(b'xx')
+        self.assertEqual(2, o.size)
+        self.assertEqual(2, len(heads))
+
+    def test_download_into(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/contname/filled',
+            status=200, body='object content')
+
+        o = SwiftestObject(self.client, 'contname', 'filled')
+        buf = bytearray(20)
+        self.assertEqual(14, o.download_into(buf))
+        self.assertEqual(b'object content', bytes(buf[:14]))
+
+        self.assertEqual(14, o.download_into(memoryview(buf)[6:]))
+        self.assertEqual(b'objectobject content', bytes(buf))
+
+        self.assertRaises(ValueError, o.download_into, bytearray(4))
+
+    def test_iter_chunks(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/contname/chunked',
+            status=200, body='object content')
+
+        o = SwiftestObject(self.client, 'contname', 'chunked')
+        buf = bytearray(4)
+        chunks = []
+        for chunk in o.iter_chunks(buffer=buf):
+            self.assertIsInstance(chunk, memoryview)
+            chunks.append(chunk.tobytes())
+        self.assertEqual([b'obje', b'ct c', b'onte', b'nt'], chunks)
+
     def test_download_file(self):
         httpretty.register_uri(GET, util.STORAGE_URL + '/contname/objectname',
             status=200, body='object content')
@@ -58,5 +182,231 @@ class SwiftestObjectTest(unittest.TestCase):
         self.assertEqual('437b930db84b8079c2dd804a71936b5f', req.headers['ETag'])
         self.assertEqual(b'something', req.body)
 
+    def test_upload_string_buffers(self):
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname/newobject',
+            status=201)
+
+        o = SwiftestObject(self.client, 'contname', 'newobject')
+
+        for payload in [bytearray(b'something'), memoryview(b'xxsomethingxx')[2:-2]]:
+            o.upload_string(payload)
+
+            req = httpretty.last_request()
+            self.assertEqual('437b930db84b8079c2dd804a71936b5f', req.headers['ETag'])
+            self.assertEqual('9', req.headers['Content-Length'])
+            self.assertEqual(b'something', req.body)
+
+    def test_upload_stream(self):
+        content = b'streamed content'
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname/streamed',
+            status=201, etag=md5(content).hexdigest())
+
+        def generate():
+            yield b'streamed '
+            yield b'content'
+
+        o = SwiftestObject(self.client, 'contname', 'streamed')
+        digest = o.upload_stream(generate(), content_type='text/plain')
+
+        self.assertEqual(md5(content).hexdigest(), digest)
+        req = httpretty.last_request()
+        self.assertEqual('chunked', req.headers['Transfer-Encoding'])
+        self.assertEqual('text/plain', req.headers['Content-Type'])
+
+    def test_upload_stream_checksum_mismatch(self):
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname/streamed',
+            status=201, etag=md5(b'something else').hexdigest())
+
+        o = SwiftestObject(self.client, 'contname', 'streamed')
+        self.assertRaises(ChecksumError, o.upload_stream, [b'streamed ', b'content'])
+
+    def test_upload_file(self):
+        content = b'file content ' * 100
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname/fromfile',
+            status=201, etag='"{0}"'.format(md5(content).hexdigest()))
+
+        o = SwiftestObject(self.client, 'contname', 'fromfile')
+        source = BytesIO(content)
+        o.upload_file(source)
+        self.assertEqual(len(content), source.tell())
+
+        source = BytesIO(b'changed in flight')
+        self.assertRaises(ChecksumError, o.upload_file, source)
+
+    def test_delete(self):
+        httpretty.register_uri(DELETE, util.STORAGE_URL + '/contname/doomed', status=204)
+
+        o = SwiftestObject(self.client, 'contname', 'doomed')
+        self.assertIs(o, o.delete())
+        self.assertEqual('DELETE', httpretty.last_request().method)
+
+    def test_delete_missing(self):
+        httpretty.register_uri(DELETE, util.STORAGE_URL + '/contname/missing', status=404)
+
+        o = SwiftestObject(self.client, 'contname', 'missing')
+        self.assertRaises(DoesNotExistError, o.delete)
+        # Shouldn't raise.
+        o.delete_if_necessary()
+
+    def test_copy_to(self):
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/dest/copied name', status=201)
+
+        o = SwiftestObject(self.client, 'contname', 'source name')
+        copy = o.copy_to('dest', 'copied name', headers={'Content-Type': 'text/plain'})
+
+        self.assertEqual(('dest', 'copied name'), (copy.container_name, copy.name))
+        req = httpretty.last_request()
+        self.assertEqual('/contname/source%20name', req.headers['X-Copy-From'])
+        self.assertEqual('0', req.headers['Content-Length'])
+        self.assertEqual('text/plain', req.headers['Content-Type'])
+
+    def test_move_to(self):
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/dest/moved', status=201)
+        httpretty.register_uri(DELETE, util.STORAGE_URL + '/contname/moved', status=204)
+
+        o = SwiftestObject(self.client, 'contname', 'moved')
+        copy = o.move_to('dest')
+
+        self.assertEqual('moved', copy.name)
+        methods = [r.method for r in httpretty.latest_requests() if 'moved' in r.path]
+        self.assertEqual(['PUT', 'DELETE'], methods[-2:])
+
+    def test_move_onto_itself(self):
+        o = SwiftestObject(self.client, 'contname', 'stayput')
+        requests_before = len(httpretty.latest_requests())
+
+        self.assertRaises(ValueError, o.move_to, 'contname')
+        self.assertRaises(ValueError, o.move_to, Container(self.client, 'contname'), 'stayput')
+        self.assertEqual(requests_before, len(httpretty.latest_requests()))
+
+    def _segmented_source(self, content):
+        fd, path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_upload_segmented(self):
+        segments = {}
+        def segment_put(request, uri, headers):
+            segments[request.path] = request.body
+            headers['etag'] = md5(request.body).hexdigest()
+            return (201, headers, '')
+
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname_segments', status=201)
+        httpretty.register_uri(PUT, re.compile(re.escape(util.STORAGE_URL) + '/contname_segments/.+'),
+            body=segment_put)
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname/bigobject', status=201)
+
+        path = self._segmented_source(b'0123456789abcdefghij!')
+        o = SwiftestObject(self.client, 'contname', 'bigobject')
+        o.upload_segmented(path, segment_size=8, concurrency=1)
+
+        manifest_req = httpretty.last_request()
+        self.assertEqual(['put'], manifest_req.querystring['multipart-manifest'])
+        manifest = json.loads(manifest_req.body.decode('utf-8'))
+
+        self.assertEqual([8, 8, 5], [entry['size_bytes'] for entry in manifest])
+        self.assertTrue(manifest[0]['path'].startswith('/contname_segments/bigobject/slo/'))
+        self.assertEqual(md5(b'01234567').hexdigest(), manifest[0]['etag'])
+        contents = [segments['/v1/me' + entry['path']] for entry in manifest]
+        self.assertEqual([b'01234567', b'89abcdef', b'ghij!'], contents)
+
+    def test_upload_segmented_checks_segment_etags(self):
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname_segments', status=201)
+        httpretty.register_uri(PUT, re.compile(re.escape(util.STORAGE_URL) + '/contname_segments/.+'),
+            status=201, etag='"00000000000000000000000000000000"')
+
+        path = self._segmented_source(b'0123456789')
+        o = SwiftestObject(self.client, 'contname', 'corrupted')
+        self.assertRaises(ChecksumError, o.upload_segmented, path, segment_size=4, concurrency=1)
+
+    def test_upload_segmented_small_file(self):
+        httpretty.register_uri(PUT, util.STORAGE_URL + '/contname/smallobject', status=201)
+
+        path = self._segmented_source(b'tiny')
+        o = SwiftestObject(self.client, 'contname', 'smallobject')
+        o.upload_segmented(path, segment_size=8)
+
+        req = httpretty.last_request()
+        self.assertEqual(b'tiny', req.body)
+        self.assertNotIn('multipart-manifest', req.querystring)
+
+    def _register_ranged(self, url, content, fail_offsets=()):
+        requested = []
+        def ranged_get(request, uri, headers):
+            first, last = request.headers['Range'][len('bytes='):].split('-')
+            first, last = int(first), int(last)
+            requested.append(first)
+            if first in fail_offsets:
+                return (503, headers, '')
+            headers['content-range'] = 'bytes {0}-{1}/{2}'.format(first, last, len(content))
+            return (206, headers, content[first:last + 1])
+
+        httpretty.register_uri(HEAD, url, status=200, etag=md5(content).hexdigest(),
+            content_length=str(len(content)))
+        httpretty.register_uri(GET, url, body=ranged_get)
+        return requested
+
+    def _destination(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_download_ranged(self):
+        content = b'0123456789abcdefghij!'
+        requested = self._register_ranged(util.STORAGE_URL + '/contname/ranged', content)
+
+        path = self._destination()
+        o = SwiftestObject(self.client, 'contname', 'ranged')
+        o.download_ranged(path, range_size=8, concurrency=1)
+
+        with open(path, 'rb') as f:
+            self.assertEqual(content, f.read())
+        self.assertEqual([0, 8, 16], sorted(requested))
+        self.assertFalse(os.path.exists(path + '.swiftest-ranges'))
+
+    def test_download_ranged_mmap(self):
+        content = b'memory mapped content'
+        self._register_ranged(util.STORAGE_URL + '/contname/mapped', content)
+
+        path = self._destination()
+        o = SwiftestObject(self.client, 'contname', 'mapped')
+        o.download_ranged(path, range_size=5, concurrency=1, use_mmap=True)
+
+        with open(path, 'rb') as f:
+            self.assertEqual(content, f.read())
+
+    def test_download_ranged_resumes_missing_ranges(self):
+        content = b'0123456789abcdefghij!'
+        url = util.STORAGE_URL + '/contname/resumed'
+        self._register_ranged(url, content, fail_offsets=(8,))
+
+        path = self._destination()
+        o = SwiftestObject(self.client, 'contname', 'resumed')
+        try:
+            o.download_ranged(path, range_size=8, concurrency=1)
+            self.fail("Did not raise on a failed range")
+        except PartialDownloadError as e:
+            self.assertEqual([(8, 8)], e.missing)
+        self.addCleanup(lambda: os.path.exists(path + '.swiftest-ranges') and os.remove(path + '.swiftest-ranges'))
+
+        requested = self._register_ranged(url, content)
+        o.download_ranged(path, range_size=8, concurrency=1)
+
+        self.assertEqual([8], requested)
+        with open(path, 'rb') as f:
+            self.assertEqual(content, f.read())
+
+    def test_download_ranged_verifies_etag(self):
+        url = util.STORAGE_URL + '/contname/mismatched'
+        self._register_ranged(url, b'actual content')
+        httpretty.register_uri(HEAD, url, status=200, etag=md5(b'expected').hexdigest(),
+            content_length='14')
+
+        o = SwiftestObject(self.client, 'contname', 'mismatched')
+        self.assertRaises(ChecksumError, o.download_ranged, self._destination(), range_size=4, concurrency=1)
+
     def tearDown(self):
         httpretty.disable()
@@ -0,0 +1,121 @@
+"""
+Unit tests for directory synchronization.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import httpretty
+
+from hashlib import md5
+
+from swiftest.container import Container
+from swiftest.sync import HashIndex, DOWNLOAD, INDEX_SUFFIX
+from httpretty import GET, PUT, DELETE
+
+from . import util
+
+def listing(*objects):
+    return json.dumps([{'name': name, 'bytes': len(content), 'hash': md5(content).hexdigest(),
+        'content_type': 'text/plain', 'last_modified': '2013-08-01T00:00:00.000000'}
+        for name, content in objects])
+
+# httpretty isn't thread-safe, so these tests sync with a concurrency of 1.
+class SyncTest(unittest.TestCase):
+
+    def setUp(self):
+        httpretty.enable()
+        self.client = util.create_client()
+        self.root = tempfile.mkdtemp()
+
+    def write(self, name, content):
+        path = os.path.join(self.root, *name.split('/'))
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as f:
+            f.write(content)
+
+    def test_upload_differences(self):
+        self.write('same.txt', b'unchanged')
+        self.write('resized.txt', b'longer content')
+        self.write('edited.txt', b'new')
+        self.write('dir/added.txt', b'added')
+        httpretty.register_uri(GET, util.STORAGE_URL + '/syncup', status=200, body=listing(
+            ('backup/edited.txt', b'old'), ('backup/removed.txt', b'gone'),
+            ('backup/resized.txt', b'short'), ('backup/same.txt', b'unchanged')))
+        for name in ('dir/added.txt', 'edited.txt', 'resized.txt'):
+            httpretty.register_uri(PUT, util.STORAGE_URL + '/syncup/backup/' + name, status=201)
+        httpretty.register_uri(DELETE, util.STORAGE_URL + '/syncup/backup/removed.txt', status=204)
+
+        report = Container(self.client, 'syncup').sync(self.root, prefix='backup/', delete=True, concurrency=1)
+
+        self.assertEqual([], report.failed)
+        self.assertEqual(['backup/edited.txt', 'backup/resized.txt', 'backup/dir/added.txt'],
+            [r.name for r in report.uploaded])
+        self.assertEqual(['backup/removed.txt'], [r.name for r in report.deleted])
+        self.assertEqual(['backup/same.txt'], [r.name for r in report.skipped])
+        self.assertEqual(22, report.bytes)
+
+        with open(self.root + INDEX_SUFFIX) as f:
+            index = json.load(f)
+        self.assertEqual(sorted(['same.txt', 'resized.txt', 'edited.txt', 'dir/added.txt']), sorted(index))
+        self.assertEqual(md5(b'unchanged').hexdigest(), index['same.txt'][2])
+
+    def test_download_differences(self):
+        self.write('same.txt', b'unchanged')
+        self.write('extra.txt', b'local only')
+        httpretty.register_uri(GET, util.STORAGE_URL + '/syncdown', status=200, body=listing(
+            ('dir/', b''), ('dir/fetched.txt', b'fetched'), ('same.txt', b'unchanged')))
+        httpretty.register_uri(GET, util.STORAGE_URL + '/syncdown/dir/fetched.txt', status=200, body='fetched')
+
+        report = Container(self.client, 'syncdown').sync(self.root, direction=DOWNLOAD, delete=True, concurrency=1)
+
+        self.assertEqual([], report.failed)
+        self.assertEqual(['dir/fetched.txt'], [r.name for r in report.downloaded])
+        self.assertEqual(['extra.txt'], [r.name for r in report.deleted])
+        self.assertEqual(['same.txt'], [r.name for r in report.skipped])
+        with open(os.path.join(self.root, 'dir', 'fetched.txt'), 'rb') as f:
+            self.assertEqual(b'fetched', f.read())
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'extra.txt')))
+
+    def test_download_outside_root(self):
+        httpretty.register_uri(GET, util.STORAGE_URL + '/syncescape', status=200, body=listing(
+            ('../escaped.txt', b'escaped')))
+
+        report = Container(self.client, 'syncescape').sync(self.root, direction=DOWNLOAD, concurrency=1)
+
+        self.assertEqual(1, len(report.failed))
+        self.assertIsInstance(report.failed[0].error, ValueError)
+
+    def test_upload_from_missing_root(self):
+        missing = os.path.join(self.root, 'typo')
+        requests_before = len(httpretty.latest_requests())
+
+        self.assertRaises(ValueError, Container(self.client, 'syncmissing').sync, missing, delete=True,
+            concurrency=1)
+        self.assertEqual(requests_before, len(httpretty.latest_requests()))
+        self.assertFalse(os.path.exists(missing + INDEX_SUFFIX))
+
+    def test_index_reuses_digests(self):
+        self.write('big.bin', b'content')
+        path = os.path.join(self.root, 'big.bin')
+        index = HashIndex(self.root + INDEX_SUFFIX)
+        self.assertEqual(md5(b'content').hexdigest(), index.digest('big.bin', path))
+        index.save()
+
+        # A digest recorded for the current size and mtime is trusted without rehashing.
+        reloaded = HashIndex(self.root + INDEX_SUFFIX)
+        reloaded._entries['big.bin'][2] = 'remembered'
+        self.assertEqual('remembered', reloaded.digest('big.bin', path))
+
+        st = os.stat(path)
+        os.utime(path, (st.st_atime, st.st_mtime + 10))
+        self.assertEqual(md5(b'content').hexdigest(), reloaded.digest('big.bin', path))
+
+    def tearDown(self):
+        httpretty.disable()
+        shutil.rmtree(self.root)
+        if os.path.exists(self.root + INDEX_SUFFIX):
+            os.remove(self.root + INDEX_SUFFIX)
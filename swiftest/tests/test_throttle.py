@@ -0,0 +1,128 @@
+"""
+Unit tests for the TokenBucket and AdaptiveLimiter classes.
+"""
+
+import threading
+import unittest
+import httpretty
+
+from swiftest import throttle
+from swiftest.throttle import TokenBucket, AdaptiveLimiter
+from httpretty import HEAD
+
+from . import util
+
+class TokenBucketTest(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        self.slept = []
+        self.original_monotonic = throttle.monotonic
+        throttle.monotonic = lambda: self.now
+
+    def bucket(self, rate, burst=None):
+        b = TokenBucket(rate, burst)
+        b.sleep = self.slept.append
+        return b
+
+    def test_burst_then_rate(self):
+        b = self.bucket(rate=10, burst=2)
+        self.assertEqual(0.0, b.acquire())
+        self.assertEqual(0.0, b.acquire())
+        self.assertAlmostEqual(0.1, b.acquire())
+        self.assertAlmostEqual(0.2, b.acquire())
+        self.assertEqual(2, len(self.slept))
+
+    def test_refill(self):
+        b = self.bucket(rate=10, burst=2)
+        b.acquire()
+        b.acquire()
+        self.now += 0.1
+        self.assertEqual(0.0, b.acquire())
+        self.now += 10
+        b.acquire()
+        b.acquire()
+        self.assertAlmostEqual(0.1, b.acquire())
+
+    def test_invalid_rate(self):
+        self.assertRaises(ValueError, TokenBucket, 0)
+
+    def tearDown(self):
+        throttle.monotonic = self.original_monotonic
+
+class AdaptiveLimiterTest(unittest.TestCase):
+
+    def test_additive_increase(self):
+        limiter = AdaptiveLimiter(initial=4, maximum=5)
+        for _ in range(4):
+            limiter.release(limiter.acquire(), 200)
+        # About one more request per round of requests at the current limit.
+        self.assertTrue(4.9 < limiter.limit < 5)
+        for _ in range(10):
+            limiter.release(limiter.acquire(), 200)
+        self.assertEqual(5, limiter.limit)
+
+    def test_multiplicative_decrease_once_per_round(self):
+        limiter = AdaptiveLimiter(initial=16)
+        tickets = [limiter.acquire() for _ in range(8)]
+        for ticket in tickets:
+            limiter.release(ticket, 498)
+        self.assertEqual(8, limiter.limit)
+        self.assertEqual(0, limiter.in_flight)
+
+        limiter.release(limiter.acquire(), 429)
+        self.assertEqual(4, limiter.limit)
+
+        for _ in range(5):
+            limiter.release(limiter.acquire(), 503)
+        self.assertEqual(1, limiter.limit)
+
+    def test_rising_latency(self):
+        limiter = AdaptiveLimiter(initial=8, latency_factor=3.0)
+        limiter.release(limiter.acquire(), 200, 0.01)
+        limiter.release(limiter.acquire(), 200, 0.02)
+        self.assertGreater(limiter.limit, 8)
+        limiter.release(limiter.acquire(), 200, 0.5)
+        self.assertLess(limiter.limit, 5)
+
+        unlimited = AdaptiveLimiter(initial=8, latency_factor=None)
+        unlimited.release(unlimited.acquire(), 200, 0.01)
+        unlimited.release(unlimited.acquire(), 200, 0.5)
+        self.assertGreater(unlimited.limit, 8)
+
+    def test_blocks_at_limit(self):
+        limiter = AdaptiveLimiter(initial=1)
+        ticket = limiter.acquire()
+        acquired = threading.Event()
+
+        def wait():
+            limiter.release(limiter.acquire(), 200)
+            acquired.set()
+        t = threading.Thread(target=wait)
+        t.start()
+
+        self.assertFalse(acquired.wait(0.05))
+        limiter.release(ticket, 200)
+        self.assertTrue(acquired.wait(1))
+        t.join()
+
+class ClientThrottleTest(unittest.TestCase):
+
+    def setUp(self):
+        httpretty.enable()
+        self.client = util.create_client()
+
+    def test_throttled_requests_shrink_limit_and_retry(self):
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/throttled', responses=[
+            httpretty.Response(body='', status=429),
+            httpretty.Response(body='', status=204, x_container_object_count='1',
+                x_container_bytes_used='1')])
+        self.client.concurrency_limit = AdaptiveLimiter(initial=8, latency_factor=None)
+        self.client.rate_limit = TokenBucket(rate=1000)
+
+        self.assertEqual(1, self.client.container('throttled').object_count)
+        self.assertAlmostEqual(4.25, self.client.concurrency_limit.limit)
+        self.assertEqual(0, self.client.concurrency_limit.in_flight)
+
+    def tearDown(self):
+        httpretty.disable()
@@ -0,0 +1,97 @@
+"""
+Unit tests for the Transport class.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+import httpretty
+
+from httpretty import GET, HEAD
+
+from swiftest.client import Client
+from swiftest.transport import Transport
+
+from . import util
+
+class TransportTest(unittest.TestCase):
+
+    def setUp(self):
+        httpretty.enable()
+
+    def test_client_owns_default_transport(self):
+        """
+        A Client creates a pooled Transport if none is provided.
+        """
+
+        client = util.create_client()
+        self.assertIsInstance(client.transport, Transport)
+
+    def test_client_uses_provided_transport(self):
+        """
+        Every Client request, including authentication, goes through its Transport.
+        """
+
+        transport = Transport(pool_size=4)
+        seen = []
+        original = transport.request
+        def recording(method, url, **kwargs):
+            seen.append((method, url))
+            return original(method, url, **kwargs)
+        transport.request = recording
+
+        httpretty.register_uri(GET, 'https://auth.endpoint.com/v1/', status=204,
+            x_auth_token=util.AUTH_TOKEN,
+            x_storage_url=util.STORAGE_URL)
+        httpretty.register_uri(HEAD, util.STORAGE_URL + '/contname', status=204,
+            x_container_object_count=0, x_container_bytes_used=0)
+
+        client = Client(endpoint='https://auth.endpoint.com/v1/',
+            username='me', auth_key='swordfish', transport=transport)
+        client.container('contname').exists()
+
+        self.assertEqual([('GET', 'https://auth.endpoint.com/v1/'),
+            ('HEAD', util.STORAGE_URL + '/contname')], seen)
+
+    def test_pool_configuration(self):
+        transport = Transport(pool_size=25, pool_hosts=3, pool_block=True)
+        adapter = transport.session.get_adapter('https://storage.endpoint.com/')
+        self.assertEqual(25, adapter._pool_maxsize)
+        self.assertEqual(3, adapter._pool_connections)
+        self.assertTrue(adapter._pool_block)
+
+    def test_timeouts(self):
+        self.assertIsNone(Transport().timeout())
+        self.assertEqual((2, 30), Transport(connect_timeout=2, read_timeout=30).timeout())
+
+    def test_disable_keep_alive(self):
+        httpretty.register_uri(GET, 'https://storage.endpoint.com/', status=200)
+
+        Transport(keep_alive=False).request('GET', 'https://storage.endpoint.com/')
+        self.assertEqual('close', httpretty.last_request().headers['Connection'])
+
+    def test_caller_headers_untouched(self):
+        """
+        Adding the auth token doesn't mutate the caller's header dictionary.
+        """
+
+        httpretty.register_uri(GET, util.STORAGE_URL + '/contname/obj', status=200)
+        client = util.create_client()
+
+        headers = {'Range': 'bytes=0-1'}
+        client._call('GET', '/contname/obj', headers=headers)
+        self.assertEqual({'Range': 'bytes=0-1'}, headers)
+        self.assertEqual(util.AUTH_TOKEN, httpretty.last_request().headers['X-Auth-Token'])
+
+    def tearDown(self):
+        httpretty.disable()
+
+class LazyImportTest(unittest.TestCase):
+
+    def test_http_stack_loaded_on_first_transport(self):
+        probe = ("import sys; import swiftest; from swiftest.client import Client; "
+            "assert 'requests' not in sys.modules; assert 'concurrent.futures' not in sys.modules; "
+            "from swiftest.transport import Transport; Transport(); assert 'requests' in sys.modules")
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        subprocess.check_call([sys.executable, '-c', probe], cwd=root)
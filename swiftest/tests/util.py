@@ -5,6 +5,7 @@ Unit testing utility functions.
 import httpretty
 
 from swiftest.client import Client
+from swiftest.retry import RetryPolicy
 
 AUTH_TOKEN='faketoken'
 STORAGE_URL='https://storage.endpoint.com/v1/me'
@@ -13,7 +14,8 @@ def create_client():
     """
     Mock the authentication endpoint to create a Client object.
 
-    Assumes that httpretty is already enabled.
+    Assumes that httpretty is already enabled. Retries are made without
+    waiting.
     """
 
     httpretty.register_uri(httpretty.GET, 'https://auth.endpoint.com/v1/', status=204,
@@ -21,4 +23,4 @@ def create_client():
         x_storage_url=STORAGE_URL)
 
     return Client(endpoint='https://auth.endpoint.com/v1/',
-        username='me', auth_key='swordfish')
+        username='me', auth_key='swordfish', retry=RetryPolicy(backoff=0))
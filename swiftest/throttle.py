@@ -0,0 +1,125 @@
+"""
+Pace outbound requests, and adapt how many are in flight to how the cluster is coping.
+"""
+
+import threading
+import time
+
+from .compat import monotonic
+
+# Statuses with which Swift's proxy and ratelimit middleware ask clients to back off.
+THROTTLE_STATUSES = frozenset([429, 498, 503])
+
+
+class TokenBucket(object):
+    """
+    Admit at most "rate" requests per second, allowing bursts of up to "burst" at once.
+
+    Tokens accrue continuously up to the bucket's capacity. acquire() takes
+    one, sleeping first if none are available. Thread-safe, and shared by
+    every thread that uses the same Client.
+    """
+
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError("A TokenBucket's rate must be positive.")
+        self.rate = float(rate)
+        self.burst = float(burst or max(1, rate))
+        self.sleep = time.sleep
+        self._tokens = self.burst
+        self._updated = monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, waiting until one is available. Return the number of seconds waited.
+        """
+
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token now, even if it has to be waited for, so waiters are served in turn.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def __repr__(self):
+        return "<TokenBucket(rate={},burst={})>".format(self.rate, self.burst)
+
+
+class AdaptiveLimiter(object):
+    """
+    Bound the number of requests in flight, adjusting the bound additively up and multiplicatively down.
+
+    Each request that completes normally raises the limit by "increase"
+    divided by the current limit, so the limit grows by about "increase" per
+    round of requests. A throttling status, or a latency above
+    "latency_factor" times the smoothed latency, multiplies the limit by
+    "decrease" instead. Only one decrease is taken per round: requests that
+    were already in flight when the limit last shrank don't shrink it again.
+    The limit stays between "minimum" and "maximum". Set "latency_factor" to
+    None to react to throttling statuses alone.
+    """
+
+    def __init__(self, initial=16, minimum=1, maximum=256, increase=1.0, decrease=0.5,
+                 latency_factor=3.0, smoothing=0.1, statuses=THROTTLE_STATUSES):
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.smoothing = smoothing
+        self.statuses = frozenset(statuses)
+        self.in_flight = 0
+        self.latency = None
+        self._generation = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Wait for room under the limit and claim it. Return a ticket to hand back to release().
+        """
+
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+            return self._generation
+
+    def release(self, ticket, status=None, elapsed=None):
+        """
+        Return the room claimed by acquire(), adjusting the limit by the request's outcome.
+
+        "status" is the response status, or None if no response arrived, and
+        "elapsed" is how many seconds the request took.
+        """
+
+        with self._condition:
+            self.in_flight -= 1
+
+            congested = status in self.statuses
+            if self.latency_factor and elapsed is not None and status is not None and \
+                    status < 500 and not congested:
+                if self.latency is None:
+                    self.latency = elapsed
+                else:
+                    congested = elapsed > self.latency * self.latency_factor
+                    # Keep following the latency even while congested, so a new normal is learned.
+                    self.latency += self.smoothing * (elapsed - self.latency)
+
+            if congested:
+                if ticket == self._generation:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self._generation += 1
+            elif status is not None and status < 400:
+                self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+
+            self._condition.notify_all()
+
+    def __repr__(self):
+        return "<AdaptiveLimiter(limit={:.1f},in_flight={})>".format(self.limit, self.in_flight)
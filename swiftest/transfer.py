@@ -0,0 +1,185 @@
+"""
+Move many objects between the local filesystem and Containers, or between Containers, at once.
+"""
+
+import os
+
+from .compat import monotonic
+from .pool import bounded_map
+
+# Default number of transfers to run at once.
+DEFAULT_CONCURRENCY = 8
+
+
+class TransferResult(object):
+    """
+    The outcome of moving a single object.
+
+    "error" is None if the transfer succeeded, or the exception that it raised.
+    """
+
+    def __init__(self, name, path, bytes=0, elapsed=0.0, error=None):
+        self.name = name
+        self.path = path
+        self.bytes = bytes
+        self.elapsed = elapsed
+        self.error = error
+
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        outcome = "ok" if self.ok() else repr(self.error)
+        return "<TransferResult(name={},bytes={},{})>".format(self.name, self.bytes, outcome)
+
+
+class TransferReport(object):
+    """
+    Aggregate results and throughput of a batch of transfers.
+    """
+
+    def __init__(self, results, elapsed):
+        self.results = results
+        self.elapsed = elapsed
+
+    @property
+    def succeeded(self):
+        return [r for r in self.results if r.ok()]
+
+    @property
+    def failed(self):
+        return [r for r in self.results if not r.ok()]
+
+    @property
+    def bytes(self):
+        """
+        Total bytes moved by successful transfers.
+        """
+
+        return sum(r.bytes for r in self.results if r.ok())
+
+    @property
+    def throughput(self):
+        """
+        Aggregate throughput of the batch, in bytes per second.
+        """
+
+        if self.elapsed <= 0:
+            return 0.0
+        return self.bytes / float(self.elapsed)
+
+    def raise_for_errors(self):
+        """
+        Re-raise the first error encountered, if any transfer failed.
+        """
+
+        for r in self.results:
+            if not r.ok():
+                raise r.error
+
+    def __repr__(self):
+        return "<TransferReport(succeeded={},failed={},bytes={},elapsed={:.3f}s)>".format(
+            len(self.succeeded), len(self.failed), self.bytes, self.elapsed)
+
+
+def run_transfers(transfer, pairs, concurrency=DEFAULT_CONCURRENCY, callback=None):
+    """
+    Perform "transfer" on each (local path, object name) pair concurrently.
+
+    "transfer" is called with a path and a name and returns the number of
+    bytes moved. "callback", if provided, is called with each TransferResult
+    as it completes. Return a TransferReport once every pair is done.
+    """
+
+    def move(pair):
+        path, name = pair
+        return path, transfer(path, name)
+
+    return run_batch(move, pairs, lambda pair: (pair[1], pair[0]), concurrency, callback)
+
+
+def run_batch(move, items, describe, concurrency=DEFAULT_CONCURRENCY, callback=None):
+    """
+    Call "move" on each of "items" concurrently, collecting a TransferReport.
+
+    "move" returns the path an item was moved to and the bytes it moved.
+    "describe" returns the (name, path) that a failed item is reported under.
+    "callback", if provided, is called with each TransferResult as it
+    completes.
+    """
+
+    def timed(item):
+        start = monotonic()
+        outcome = move(item)
+        return outcome, monotonic() - start
+
+    results = []
+    start = monotonic()
+    for item, outcome, error in bounded_map(timed, items, concurrency):
+        name, path = describe(item)
+        if error is None:
+            (path, size), elapsed = outcome
+            result = TransferResult(name, path, bytes=size, elapsed=elapsed)
+        else:
+            result = TransferResult(name, path, error=error)
+        results.append(result)
+        if callback:
+            callback(result)
+
+    return TransferReport(results, monotonic() - start)
+
+
+def upload_path(container, path, name):
+    """
+    Upload the file at "path" as the object "name" within "container".
+    """
+
+    with open(path, 'rb') as f:
+        container.object(name).upload_file(f)
+        return f.tell()
+
+
+def download_path(container, path, name):
+    """
+    Download the object "name" from "container" to a file at "path".
+
+    Parent directories of "path" are created as necessary.
+    """
+
+    parent = os.path.dirname(path)
+    if parent and not os.path.isdir(parent):
+        try:
+            os.makedirs(parent)
+        except OSError:
+            # Another transfer may have created it concurrently.
+            if not os.path.isdir(parent):
+                raise
+
+    with open(path, 'wb') as f:
+        container.object(name).download_file(f)
+        return f.tell()
+
+
+def copy_objects(container, destination, infos, concurrency=DEFAULT_CONCURRENCY, move=False,
+                 rename=None, callback=None):
+    """
+    Copy or move listed objects from "container" to "destination" server-side.
+
+    "infos" is an iterable of ObjectInfo records, such as a container listing.
+    Each copy keeps its source name unless "rename" maps it to a new one. A
+    TransferResult's "path" is the "container/object" it was copied to, and
+    its "bytes" are those reported by the listing. Return a TransferReport.
+    """
+
+    destination_name = getattr(destination, 'name', destination)
+
+    def copy(info):
+        new_name = rename(info.name) if rename else info.name
+        source = container.object(info.name)
+        if move:
+            source.move_to(destination_name, new_name)
+        else:
+            source.copy_to(destination_name, new_name)
+        return '{0}/{1}'.format(destination_name, new_name), info.bytes or 0
+
+    return run_batch(copy, infos, lambda info: (info.name, destination_name), concurrency, callback)
@@ -0,0 +1,94 @@
+"""
+Pooled HTTP transport shared by every request a Client makes.
+
+requests is imported when the first Transport is constructed rather than
+when Swiftest is, so short-lived processes don't pay for the HTTP stack
+until they use it. Modules that need requests reach it through
+requests_module() rather than importing it themselves.
+"""
+
+_requests = None
+
+
+def requests_module():
+    """
+    Return the requests module, importing it the first time it's needed.
+    """
+
+    global _requests
+    if _requests is None:
+        import requests
+        _requests = requests
+    return _requests
+
+
+class Transport(object):
+    """
+    Issue HTTP requests over a pool of persistent, keep-alive connections.
+
+    A single Transport is owned by each Client, so authentication, metadata
+    queries and object transfers all reuse the same TCP and TLS sessions
+    instead of opening a fresh connection per call.
+    """
+
+    def __init__(self, pool_size=10, pool_hosts=10, pool_block=False,
+                 keep_alive=True, connect_timeout=None, read_timeout=None):
+        """
+        Construct a Transport backed by a requests Session.
+
+        "pool_size" is the maximum number of connections kept open to any
+        single host; "pool_hosts" is the number of distinct hosts that will
+        have a pool cached. If "pool_block" is set, callers wait for a free
+        connection rather than opening an extra, unpooled one when a host's
+        pool is exhausted.
+
+        "connect_timeout" and "read_timeout" are expressed in seconds. Leave
+        either as None to wait indefinitely.
+        """
+
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        requests = requests_module()
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_hosts,
+                                                pool_maxsize=pool_size,
+                                                pool_block=pool_block)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+    def request(self, method, url, **kwargs):
+        """
+        Perform an HTTP request and return its requests Response.
+
+        The Transport's timeouts are applied unless an explicit "timeout" is
+        provided.
+        """
+
+        if 'timeout' not in kwargs:
+            kwargs['timeout'] = self.timeout()
+        return self.session.request(method, url, **kwargs)
+
+    def timeout(self):
+        """
+        Produce the timeout argument that requests expects.
+        """
+
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+        return (self.connect_timeout, self.read_timeout)
+
+    def close(self):
+        """
+        Close every pooled connection.
+        """
+
+        self.session.close()
+
+    def __repr__(self):
+        return "<Transport(pool_size={},keep_alive={})>".format(self.pool_size, self.keep_alive)